@@ -28,6 +28,15 @@ config.set_main_option('sqlalchemy.url', settings.SQLALCHEMY_DATABASE_URL)
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Объекты, созданные миграциями вручную и не описанные в моделях
+# (генерируемая tsvector-колонка поиска курсов и ее GIN-индекс)
+UNMAPPED_OBJECTS = {"search_vector", "ix_courses_search_vector"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (reflected and compare_to is None and name in UNMAPPED_OBJECTS)
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -52,6 +61,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -59,7 +69,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
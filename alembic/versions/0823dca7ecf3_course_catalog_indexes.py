@@ -0,0 +1,50 @@
+"""course catalog indexes
+
+Revision ID: 0823dca7ecf3
+Revises: 2751c8f70ec7
+Create Date: 2026-10-18 16:02:14.903571
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0823dca7ecf3'
+down_revision: Union[str, None] = '2751c8f70ec7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя, колонки)
+INDEXES = [
+    ('ix_courses_owner_id_status', ['owner_id', 'status']),
+    ('ix_courses_status_price_id', ['status', 'price', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(
+                name,
+                'courses',
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name='courses',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,82 @@
+"""course keyset indexes
+
+Revision ID: 2751c8f70ec7
+Revises: ac533ae31fcd
+Create Date: 2026-10-18 15:10:37.482915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2751c8f70ec7'
+down_revision: Union[str, None] = 'ac533ae31fcd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NOT_ARCHIVED = sa.text("status <> 'archived'")
+
+# (имя, колонки, условие частичного индекса). Новые индексы заканчиваются
+# на id: курсор (created_at, id) читается из индекса без сортировки
+NEW_INDEXES = [
+    ('ix_courses_created_at_id', ['created_at', 'id'], None),
+    ('ix_courses_status_created_at_id', ['status', 'created_at', 'id'], None),
+    (
+        'ix_courses_owner_id_created_at_id_not_archived',
+        ['owner_id', 'created_at', 'id'],
+        NOT_ARCHIVED,
+    ),
+]
+
+# Перекрываются новыми индексами
+OLD_INDEXES = [
+    ('ix_courses_status_created_at', ['status', 'created_at'], None),
+    (
+        'ix_courses_owner_id_created_at_not_archived',
+        ['owner_id', 'created_at'],
+        NOT_ARCHIVED,
+    ),
+]
+
+
+def create_indexes(indexes):
+    for name, columns, where in indexes:
+        op.create_index(
+            name,
+            'courses',
+            columns,
+            unique=False,
+            postgresql_concurrently=True,
+            postgresql_where=where,
+            if_not_exists=True,
+        )
+
+
+def drop_indexes(indexes):
+    for name, _, _ in indexes:
+        op.drop_index(
+            name,
+            table_name='courses',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Старые индексы удаляются только после построения новых, чтобы
+    # каталог не остался без индекса
+    with op.get_context().autocommit_block():
+        create_indexes(NEW_INDEXES)
+        drop_indexes(OLD_INDEXES)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        create_indexes(OLD_INDEXES)
+        drop_indexes(NEW_INDEXES)
@@ -0,0 +1,73 @@
+"""course stats
+
+Revision ID: 3cdf37b0ee52
+Revises: 0823dca7ecf3
+Create Date: 2026-10-18 17:11:42.520318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3cdf37b0ee52'
+down_revision: Union[str, None] = '0823dca7ecf3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('course_stats',
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('modules_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('lessons_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('total_duration', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('purchases_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['courses.id'], name=op.f('fk_course_stats_course_id_courses'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('course_id', name=op.f('pk_course_stats'))
+    )
+    # Начальное заполнение; то же считает app.helpers.course_stats.recount
+    op.execute(
+        sa.text(
+            "INSERT INTO course_stats "
+            "(course_id, modules_count, lessons_count, total_duration, "
+            "purchases_count) "
+            "SELECT c.id, "
+            "(SELECT count(*) FROM modules m "
+            "WHERE m.course_id = c.id AND m.status <> 'archived'), "
+            "(SELECT count(*) FROM lessons l "
+            "WHERE l.course_id = c.id AND l.status <> 'archived'), "
+            "(SELECT coalesce(sum(l.duration), 0) FROM lessons l "
+            "WHERE l.course_id = c.id AND l.status <> 'archived'), "
+            "(SELECT count(*) FROM course_purchases p "
+            "WHERE p.course_id = c.id) "
+            "FROM courses c"
+        )
+    )
+    # Отдельным шагом вне транзакции: course_purchases пишет консьюмер
+    # платежей, обычный CREATE INDEX заблокировал бы запись на все время
+    # построения
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_course_purchases_course_id',
+            'course_purchases',
+            ['course_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_course_purchases_course_id',
+            table_name='course_purchases',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_table('course_stats')
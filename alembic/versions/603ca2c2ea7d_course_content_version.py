@@ -0,0 +1,33 @@
+"""course content version
+
+Revision ID: 603ca2c2ea7d
+Revises: 3cdf37b0ee52
+Create Date: 2026-10-18 18:40:27.114052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '603ca2c2ea7d'
+down_revision: Union[str, None] = '3cdf37b0ee52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'course_stats',
+        sa.Column(
+            'content_version', sa.Integer(), server_default='0', nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('course_stats', 'content_version')
@@ -0,0 +1,115 @@
+"""hot path indexes
+
+Revision ID: 6ae0f2801f81
+Revises: 7a683275db88
+Create Date: 2026-10-18 10:12:41.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6ae0f2801f81'
+down_revision: Union[str, None] = '7a683275db88'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NOT_ARCHIVED = sa.text("status <> 'archived'")
+
+# (имя, таблица, колонки, условие частичного индекса)
+INDEXES = [
+    (
+        'ix_modules_course_id_parent_module_id_order',
+        'modules',
+        ['course_id', 'parent_module_id', 'order'],
+        None,
+    ),
+    (
+        'ix_modules_course_id_order_not_archived',
+        'modules',
+        ['course_id', 'order'],
+        NOT_ARCHIVED,
+    ),
+    (
+        'ix_lessons_course_id_module_id_order',
+        'lessons',
+        ['course_id', 'module_id', 'order'],
+        None,
+    ),
+    (
+        'ix_lessons_course_id_order_not_archived',
+        'lessons',
+        ['course_id', 'order'],
+        NOT_ARCHIVED,
+    ),
+    (
+        'ix_lesson_blocks_lesson_id_order',
+        'lesson_blocks',
+        ['lesson_id', 'order'],
+        None,
+    ),
+    (
+        'ix_course_purchases_user_id_course_id',
+        'course_purchases',
+        ['user_id', 'course_id'],
+        None,
+    ),
+    (
+        'ix_payment_transactions_payment_intent_id',
+        'payment_transactions',
+        ['payment_intent_id'],
+        None,
+    ),
+    (
+        'ix_refresh_tokens_expires_at',
+        'refresh_tokens',
+        ['expires_at'],
+        None,
+    ),
+    (
+        'ix_courses_status_created_at',
+        'courses',
+        ['status', 'created_at'],
+        None,
+    ),
+    (
+        'ix_courses_owner_id_created_at_not_archived',
+        'courses',
+        ['owner_id', 'created_at'],
+        NOT_ARCHIVED,
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY не блокирует запись в таблицы, но не может
+    # выполняться внутри транзакции. Если построение прервется, останется
+    # невалидный индекс: его нужно удалить и повторить миграцию.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=where,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,70 @@
+"""refresh token digest
+
+Revision ID: ac533ae31fcd
+Revises: 5d635f11cff0
+Create Date: 2026-10-18 14:02:51.336190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ac533ae31fcd'
+down_revision: Union[str, None] = '5d635f11cff0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Истекшие токены больше не нужны, переносить их незачем
+    op.execute(sa.text('DELETE FROM refresh_tokens WHERE expires_at < now()'))
+    op.add_column(
+        'refresh_tokens',
+        sa.Column('token_hash', sa.String(length=64), nullable=True),
+    )
+    # Должно совпадать с app.auth.auth.hash_refresh_token: действующие
+    # сессии переживают миграцию
+    op.execute(
+        sa.text(
+            "UPDATE refresh_tokens "
+            "SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')"
+        )
+    )
+    op.alter_column('refresh_tokens', 'token_hash', nullable=False)
+    op.create_unique_constraint(
+        op.f('uq_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash']
+    )
+    op.drop_constraint(
+        op.f('uq_refresh_tokens_token'), 'refresh_tokens', type_='unique'
+    )
+    op.drop_column('refresh_tokens', 'token')
+    op.create_index(
+        'ix_refresh_tokens_user_id_created_at',
+        'refresh_tokens',
+        ['user_id', 'created_at'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Из хэша токен не восстановить: все сессии завершаются
+    op.drop_index(
+        'ix_refresh_tokens_user_id_created_at', table_name='refresh_tokens'
+    )
+    op.execute(sa.text('DELETE FROM refresh_tokens'))
+    op.add_column(
+        'refresh_tokens',
+        sa.Column('token', sa.String(length=512), nullable=False),
+    )
+    op.create_unique_constraint(
+        op.f('uq_refresh_tokens_token'), 'refresh_tokens', ['token']
+    )
+    op.drop_constraint(
+        op.f('uq_refresh_tokens_token_hash'), 'refresh_tokens', type_='unique'
+    )
+    op.drop_column('refresh_tokens', 'token_hash')
@@ -0,0 +1,57 @@
+"""module closure
+
+Revision ID: b71e4f0c2d95
+Revises: 603ca2c2ea7d
+Create Date: 2026-10-18 19:32:05.418273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e4f0c2d95'
+down_revision: Union[str, None] = '603ca2c2ea7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('module_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['modules.id'], name=op.f('fk_module_closure_ancestor_id_modules'), ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['modules.id'], name=op.f('fk_module_closure_descendant_id_modules'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id', name=op.f('pk_module_closure'))
+    )
+    op.create_index(
+        'ix_module_closure_descendant_id_depth',
+        'module_closure',
+        ['descendant_id', 'depth'],
+        unique=False,
+    )
+    # Начальное заполнение; то же делает app.helpers.module_closure.rebuild
+    op.execute(
+        sa.text(
+            "INSERT INTO module_closure (ancestor_id, descendant_id, depth) "
+            "WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS ("
+            "SELECT id, id, 0 FROM modules "
+            "UNION ALL "
+            "SELECT tree.ancestor_id, m.id, tree.depth + 1 "
+            "FROM tree JOIN modules m ON m.parent_module_id = tree.descendant_id"
+            ") "
+            "SELECT ancestor_id, descendant_id, depth FROM tree"
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_module_closure_descendant_id_depth', table_name='module_closure'
+    )
+    op.drop_table('module_closure')
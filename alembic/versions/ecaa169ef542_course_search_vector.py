@@ -0,0 +1,64 @@
+"""course search vector
+
+Revision ID: ecaa169ef542
+Revises: 6ae0f2801f81
+Create Date: 2026-10-18 11:03:27.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ecaa169ef542'
+down_revision: Union[str, None] = '6ae0f2801f81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Должно совпадать с app.helpers.course_search.SEARCH_CONFIG
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(title, '')), 'A') "
+    "|| setweight("
+    "to_tsvector('russian'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Генерируемая колонка пересчитывается самой БД при каждом изменении
+    # title/description, триггеры не нужны
+    op.add_column(
+        'courses',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_courses_search_vector',
+            'courses',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_courses_search_vector',
+            table_name='courses',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('courses', 'search_vector')
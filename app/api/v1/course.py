@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    status,
+    Depends,
+    Query,
+    Request,
+    Response,
+)
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, or_, and_
+from sqlalchemy import select, update, and_
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -9,27 +17,40 @@ from app.schemas import (
     SCourseResponse,
     SCourseCreate,
     SCourseUpdate,
+    SCourseFacets,
+    SCourseSuggestion,
     SModuleTreeResponse,
     SLessonResponse,
     SArchivedCourseResponse,
     SArchivedLessonResponse,
     build_archived_module_tree,
-    build_module_tree_response,
 )
 from app.db import (
     get_async_db_session,
+    get_async_db_read_session,
     Course,
     ObjectStatus,
     User,
-    UserRole,
     Module,
 )
-from app.dependencies import get_current_user, get_current_user_teacher
+from app.dependencies import (
+    get_current_user_read,
+    get_current_user_teacher,
+    get_current_user_teacher_read,
+    get_token_claims,
+    TokenUser,
+)
+from app.helpers.catalog_cache import catalog_cache, serialize_page
+from app.helpers.content_cache import content_cache, content_version
+from app.helpers.course_suggest import stage_course, suggest_index
 from app.policies import CoursePolicy
 from app.helpers import (
     obj_exist_check,
-    module_lesson as module_lesson_helpers,
+    content_tree,
     course_queries_utils,
+    course_catalog,
+    course_search,
+    pagination,
 )
 
 router = APIRouter(prefix="/course", tags=["Course"])
@@ -41,8 +62,8 @@ router = APIRouter(prefix="/course", tags=["Course"])
 )
 async def get_course_content(
     course_id: int,
-    db: AsyncSession = Depends(get_async_db_session),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db_read_session),
+    current_user: User = Depends(get_current_user_read),
 ):
     try:
         course = await obj_exist_check.course_exists(course_id, db)
@@ -50,74 +71,20 @@ async def get_course_content(
             db, current_user, course, "read"
         )
 
-        is_admin = current_user.role == UserRole.admin
-        is_teacher = course.owner_id == current_user.id
-
-        module_query = select(Module).where(Module.course_id == course_id)
+        visibility = content_tree.visibility_class(current_user, course)
 
-        if is_teacher:
-            module_query = module_query.where(
-                Module.status != ObjectStatus.archived
-            )
-        elif not is_admin:
-            module_query = module_query.where(
-                Module.status == ObjectStatus.published
+        async def build_tree() -> bytes:
+            roots = await content_tree.fetch_course_tree(
+                db, course_id, visibility
             )
+            return content_tree.serialize_tree(roots)
 
-        result = await db.execute(
-            module_query.options(
-                selectinload(Module.submodules), selectinload(Module.lessons)
-            )
+        body = await content_cache.get_or_fill(
+            (course_id, content_version(course), visibility), build_tree
         )
-        flat_modules = result.unique().scalars().all()
-
-        response_items = []
-
-        if flat_modules:
-            module_map: dict[int, dict] = {}
-
-            for module in flat_modules:
-                lessons = module.lessons
-                if is_admin:
-                    lessons = [lesson for lesson in lessons]
-                elif is_teacher:
-                    lessons = [
-                        lesson
-                        for lesson in lessons
-                        if lesson.status != ObjectStatus.archived
-                    ]
-                else:
-                    lessons = [
-                        lesson
-                        for lesson in lessons
-                        if lesson.status == ObjectStatus.published
-                    ]
-
-                module_map[module.id] = {
-                    "module": module,
-                    "children": [],
-                    "lessons": lessons,
-                }
-
-            root_nodes = []
-            for module in flat_modules:
-                node = module_map[module.id]
-
-                if module.parent_module_id is None:
-                    root_nodes.append(node)
-                else:
-                    parent_node = module_map.get(module.parent_module_id)
-                    if parent_node:
-                        parent_node["children"].append(node)
-
-            for node in module_map.values():
-                node["children"].sort(key=lambda x: x["module"].order)
-                node["lessons"].sort(key=lambda x: x.order)
-
-            for node in root_nodes:
-                response_items.append(build_module_tree_response(node))
-
-        return response_items
+        # response_model остается для схемы OpenAPI: повторная валидация
+        # дерева из десятков тысяч узлов дороже самого запроса
+        return Response(content=body, media_type="application/json")
 
     except SQLAlchemyError:
         await db.rollback()
@@ -143,7 +110,7 @@ async def get_course_content(
 async def create_course(
     course_data: SCourseCreate,
     db: AsyncSession = Depends(get_async_db_session),
-    current_user=Depends(get_current_user_teacher),
+    current_user: TokenUser = Depends(get_current_user_teacher),
 ):
     try:
         new_course = Course(
@@ -182,7 +149,7 @@ async def patch_course(
     course_id: int,
     update_data: SCourseUpdate,
     db: AsyncSession = Depends(get_async_db_session),
-    current_user: User = Depends(get_current_user_teacher),
+    current_user: TokenUser = Depends(get_current_user_teacher),
 ):
     try:
         course = await obj_exist_check.course_exists(course_id, db)
@@ -201,6 +168,13 @@ async def patch_course(
         await db.execute(
             update(Course).where(Course.id == course.id).values(**update_values)
         )
+        # массовый UPDATE не виден событию flush индекса подсказок
+        stage_course(
+            db,
+            course.id,
+            update_values.get("title", course.title),
+            update_values.get("status", course.status),
+        )
 
         await db.commit()
         await db.refresh(course)
@@ -227,57 +201,115 @@ async def patch_course(
 
 @router.get("/", response_model=list[SCourseResponse])
 async def get_courses(
-    db: AsyncSession = Depends(get_async_db_session),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db_read_session),
+    current_user: User = Depends(get_current_user_read),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    cursor: Optional[str] = Query(None),
     search: Optional[str] = Query(None, min_length=2, max_length=50),
     owner_username: Optional[str] = Query(None),
-    status: Optional[ObjectStatus] = Query(None),
+    course_status: Optional[ObjectStatus] = Query(None, alias="status"),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    sort: str = Query(
+        course_catalog.DEFAULT_SORT,
+        description="Поля через запятую: price, created_at, title; "
+        "минус - по убыванию",
+    ),
 ):
     try:
-        query = (
-            select(Course)
-            .where(CoursePolicy.build_access_condition(current_user))
-            .order_by(Course.created_at.desc())
+        # Страницы одинаковы для всех пользователей класса роли
+        cache_key = catalog_cache.key(request, current_user)
+        page = catalog_cache.get(cache_key)
+        if page is not None:
+            return catalog_cache.respond(request, page)
+        generation = catalog_cache.generation
+
+        ordering = course_catalog.parse_sort(sort)
+        # курсор знает только порядок (created_at desc, id desc)
+        keyset = not search and sort == course_catalog.DEFAULT_SORT
+
+        condition = None
+        if search:
+            condition, rank = course_search.search_clauses(db, search)
+            ordering.insert(0, rank.desc())
+
+        catalog = course_catalog.CatalogQuery(
+            current_user,
+            search_condition=condition,
+            owner_username=owner_username,
+            course_status=course_status,
+            min_price=min_price,
+            max_price=max_price,
         )
+        query = catalog.courses()
 
-        filters = []
-
-        if search:
-            filters.append(
-                or_(
-                    Course.title.ilike(f"%{search}%"),
-                    Course.description.ilike(f"%{search}%"),
-                )
+        if cursor:
+            query = query.where(
+                pagination.cursor_condition(cursor, skip, keyset)
             )
 
-        if owner_username:
-            owner = await db.execute(
-                select(User).where(User.username == owner_username)
+        result = await db.execute(
+            query.order_by(*ordering)
+            .offset(skip)
+            .limit(limit + 1 if keyset else limit)
+        )
+        courses = result.scalars().all()
+
+        # поиск и другие сортировки листаются по skip
+        if keyset:
+            courses = pagination.set_next_link(
+                request, response, courses, limit
             )
-            owner = owner.scalars().first()
-            if not owner:
-                raise HTTPException(404, "User not found")
-            filters.append(Course.owner_id == owner.id)
-
-        if status:
-            if current_user.role == UserRole.admin:
-                filters.append(Course.status == status)
-            else:
-                allowed_statuses = CoursePolicy.allowed_statuses(current_user)
-                if status not in allowed_statuses:
-                    raise HTTPException(403, "Forbidden status filter")
-                filters.append(Course.status == status)
 
-        if filters:
-            query = query.where(and_(*filters))
+        page = serialize_page(courses, response.headers.get("link"))
+        catalog_cache.put(cache_key, page, generation)
+        return catalog_cache.respond(request, page)
 
-        result = await db.execute(
-            query.offset(skip).limit(limit).options(selectinload(Course.owner))
+    except SQLAlchemyError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка базы данных",
         )
 
-        return result.scalars().all()
+    except HTTPException as e:
+        await db.rollback()
+        raise e
+
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.get("/facets", response_model=SCourseFacets)
+async def get_course_facets(
+    db: AsyncSession = Depends(get_async_db_read_session),
+    current_user: User = Depends(get_current_user_read),
+    search: Optional[str] = Query(None, min_length=2, max_length=50),
+    owner_username: Optional[str] = Query(None),
+    course_status: Optional[ObjectStatus] = Query(None, alias="status"),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+):
+    try:
+        condition = None
+        if search:
+            condition, _ = course_search.search_clauses(db, search)
+
+        catalog = course_catalog.CatalogQuery(
+            current_user,
+            search_condition=condition,
+            owner_username=owner_username,
+            course_status=course_status,
+            min_price=min_price,
+            max_price=max_price,
+        )
+        return await course_catalog.get_facets(db, catalog)
 
     except SQLAlchemyError:
         await db.rollback()
@@ -297,48 +329,67 @@ async def get_courses(
         )
 
 
+@router.get("/suggest", response_model=list[SCourseSuggestion])
+async def suggest_courses(
+    claims: dict = Depends(get_token_claims),
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=50),
+):
+    # Подсказки по началу названия опубликованного курса из индекса в
+    # памяти процесса, без запросов к БД
+    return suggest_index.suggest(q, limit)
+
+
 @router.get("/my", response_model=list[SCourseResponse])
 async def get_teacher_courses(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
+    cursor: Optional[str] = Query(None),
     search: Optional[str] = Query(None, min_length=2, max_length=50),
-    status: Optional[ObjectStatus] = Query(None),
-    current_user: User = Depends(get_current_user_teacher),
-    db: AsyncSession = Depends(get_async_db_session),
+    course_status: Optional[ObjectStatus] = Query(None, alias="status"),
+    current_user: TokenUser = Depends(get_current_user_teacher_read),
+    db: AsyncSession = Depends(get_async_db_read_session),
 ):
     try:
-        query = (
-            select(Course)
-            .where(
-                and_(
-                    Course.owner_id == current_user.id,
-                    Course.status != ObjectStatus.archived,
-                )
+        query = select(Course).where(
+            and_(
+                Course.owner_id == current_user.id,
+                Course.status != ObjectStatus.archived,
             )
-            .order_by(Course.created_at.desc())
         )
 
         filters = []
+        ordering = list(pagination.COURSE_ORDERING)
 
-        if search:
+        if cursor:
             filters.append(
-                or_(
-                    Course.title.ilike(f"%{search}%"),
-                    Course.description.ilike(f"%{search}%"),
-                )
+                pagination.cursor_condition(cursor, skip, not search)
             )
 
-        if status:
-            filters.append(Course.status == status)
+        if search:
+            condition, rank = course_search.search_clauses(db, search)
+            filters.append(condition)
+            ordering.insert(0, rank.desc())
+
+        if course_status:
+            filters.append(Course.status == course_status)
 
         if filters:
             query = query.where(and_(*filters))
 
         result = await db.execute(
-            query.offset(skip).limit(limit).options(selectinload(Course.owner))
+            query.order_by(*ordering)
+            .offset(skip)
+            .limit(limit if search else limit + 1)
         )
+        courses = result.scalars().all()
 
-        return result.scalars().all()
+        if search:
+            # курсор не учитывает релевантность: поиск листается по skip
+            return courses
+        return pagination.set_next_link(request, response, courses, limit)
 
     except SQLAlchemyError:
         await db.rollback()
@@ -361,7 +412,7 @@ async def get_teacher_courses(
 @router.get("/archived/", response_model=list[SArchivedCourseResponse])
 async def get_archived_content_tree(
     db: AsyncSession = Depends(get_async_db_session),
-    current_user: User = Depends(get_current_user_teacher),
+    current_user: TokenUser = Depends(get_current_user_teacher),
 ):
     try:
         courses_query = (
@@ -398,14 +449,11 @@ async def get_archived_content_tree(
             )
 
             if hasattr(course, "modules"):
-                all_modules = []
-                for module in course.modules:
-                    all_modules.extend(
-                        module_lesson_helpers.get_all_submodules(module)
-                    )
-
+                # course.modules - все модули курса, включая вложенные
                 archived_modules = [
-                    m for m in all_modules if m.status == ObjectStatus.archived
+                    m
+                    for m in course.modules
+                    if m.status == ObjectStatus.archived
                 ]
 
                 module_map = {m.id: m for m in archived_modules}
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends
+
+from app.auth.rate_limit import rate_limiter
+from app.auth.revocation import revocation_filter
+from app.auth.user_cache import user_cache
+from app.db.base import (
+    engine,
+    pool_stats,
+    read_engine,
+    replica_pool_stats,
+    replica_router,
+)
+from app.dependencies.user import TokenUser, get_current_user_admin
+from app.helpers.catalog_cache import catalog_cache
+from app.helpers.content_cache import content_cache
+from app.helpers.course_suggest import suggest_index
+from app.helpers.obj_exist_check import loader_stats
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+
+@router.get("/db/pool")
+async def get_db_pool_stats(user: TokenUser = Depends(get_current_user_admin)):
+    stats = {
+        "primary": pool_stats.snapshot(engine.pool),
+        "routing": replica_router.stats(),
+    }
+    if read_engine is not None:
+        stats["replica"] = replica_pool_stats.snapshot(read_engine.pool)
+    return stats
+
+
+@router.get("/obj_loader")
+async def get_obj_loader_stats(
+    user: TokenUser = Depends(get_current_user_admin),
+):
+    return loader_stats
+
+
+@router.get("/user_cache")
+async def get_user_cache_stats(
+    user: TokenUser = Depends(get_current_user_admin),
+):
+    return user_cache.stats()
+
+
+@router.get("/revocations")
+async def get_revocation_stats(
+    user: TokenUser = Depends(get_current_user_admin),
+):
+    return revocation_filter.stats()
+
+
+@router.get("/rate_limit")
+async def get_rate_limit_stats(
+    user: TokenUser = Depends(get_current_user_admin),
+):
+    return rate_limiter.stats()
+
+
+@router.get("/catalog_cache")
+async def get_catalog_cache_stats(
+    user: TokenUser = Depends(get_current_user_admin),
+):
+    return catalog_cache.stats()
+
+
+@router.get("/course_suggest")
+async def get_course_suggest_stats(
+    user: TokenUser = Depends(get_current_user_admin),
+):
+    return suggest_index.stats()
+
+
+@router.get("/content_cache")
+async def get_content_cache_stats(
+    user: TokenUser = Depends(get_current_user_admin),
+):
+    return content_cache.stats()
@@ -16,11 +16,12 @@ from app.schemas import (
     SLessonBlockPatch,
 )
 
-from app.helpers import obj_exist_check
+from app.helpers import obj_exist_check, course_stats
 from app.core import settings
 from app.db import (
     User,
     get_async_db_session,
+    get_async_db_read_session,
     Module,
     ObjectStatus,
     Lesson,
@@ -28,7 +29,7 @@ from app.db import (
     LessonBlock,
     LessonBlockType,
 )
-from app.dependencies.user import get_current_user
+from app.dependencies.user import get_current_user, get_current_user_read
 from app.policies import CoursePolicy
 from app.helpers.module_lesson import get_max_order, EntityType
 from app.dependencies.minio import get_minio_client
@@ -44,9 +45,11 @@ async def create_lesson(
     current_user: User = Depends(get_current_user),
 ):
     try:
-        course = await obj_exist_check.course_exists(course_id, db)
         data = lesson_data.model_dump()
         module_id = data.get("module_id")
+        course, module, _ = await obj_exist_check.resolve(
+            db, course_id=course_id, module_id=module_id
+        )
 
         if not module_id:
             await CoursePolicy.check_resource_access(
@@ -68,8 +71,6 @@ async def create_lesson(
             )
 
         else:
-            module = await obj_exist_check.module_exists(module_id, db)
-
             await CoursePolicy.check_resource_access(
                 db, current_user, module, "write", course
             )
@@ -96,6 +97,10 @@ async def create_lesson(
         if module_id:
             db.add(module)
         db.add(lesson)
+        lessons, duration = course_stats.lesson_weight(lesson)
+        await course_stats.apply_delta(
+            db, course_id, lessons=lessons, duration=duration, content=True
+        )
         await db.commit()
         await db.refresh(lesson)
 
@@ -130,8 +135,9 @@ async def create_lesson_block(
     current_user: User = Depends(get_current_user),
 ):
     try:
-        lesson = await obj_exist_check.lesson_exists(lesson_id, db)
-        course = await obj_exist_check.course_exists(course_id, db)
+        course, _, lesson = await obj_exist_check.resolve(
+            db, course_id=course_id, lesson_id=lesson_id
+        )
 
         await CoursePolicy.check_resource_access(
             db, current_user, lesson, "write", course
@@ -199,13 +205,14 @@ async def create_lesson_block(
 async def get_lesson(
     course_id: int,
     lesson_id: int,
-    db: AsyncSession = Depends(get_async_db_session),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db_read_session),
+    current_user: User = Depends(get_current_user_read),
     minio_client: Minio = Depends(get_minio_client),
 ):
     try:
-        course = await obj_exist_check.course_exists(course_id, db)
-        lesson = await obj_exist_check.lesson_exists(lesson_id, db)
+        course, _, lesson = await obj_exist_check.resolve(
+            db, course_id=course_id, lesson_id=lesson_id
+        )
 
         await CoursePolicy.check_resource_access(
             db, current_user, lesson, "read", course
@@ -261,8 +268,9 @@ async def patch_lesson(
     current_user: User = Depends(get_current_user),
 ):
     try:
-        course = await obj_exist_check.course_exists(course_id, db)
-        lesson = await obj_exist_check.lesson_exists(lesson_id, db)
+        course, _, lesson = await obj_exist_check.resolve(
+            db, course_id=course_id, lesson_id=lesson_id
+        )
 
         await CoursePolicy.check_resource_access(
             db, current_user, lesson.module, "write", course
@@ -317,9 +325,18 @@ async def patch_lesson(
             elif new_module.content_type == ModuleContentType.empty:
                 new_module.content_type = ModuleContentType.lessons
 
+        lessons_before, duration_before = course_stats.lesson_weight(lesson)
         for key, value in data.items():
             setattr(lesson, key, value)
-
+        lessons_after, duration_after = course_stats.lesson_weight(lesson)
+
+        await course_stats.apply_delta(
+            db,
+            course_id,
+            lessons=lessons_after - lessons_before,
+            duration=duration_after - duration_before,
+            content=True,
+        )
         await db.commit()
         await db.refresh(lesson)
 
@@ -356,8 +373,9 @@ async def patch_lesson_block(
     db: AsyncSession = Depends(get_async_db_session),
 ):
     try:
-        course = await obj_exist_check.course_exists(course_id, db)
-        lesson = await obj_exist_check.lesson_exists(lesson_id, db)
+        course, _, lesson = await obj_exist_check.resolve(
+            db, course_id=course_id, lesson_id=lesson_id
+        )
         block = await obj_exist_check.lesson_block_exists(block_id, db)
 
         await CoursePolicy.check_resource_access(
@@ -395,15 +413,20 @@ async def delete_lesson(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_db_session),
 ):
-    course = await obj_exist_check.course_exists(course_id, db)
-    lesson = await obj_exist_check.lesson_exists(lesson_id, db)
+    course, _, lesson = await obj_exist_check.resolve(
+        db, course_id=course_id, lesson_id=lesson_id
+    )
 
     await CoursePolicy.check_resource_access(
         db, current_user, lesson, "write", course
     )
 
     try:
+        lessons, duration = course_stats.lesson_weight(lesson)
         await db.delete(lesson)
+        await course_stats.apply_delta(
+            db, course_id, lessons=-lessons, duration=-duration, content=True
+        )
         await db.commit()
 
         return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -5,7 +5,6 @@ from fastapi import (
     status,
     Depends,
 )
-from collections import defaultdict
 from sqlalchemy import select, and_, update
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,21 +15,27 @@ from app.schemas import (
     SModuleResponse,
     SModuleTreeResponse,
     SModuleUpdate,
-    build_module_tree_response,
 )
 
 from app.db import (
     User,
     get_async_db_session,
+    get_async_db_read_session,
     Module,
     ObjectStatus,
     Lesson,
     ModuleContentType,
 )
-from app.dependencies.user import get_current_user
+from app.dependencies.user import get_current_user, get_current_user_read
 from app.policies import CoursePolicy
 from app.helpers.module_lesson import get_max_order, EntityType
-from app.helpers import obj_exist_check, course_queries_utils
+from app.helpers import (
+    obj_exist_check,
+    content_tree,
+    course_queries_utils,
+    course_stats,
+)
+from app.helpers.content_cache import content_cache, content_version
 
 router = APIRouter(prefix="/course", tags=["Module"])
 
@@ -41,60 +46,35 @@ router = APIRouter(prefix="/course", tags=["Module"])
 async def get_module_content(
     course_id: int,
     module_id: int,
-    db: AsyncSession = Depends(get_async_db_session),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db_read_session),
+    current_user: User = Depends(get_current_user_read),
 ):
     try:
 
-        course = await obj_exist_check.course_exists(course_id, db)
-        module = await obj_exist_check.module_exists(module_id, db)
+        course, module, _ = await obj_exist_check.resolve(
+            db, course_id=course_id, module_id=module_id
+        )
 
         await CoursePolicy.check_resource_access(
             db, current_user, module, "read", course
         )
 
-        all_modules = await db.scalars(
-            select(Module).where(Module.course_id == module.course_id)
-        )
-        flat_modules = all_modules.unique().all()
-
-        lessons = await db.scalars(
-            select(Lesson)
-            .where(Lesson.course_id == module.course_id)
-            .order_by(Lesson.order)
-        )
-        all_lessons = lessons.unique().all()
-
-        module_map = {
-            m.id: {"module": m, "children": [], "lessons": []}
-            for m in flat_modules
-        }
-        lessons_by_module = defaultdict(list)
-
-        for lesson in all_lessons:
-            lessons_by_module[lesson.module_id].append(lesson)
-
-        root_module = None
-        for module_data in flat_modules:
-            node = module_map[module_data.id]
-
-            node["lessons"] = lessons_by_module.get(module_data.id, [])
-
-            if module_data.parent_module_id is None:
-                if module_data.id == module_id:
-                    root_module = node
-            else:
-                parent_node = module_map.get(module_data.parent_module_id)
-                if parent_node:
-                    parent_node["children"].append(node)
-
-        if not root_module:
-            root_module = module_map.get(module_id)
+        await CoursePolicy.check_module_belongs_course(module, course)
+        visibility = content_tree.visibility_class(current_user, course)
 
-        if not root_module:
-            raise HTTPException(404, "Структура модуля не найдена")
+        async def build_tree() -> bytes:
+            root = await content_tree.fetch_module_tree(
+                db, course_id, module_id, visibility
+            )
+            if root is None:
+                raise HTTPException(404, "Структура модуля не найдена")
+            return content_tree.serialize_module(root)
 
-        return build_module_tree_response(root_module)
+        body = await content_cache.get_or_fill(
+            (course_id, content_version(course), visibility, module_id),
+            build_tree,
+        )
+        return Response(content=body, media_type="application/json")
 
     except SQLAlchemyError:
         await db.rollback()
@@ -125,7 +105,9 @@ async def create_module(
         data = module_data.model_dump()
         parent_module_id = data.get("parent_module_id")
 
-        course = await obj_exist_check.course_exists(course_id, db)
+        course, parent, _ = await obj_exist_check.resolve(
+            db, course_id=course_id, module_id=parent_module_id
+        )
 
         if parent_module_id is None:
             await CoursePolicy.check_resource_access(
@@ -145,8 +127,6 @@ async def create_module(
                 db, EntityType.MODULE, course_id=course_id
             )
         else:
-            parent = await obj_exist_check.module_exists(parent_module_id, db)
-
             await CoursePolicy.check_resource_access(
                 db, current_user, parent, "write", course
             )
@@ -173,6 +153,7 @@ async def create_module(
         if parent_module_id:
             db.add(parent)
         db.add(module)
+        await course_stats.apply_delta(db, course_id, modules=1, content=True)
         await db.commit()
         await db.refresh(module)
 
@@ -207,15 +188,16 @@ async def patch_module(
     try:
         update_data = data.model_dump(exclude_unset=True)
 
-        course = await obj_exist_check.course_exists(course_id, db)
-        module = await obj_exist_check.module_exists(module_id, db)
+        course, module, _ = await obj_exist_check.resolve(
+            db, course_id=course_id, module_id=module_id
+        )
 
         await CoursePolicy.check_resource_access(
             db, current_user, module, "write", course
         )
 
         if (
-            data.get("status") == ObjectStatus.published
+            update_data.get("status") == ObjectStatus.published
             and course.status == ObjectStatus.draft
         ):
             raise HTTPException(
@@ -224,14 +206,26 @@ async def patch_module(
             )
 
         is_archiving = update_data.get("status") == ObjectStatus.archived
-
-        if is_archiving and module.status != ObjectStatus.archived:
-            await course_queries_utils.archive_children(db, module_id=module_id)
+        was_archived = module.status == ObjectStatus.archived
 
         await db.execute(
             update(Module).where(Module.id == module_id).values(**update_data)
         )
 
+        # архивируется все поддерево - счетчики курса пересчитываются,
+        # из архива возвращается только сам модуль
+        if is_archiving and not was_archived:
+            await course_queries_utils.archive_children(
+                db, course_id=course_id, module_id=module_id
+            )
+        else:
+            restored = (
+                was_archived and "status" in update_data and not is_archiving
+            )
+            await course_stats.apply_delta(
+                db, course_id, modules=int(restored), content=True
+            )
+
         await db.commit()
         await db.refresh(module)
 
@@ -263,8 +257,9 @@ async def delete_module(
     current_user: User = Depends(get_current_user),
 ):
     try:
-        course = await obj_exist_check.course_exists(course_id, db)
-        module = await obj_exist_check.module_exists(module_id, db)
+        course, module, _ = await obj_exist_check.resolve(
+            db, course_id=course_id, module_id=module_id
+        )
 
         if module.parent_module_id is not None:
             parent_module = await db.execute(
@@ -281,6 +276,8 @@ async def delete_module(
         )
 
         await db.delete(module)
+        await db.flush()
+        await course_stats.refresh_course(db, course_id)
         await db.commit()
 
         return Response(status_code=status.HTTP_204_NO_CONTENT)
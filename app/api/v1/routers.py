@@ -6,6 +6,7 @@ from .module import router as module_router
 from .lesson import router as lesson_router
 from .payments import router as payments_router
 from .files import router as files_router
+from .internal import router as internal_router
 
 v1_router = APIRouter(prefix="/api/v1")
 
@@ -15,3 +16,4 @@ v1_router.include_router(module_router)
 v1_router.include_router(lesson_router)
 v1_router.include_router(payments_router)
 v1_router.include_router(files_router)
+v1_router.include_router(internal_router)
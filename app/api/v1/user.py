@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import (
     APIRouter,
     HTTPException,
@@ -6,25 +8,44 @@ from fastapi import (
     Request,
     Depends,
     UploadFile,
+    Query,
 )
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import delete
 from sqlalchemy.exc import SQLAlchemyError
 from minio import Minio
 
 from app.auth.auth import (
-    get_password_hash,
+    get_password_hash_async,
     authenticate_user,
+    access_token_claims,
     create_access_token,
 )
+from app.auth.rate_limit import check_login_rate, check_refresh_rate
+from app.auth.revocation import revoke_token
+from app.auth.user_cache import user_cache
 from app.dao.user import UserDAO
-from app.schemas.user import SUserRegister, SUserAuth
-from app.db import User, get_async_db_session, File, UserRole, RefreshToken
-from app.dependencies.user import get_current_user, get_current_user_admin
+from app.schemas.user import SUserRegister, SUserAuth, SUserResponse
+from app.db import (
+    User,
+    get_async_db_session,
+    get_async_db_session_maker,
+    File,
+    UserRole,
+    RefreshToken,
+)
+from app.dependencies.user import (
+    get_current_user,
+    get_current_user_admin,
+    get_token_claims,
+    TokenUser,
+)
 from app.auth import (
-    get_user_by_refresh_token,
+    rotate_refresh_token,
     create_refresh_token,
     save_refresh_token,
+    hash_refresh_token,
 )
 from app.dependencies.minio import get_minio_client
 from app.core import settings
@@ -46,9 +67,13 @@ user_roles = [r.value for r in UserRole]
 
 
 @router.post("/register/")
-async def register_user(request: Request, user_data: SUserRegister) -> dict:
+async def register_user(
+    request: Request,
+    user_data: SUserRegister,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> dict:
     try:
-        user = await UserDAO.find_one_or_none(email=user_data.email)
+        user = await UserDAO.find_one_or_none(session=db, email=user_data.email)
         if user:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -65,28 +90,34 @@ async def register_user(request: Request, user_data: SUserRegister) -> dict:
             if not token:
                 is_admin = False
             else:
-                user = await get_current_user(token)
-                is_admin = await get_current_user_admin(user=user)
+                claims = get_token_claims(token)
+                is_admin = await get_current_user_admin(claims, db)
             if not is_admin:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Недостаточно прав!",
                 )
-        user_dict["hashed_password"] = get_password_hash(user_data.password)
+        user_dict["hashed_password"] = await get_password_hash_async(
+            user_data.password
+        )
         user_dict.pop("password")
-        await UserDAO.add(**user_dict)
+        await UserDAO.add(session=db, **user_dict)
+        await db.commit()
         return {"message": "Вы успешно зарегистрированы!"}
 
     except SQLAlchemyError:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Ошибка базы данных",
         )
 
     except HTTPException as e:
+        await db.rollback()
         raise e
 
     except Exception as e:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
         )
@@ -100,8 +131,10 @@ async def auth_user(
     db: AsyncSession = Depends(get_async_db_session),
 ):
     try:
+        # до проверки пароля: отклоненные попытки не тратят CPU на хэш
+        await check_login_rate(request, user_data.email)
         user = await authenticate_user(
-            email=user_data.email, password=user_data.password
+            email=user_data.email, password=user_data.password, db=db
         )
         if user is None:
             raise HTTPException(
@@ -118,18 +151,15 @@ async def auth_user(
             except Exception as e:
                 print(f"JSON parse error: {str(e)}")
                 old_refresh_token = None
-        if old_refresh_token:
-            await db.execute(
-                delete(RefreshToken).where(
-                    RefreshToken.token == old_refresh_token
-                )
-            )
-            await db.commit()
 
-        access_token = create_access_token({"sub": str(user.id)})
+        access_token = create_access_token(access_token_claims(user))
         refresh_token = create_refresh_token()
 
-        await save_refresh_token(user.id, refresh_token, db)
+        # старый токен и лишние сессии удаляются при выдаче нового
+        # (в PostgreSQL - тем же запросом)
+        await save_refresh_token(
+            user.id, refresh_token, db, replaces=old_refresh_token
+        )
 
         response.set_cookie(
             key="users_access_token",
@@ -174,6 +204,7 @@ async def refresh_tokens(
     db: AsyncSession = Depends(get_async_db_session),
 ):
     try:
+        await check_refresh_rate(request)
         refresh_token = request.cookies.get("users_refresh_token")
 
         if not refresh_token:
@@ -190,23 +221,17 @@ async def refresh_tokens(
                 detail="Refresh токен не найден",
             )
 
-        user = await get_user_by_refresh_token(refresh_token, db)
+        new_refresh_token = create_refresh_token()
+        user = await rotate_refresh_token(refresh_token, new_refresh_token, db)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Недействительный refresh токен",
             )
-
-        new_access_token = create_access_token({"sub": str(user.id)})
-        new_refresh_token = create_refresh_token()
-
-        await save_refresh_token(user.id, new_refresh_token, db)
-
-        await db.execute(
-            delete(RefreshToken).where(RefreshToken.token == refresh_token)
-        )
         await db.commit()
 
+        new_access_token = create_access_token(access_token_claims(user))
+
         response.set_cookie(
             key="users_access_token",
             value=new_access_token,
@@ -257,17 +282,22 @@ async def logout_user(
     response: Response,
     db: AsyncSession = Depends(get_async_db_session),
     user: User = Depends(get_current_user),
+    claims: dict = Depends(get_token_claims),
 ):
     try:
         refresh_token = request.cookies.get("users_refresh_token")
         if refresh_token:
             await db.execute(
-                delete(RefreshToken).where(RefreshToken.token == refresh_token)
+                delete(RefreshToken).where(
+                    RefreshToken.token_hash == hash_refresh_token(refresh_token)
+                )
             )
-            await db.commit()
+        revoke_token(db, claims)
+        await db.commit()
 
         response.delete_cookie("users_access_token")
         response.delete_cookie("users_refresh_token")
+        user_cache.invalidate(user.id)
 
         return {"message": "Успешный выход из системы"}
 
@@ -290,5 +320,23 @@ async def logout_user(
 
 
 @router.get("/all_users")
-async def get_all_users(user_data: User = Depends(get_current_user_admin)):
-    return await UserDAO.find_all()
+async def get_all_users(
+    user_data: TokenUser = Depends(get_current_user_admin),
+    session_maker: async_sessionmaker = Depends(get_async_db_session_maker),
+    after_id: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """
+    Пользователи в формате NDJSON (один JSON-объект на строку) по
+    возрастанию id. Следующую страницу можно запросить с after_id, равным
+    id последнего полученного пользователя.
+    """
+
+    async def user_lines():
+        async with session_maker() as session:
+            async for user in UserDAO.stream_all(
+                after_id=after_id, limit=limit, session=session
+            ):
+                yield SUserResponse.model_validate(user).model_dump_json() + "\n"
+
+    return StreamingResponse(user_lines(), media_type="application/x-ndjson")
@@ -1,7 +1,52 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.api.v1.routers import v1_router
+from app.auth.auth import shutdown_hash_executor, sweep_refresh_tokens
+from app.auth.rate_limit import rate_limiter
+from app.auth.revocation import revocation_filter, sync_revocations
+from app.core.settings import (
+    AUTH_REFRESH_SWEEP_BATCH_SIZE,
+    AUTH_REFRESH_SWEEP_SECONDS,
+    AUTH_REVOCATION_SYNC_SECONDS,
+    CATALOG_SUGGEST_REFRESH_SECONDS,
+)
+from app.db import async_session_maker
+from app.helpers.course_suggest import refresh_suggest_index, suggest_index
+from app.middleware import QueryStatsMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await revocation_filter.load(async_session_maker)
+    sync_task = asyncio.create_task(
+        sync_revocations(async_session_maker, AUTH_REVOCATION_SYNC_SECONDS)
+    )
+    sweep_task = asyncio.create_task(
+        sweep_refresh_tokens(
+            async_session_maker,
+            AUTH_REFRESH_SWEEP_SECONDS,
+            AUTH_REFRESH_SWEEP_BATCH_SIZE,
+        )
+    )
+    await suggest_index.load(async_session_maker)
+    suggest_task = asyncio.create_task(
+        refresh_suggest_index(
+            async_session_maker, CATALOG_SUGGEST_REFRESH_SECONDS
+        )
+    )
+    yield
+    sync_task.cancel()
+    sweep_task.cancel()
+    suggest_task.cancel()
+    await rate_limiter.backend.close()
+    shutdown_hash_executor()
+
+
+app = FastAPI(lifespan=lifespan)
 
-app = FastAPI()
+app.add_middleware(QueryStatsMiddleware)
 
 app.include_router(v1_router)
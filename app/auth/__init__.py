@@ -3,4 +3,6 @@ from .auth import (
     save_refresh_token,
     get_user_by_refresh_token,
     create_refresh_token,
+    hash_refresh_token,
+    rotate_refresh_token,
 )
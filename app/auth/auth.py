@@ -1,21 +1,40 @@
+import asyncio
+import hashlib
 import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from jose import jwt
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 from pydantic import EmailStr
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import and_, delete, insert, literal, or_, select
 from sqlalchemy.orm import selectinload
 
-from app.db import RefreshToken
+from app.auth.revocation import new_jti
+from app.db import RefreshToken, User, async_session_maker
 from app.core.settings import get_auth_data
 from app.dao.user import UserDAO
 from app.core.settings import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
     REFRESH_TOKEN_EXPIRE_DAYS,
+    AUTH_PASSWORD_HASH_EXECUTOR,
+    AUTH_PASSWORD_HASH_WORKERS,
+    AUTH_ARGON2_TIME_COST,
+    AUTH_ARGON2_MEMORY_COST,
+    AUTH_ARGON2_PARALLELISM,
+    AUTH_REFRESH_MAX_SESSIONS,
 )
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Новые хэши - argon2id. bcrypt оставлен для проверки старых хэшей, они
+# (как и argon2 с устаревшими параметрами) перехэшируются при входе
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=AUTH_ARGON2_TIME_COST,
+    argon2__memory_cost=AUTH_ARGON2_MEMORY_COST,
+    argon2__parallelism=AUTH_ARGON2_PARALLELISM,
+)
 
 
 def get_password_hash(password: str) -> str:
@@ -26,12 +45,83 @@ def verify_password(plain_pwd: str, hashed_pwd: str) -> bool:
     return pwd_context.verify(plain_pwd, hashed_pwd)
 
 
+def verify_and_update_password(
+    plain_pwd: str, hashed_pwd: str
+) -> tuple[bool, str | None]:
+    """Проверяет пароль и возвращает новый хэш, если старый устарел"""
+    return pwd_context.verify_and_update(plain_pwd, hashed_pwd)
+
+
+_hash_executor: Executor | None = None
+
+
+def get_hash_executor() -> Executor:
+    """
+    Пул для хэширования паролей.
+
+    Количество воркеров ограничивает число одновременных вычислений хэша,
+    остальные запросы ждут в очереди пула, не блокируя event loop.
+    """
+    global _hash_executor
+    if _hash_executor is None:
+        if AUTH_PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=AUTH_PASSWORD_HASH_WORKERS
+            )
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=AUTH_PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+    return _hash_executor
+
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hash_executor(), get_password_hash, password
+    )
+
+
+async def verify_password_async(plain_pwd: str, hashed_pwd: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hash_executor(), verify_password, plain_pwd, hashed_pwd
+    )
+
+
+async def verify_and_update_password_async(
+    plain_pwd: str, hashed_pwd: str
+) -> tuple[bool, str | None]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hash_executor(), verify_and_update_password, plain_pwd, hashed_pwd
+    )
+
+
+def access_token_claims(user: User) -> dict:
+    """Claims, по которым проверки ролей обходятся без запроса к БД"""
+    return {
+        "sub": str(user.id),
+        "role": user.role.value,
+        "active": bool(user.is_active),
+    }
+
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(
-        minutes=ACCESS_TOKEN_EXPIRE_MINUTES
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update(
+        {"exp": expire, "iat": int(now.timestamp()), "jti": new_jti()}
     )
-    to_encode.update({"exp": expire})
     auth_data = get_auth_data()
     encode_jwt = jwt.encode(
         to_encode, auth_data["secret_key"], algorithm=auth_data["algorithm"]
@@ -43,14 +133,75 @@ def create_refresh_token():
     return secrets.token_urlsafe(64)
 
 
-async def save_refresh_token(user_id: int, token: str, db: AsyncSession):
-    expires_at = datetime.now(timezone.utc) + timedelta(
-        days=REFRESH_TOKEN_EXPIRE_DAYS
+def hash_refresh_token(token: str) -> str:
+    """
+    Ключ поиска refresh-токена в БД.
+
+    Токен - 512 случайных бит, поэтому соль и медленный хэш не нужны:
+    sha256 не позволяет восстановить токен из утекшей таблицы, а индекс
+    строится по строке фиксированной длины.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def evict_sessions_statement(
+    user_id: int, replaces: str | None = None, max_sessions: int = None
+):
+    """
+    DELETE перед выдачей нового refresh-токена: заменяемый токен replaces
+    и сессии сверх лимита. Новый токен входит в max_sessions, поэтому из
+    остальных сохраняются max_sessions - 1 самых новых.
+    """
+    max_sessions = max_sessions or AUTH_REFRESH_MAX_SESSIONS
+    table = RefreshToken.__table__
+    kept = select(table.c.id).where(table.c.user_id == user_id)
+    if replaces:
+        kept = kept.where(table.c.token_hash != hash_refresh_token(replaces))
+    kept = kept.order_by(table.c.created_at.desc(), table.c.id.desc()).limit(
+        max_sessions - 1
     )
-    db_token = RefreshToken(user_id=user_id, token=token, expires_at=expires_at)
-    db.add(db_token)
+    evicted = and_(table.c.user_id == user_id, table.c.id.not_in(kept))
+    if replaces:
+        evicted = or_(
+            table.c.token_hash == hash_refresh_token(replaces), evicted
+        )
+    return delete(table).where(evicted)
+
+
+async def save_refresh_token(
+    user_id: int,
+    token: str,
+    db: AsyncSession,
+    replaces: str | None = None,
+    max_sessions: int = None,
+):
+    """
+    Выдает пользователю refresh-токен и коммитит транзакцию.
+
+    Заменяемый токен (cookie прошлого входа) и сессии сверх
+    AUTH_REFRESH_MAX_SESSIONS удаляются тем же запросом, что вставляет
+    новый: в PostgreSQL DELETE выполняется в CTE при INSERT. В остальных
+    СУБД - DELETE и INSERT отдельными запросами.
+    """
+    now = datetime.now(timezone.utc)
+    evict = evict_sessions_statement(user_id, replaces, max_sessions)
+    new = (
+        insert(RefreshToken)
+        .values(
+            user_id=user_id,
+            token_hash=hash_refresh_token(token),
+            expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+            created_at=now,
+        )
+        .returning(RefreshToken)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        # CTE видит снимок до INSERT: новый токен вытеснение не затронет
+        new = new.add_cte(evict.cte("evicted"))
+    else:
+        await db.execute(evict)
+    db_token = await db.scalar(new)
     await db.commit()
-    await db.refresh(db_token)
 
     return db_token
 
@@ -59,7 +210,7 @@ async def get_user_by_refresh_token(token: str, db: AsyncSession):
     result = await db.execute(
         select(RefreshToken)
         .where(
-            RefreshToken.token == token,
+            RefreshToken.token_hash == hash_refresh_token(token),
             RefreshToken.expires_at > datetime.now(timezone.utc),
         )
         .options(selectinload(RefreshToken.user))
@@ -68,8 +219,139 @@ async def get_user_by_refresh_token(token: str, db: AsyncSession):
     return token_record.user if token_record else None
 
 
-async def authenticate_user(email: EmailStr, password: str):
-    user = await UserDAO.find_one_or_none(email=email)
-    if not user or verify_password(password, user.hashed_password) is False:
+def _rotation_parts(token: str, new_token: str):
+    """DELETE ... RETURNING user_id старого токена и поля нового"""
+    now = datetime.now(timezone.utc)
+    table = RefreshToken.__table__
+    old = (
+        delete(table)
+        .where(
+            table.c.token_hash == hash_refresh_token(token),
+            table.c.expires_at > now,
+        )
+        .returning(table.c.user_id)
+    )
+    values = {
+        "token_hash": hash_refresh_token(new_token),
+        "expires_at": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        "created_at": now,
+    }
+    return old, values
+
+
+def rotation_statement(token: str, new_token: str):
+    """
+    Ротация одним запросом PostgreSQL: DELETE ... RETURNING user_id и
+    INSERT в CTE, пользователь выбирается из результата INSERT.
+    """
+    table = RefreshToken.__table__
+    old, values = _rotation_parts(token, new_token)
+    old = old.cte("old_token")
+    new = (
+        insert(table)
+        .from_select(
+            ["user_id", *values],
+            select(
+                old.c.user_id,
+                *(
+                    literal(value, table.c[key].type)
+                    for key, value in values.items()
+                ),
+            ),
+        )
+        .returning(table.c.user_id)
+        .cte("new_token")
+    )
+    return select(User).join(new, User.id == new.c.user_id)
+
+
+async def rotate_refresh_token(
+    token: str, new_token: str, db: AsyncSession
+) -> User | None:
+    """
+    Заменяет действующий refresh-токен новым и возвращает его владельца.
+
+    В PostgreSQL это один запрос (rotation_statement): старый токен
+    удаляется только вместе с выдачей нового, а из двух одновременных
+    ротаций одного токена успешна только одна. В остальных СУБД - те же
+    шаги отдельными запросами в одной транзакции. Коммит - на вызывающем.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return await db.scalar(rotation_statement(token, new_token))
+
+    old, values = _rotation_parts(token, new_token)
+    user_id = await db.scalar(old)
+    if user_id is None:
         return None
+    await db.execute(
+        insert(RefreshToken.__table__).values(user_id=user_id, **values)
+    )
+    return await db.get(User, user_id)
+
+
+async def delete_expired_refresh_tokens(
+    session_maker: async_sessionmaker, batch_size: int
+) -> int:
+    """
+    Удаляет истекшие refresh-токены порциями по batch_size строк, каждая
+    порция - отдельная короткая транзакция. Возвращает число удаленных.
+    """
+    deleted = 0
+    while True:
+        expired = (
+            select(RefreshToken.id)
+            .where(RefreshToken.expires_at < datetime.now(timezone.utc))
+            .limit(batch_size)
+            # несколько процессов не удаляют одни и те же строки
+            .with_for_update(skip_locked=True)
+        )
+        async with session_maker() as session:
+            result = await session.execute(
+                delete(RefreshToken)
+                .where(RefreshToken.id.in_(expired))
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+        # не занимаем event loop, пока чистится большой хвост
+        await asyncio.sleep(0)
+
+
+async def sweep_refresh_tokens(
+    session_maker: async_sessionmaker, interval: float, batch_size: int
+):
+    """Фоновое удаление истекших refresh-токенов"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await delete_expired_refresh_tokens(session_maker, batch_size)
+        except Exception as e:
+            print(f"Refresh token sweep failed: {e}")
+
+
+async def authenticate_user(
+    email: EmailStr, password: str, db: AsyncSession | None = None
+):
+    if db is None:
+        async with async_session_maker() as session:
+            user = await authenticate_user(email, password, session)
+            await session.commit()
+            return user
+
+    user = await UserDAO.find_one_or_none(session=db, email=email)
+    if not user:
+        return None
+
+    is_valid, new_hash = await verify_and_update_password_async(
+        password, user.hashed_password
+    )
+    if not is_valid:
+        return None
+
+    if new_hash is not None:
+        # изменение ORM-объекта: при коммите логина из кэша пользователей
+        # уходит только этот id, bulk UPDATE users сбросил бы весь кэш
+        user.hashed_password = new_hash
     return user
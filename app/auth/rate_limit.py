@@ -0,0 +1,323 @@
+import asyncio
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Protocol
+from urllib.parse import urlparse
+
+from fastapi import HTTPException, Request, status
+
+from app.core.settings import (
+    AUTH_LOGIN_EMAIL_BURST,
+    AUTH_LOGIN_EMAIL_PER_MINUTE,
+    AUTH_LOGIN_IP_BURST,
+    AUTH_LOGIN_IP_PER_MINUTE,
+    AUTH_RATE_LIMIT_BACKEND,
+    AUTH_RATE_LIMIT_ENABLED,
+    AUTH_RATE_LIMIT_MAX_KEYS,
+    AUTH_RATE_LIMIT_REDIS_URL,
+    AUTH_REFRESH_IP_BURST,
+    AUTH_REFRESH_IP_PER_MINUTE,
+)
+
+
+class Bucket(NamedTuple):
+    name: str
+    capacity: int
+    per_second: float
+
+
+LOGIN_EMAIL = Bucket(
+    "login_email", AUTH_LOGIN_EMAIL_BURST, AUTH_LOGIN_EMAIL_PER_MINUTE / 60
+)
+LOGIN_IP = Bucket(
+    "login_ip", AUTH_LOGIN_IP_BURST, AUTH_LOGIN_IP_PER_MINUTE / 60
+)
+REFRESH_IP = Bucket(
+    "refresh_ip", AUTH_REFRESH_IP_BURST, AUTH_REFRESH_IP_PER_MINUTE / 60
+)
+
+
+def refill(
+    tokens: float,
+    updated_at: float,
+    now: float,
+    capacity: int,
+    per_second: float,
+    cost: int = 1,
+) -> tuple[float, float]:
+    """
+    Один шаг token bucket: пополняет корзину за прошедшее время и пытается
+    списать cost. Возвращает новый остаток и сколько секунд ждать до
+    следующей попытки (0 - попытка разрешена).
+    """
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * per_second)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / per_second
+
+
+class RateLimitBackend(Protocol):
+    async def take(self, key: str, bucket: Bucket) -> float:
+        """Списывает токен; возвращает 0 или время ожидания в секундах"""
+
+    def reset(self): ...
+
+    async def close(self): ...
+
+
+class MemoryBackend:
+    """
+    Корзины в памяти процесса. Лимит действует на каждый worker отдельно.
+    Число ключей ограничено: дольше всех не использованные вытесняются.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, bucket: Bucket) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (bucket.capacity, now))
+        tokens, retry_after = refill(
+            tokens, updated_at, now, bucket.capacity, bucket.per_second
+        )
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def reset(self):
+        self._buckets.clear()
+
+    async def close(self):
+        pass
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RespError(Exception):
+    pass
+
+
+class RespClient:
+    """
+    Минимальный клиент протокола Redis (RESP2) поверх asyncio.
+
+    Одно соединение, команды выполняются по очереди: для лимитера, где
+    каждая команда - один быстрый скрипт, этого достаточно. Подходит для
+    Redis, Valkey, KeyDB и других серверов с этим протоколом.
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port
+        )
+        if self.password:
+            await self._call("AUTH", self.password)
+        if self.db:
+            await self._call("SELECT", self.db)
+
+    async def _read(self):
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Соединение закрыто сервером")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise RespError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2].decode()
+        if prefix == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [await self._read() for _ in range(length)]
+        raise RespError(f"Неизвестный тип ответа: {line!r}")
+
+    async def _call(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await self._read()
+
+    async def execute(self, *args):
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await asyncio.wait_for(self._connect(), self.timeout)
+                return await asyncio.wait_for(self._call(*args), self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                # после ошибки поток ответов рассинхронизирован
+                await self.close()
+                raise
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+# Тот же шаг, что refill, но атомарно на сервере. Время берется у сервера,
+# чтобы расхождение часов между процессами не влияло на пополнение
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * per_second)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / per_second
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / per_second) + 1)
+return tostring(retry_after)
+"""
+TAKE_SCRIPT_SHA = hashlib.sha1(TAKE_SCRIPT.encode()).hexdigest()
+
+
+class RedisBackend:
+    """
+    Общие для всех процессов корзины в Redis-совместимом хранилище.
+
+    Шаг корзины - Lua-скрипт (EVALSHA, при NOSCRIPT - EVAL), поэтому
+    одновременные попытки из разных процессов не теряют списания.
+    """
+
+    def __init__(self, client: RespClient, prefix: str = "rate_limit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, bucket: Bucket) -> float:
+        args = (1, self.prefix + key, bucket.capacity, repr(bucket.per_second))
+        try:
+            reply = await self.client.execute("EVALSHA", TAKE_SCRIPT_SHA, *args)
+        except RespError as e:
+            if not str(e).startswith("NOSCRIPT"):
+                raise
+            reply = await self.client.execute("EVAL", TAKE_SCRIPT, *args)
+        return float(reply)
+
+    def reset(self):
+        pass
+
+    async def close(self):
+        await self.client.close()
+
+
+class RateLimiter:
+    """
+    Token bucket поверх подключаемого хранилища со счетчиками для метрик.
+
+    При недоступном хранилище попытки пропускаются (fail open): отказ
+    Redis не должен блокировать вход всем пользователям.
+    """
+
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.backend.reset()
+        self.allowed: dict[str, int] = {}
+        self.rejected: dict[str, int] = {}
+        self.backend_errors = 0
+
+    async def hit(self, bucket: Bucket, key: str) -> float:
+        if not self.enabled:
+            return 0.0
+        try:
+            retry_after = await self.backend.take(
+                f"{bucket.name}:{key}", bucket
+            )
+        except Exception as e:
+            print(f"Rate limit backend failed: {e}")
+            self.backend_errors += 1
+            return 0.0
+        counter = self.rejected if retry_after else self.allowed
+        counter[bucket.name] = counter.get(bucket.name, 0) + 1
+        return retry_after
+
+    async def check(self, *hits: tuple[Bucket, str]):
+        """
+        Проверяет корзины по порядку, при превышении - 429. Следующие
+        корзины после отказа не списываются: запросы с заблокированного
+        адреса не расходуют лимит почты.
+        """
+        for bucket, key in hits:
+            retry_after = await self.hit(bucket, key)
+            if retry_after:
+                break
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Слишком много попыток, повторите позже",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    def stats(self) -> dict:
+        stats = {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "backend_errors": self.backend_errors,
+        }
+        if isinstance(self.backend, MemoryBackend):
+            stats["keys"] = len(self.backend)
+        return stats
+
+
+def create_backend() -> RateLimitBackend:
+    if AUTH_RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(RespClient(AUTH_RATE_LIMIT_REDIS_URL))
+    return MemoryBackend(max_keys=AUTH_RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = RateLimiter(create_backend(), enabled=AUTH_RATE_LIMIT_ENABLED)
+
+
+def client_ip(request: Request) -> str:
+    # За прокси адрес клиента подставляет uvicorn --proxy-headers
+    return request.client.host if request.client else "unknown"
+
+
+async def check_login_rate(request: Request, email: str):
+    await rate_limiter.check(
+        (LOGIN_IP, client_ip(request)), (LOGIN_EMAIL, email.lower())
+    )
+
+
+async def check_refresh_rate(request: Request):
+    await rate_limiter.check((REFRESH_IP, client_ip(request)))
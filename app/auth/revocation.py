@@ -0,0 +1,289 @@
+import asyncio
+import math
+from datetime import datetime, timedelta, timezone
+from hashlib import blake2b
+from uuid import uuid4
+
+from sqlalchemy import delete, event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.settings import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    AUTH_REVOCATION_BLOOM_CAPACITY,
+    AUTH_REVOCATION_BLOOM_ERROR_RATE,
+)
+from app.db import TokenRevocation, User
+
+# Изменение этих полей пользователя через ORM отзывает все его access-токены.
+# Массовые UPDATE по users событие flush не видят: после них нужно вызвать
+# revoke_user_tokens
+REVOKING_USER_FIELDS = ("role", "is_active")
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite возвращает datetime без часового пояса, время хранится в UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class BloomFilter:
+    """
+    Фильтр Блума с двойным хэшированием (Kirsch-Mitzenmacher).
+
+    Ложных отрицаний нет, доля ложных срабатываний при заполнении до
+    capacity не превышает error_rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, int(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[pos >> 3] & (1 << (pos & 7))
+            for pos in self._positions(key)
+        )
+
+
+class RevocationFilter:
+    """
+    Отозванные access-токены в памяти процесса.
+
+    Проверка токена - O(1): фильтр Блума отсекает подавляющее большинство
+    неотозванных jti, точное множество подтверждает срабатывание. Отзыв
+    всех токенов пользователя хранится как время, раньше которого токены
+    (по iat) недействительны.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._jtis: dict[str, float] = {}
+        self._users: dict[int, tuple[float, float]] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self.last_id = 0
+
+        self.checks = 0
+        self.bloom_positives = 0
+        self.revoked_hits = 0
+
+    def revoke_jti(self, jti: str, expires_at: float):
+        self._jtis[jti] = expires_at
+        self._bloom.add(jti)
+        if self._bloom.count > self.capacity:
+            self._rebuild_bloom()
+
+    def revoke_user(self, user_id: int, revoked_at: float, expires_at: float):
+        # iat токена - целое число секунд, поэтому отзываются и токены,
+        # выпущенные в ту же секунду, что и отзыв
+        cutoff = math.floor(revoked_at)
+        current = self._users.get(user_id)
+        if current is None or current[0] < cutoff:
+            self._users[user_id] = (cutoff, expires_at)
+
+    def apply(self, revocation: TokenRevocation):
+        expires_at = _timestamp(revocation.expires_at)
+        if revocation.jti is not None:
+            self.revoke_jti(revocation.jti, expires_at)
+        elif revocation.user_id is not None:
+            self.revoke_user(
+                revocation.user_id,
+                _timestamp(revocation.revoked_at),
+                expires_at,
+            )
+
+    def is_revoked(self, claims: dict) -> bool:
+        self.checks += 1
+        jti = claims.get("jti")
+        if jti is not None and jti in self._bloom:
+            self.bloom_positives += 1
+            if jti in self._jtis:
+                self.revoked_hits += 1
+                return True
+
+        user_revocation = self._users.get(int(claims["sub"]))
+        if user_revocation is not None and claims.get("iat", 0) <= (
+            user_revocation[0]
+        ):
+            self.revoked_hits += 1
+            return True
+        return False
+
+    def _rebuild_bloom(self):
+        capacity = max(self.capacity, len(self._jtis) * 2)
+        self._bloom = BloomFilter(capacity, self.error_rate)
+        for jti in self._jtis:
+            self._bloom.add(jti)
+
+    def purge(self, now: float):
+        """Удаляет записи, чьи токены истекли сами"""
+        expired = [jti for jti, exp in self._jtis.items() if exp < now]
+        for jti in expired:
+            del self._jtis[jti]
+        for user_id, (_, exp) in list(self._users.items()):
+            if exp < now:
+                del self._users[user_id]
+        if expired:
+            self._rebuild_bloom()
+
+    def reset(self):
+        self._jtis.clear()
+        self._users.clear()
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        self.last_id = 0
+        self.checks = self.bloom_positives = self.revoked_hits = 0
+
+    async def load(self, session_maker: async_sessionmaker):
+        """Загружает новые (id > last_id) неистекшие записи отзыва"""
+        async with session_maker() as session:
+            rows = await session.scalars(
+                select(TokenRevocation)
+                .where(
+                    TokenRevocation.id > self.last_id,
+                    TokenRevocation.expires_at > datetime.now(timezone.utc),
+                )
+                .order_by(TokenRevocation.id)
+            )
+            # last_id двигается только здесь: записи, примененные после
+            # локального коммита, могут обогнать записи других процессов
+            for revocation in rows:
+                self.apply(revocation)
+                self.last_id = max(self.last_id, revocation.id)
+
+    def stats(self) -> dict:
+        return {
+            "revoked_tokens": len(self._jtis),
+            "revoked_users": len(self._users),
+            "bloom_bits": self._bloom.size,
+            "bloom_hash_count": self._bloom.hash_count,
+            "bloom_items": self._bloom.count,
+            "checks": self.checks,
+            "bloom_positives": self.bloom_positives,
+            "revoked_hits": self.revoked_hits,
+            "last_id": self.last_id,
+        }
+
+
+revocation_filter = RevocationFilter(
+    capacity=AUTH_REVOCATION_BLOOM_CAPACITY,
+    error_rate=AUTH_REVOCATION_BLOOM_ERROR_RATE,
+)
+
+
+def _access_token_expiry(now: datetime) -> datetime:
+    return now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+
+def _stage(session, revocation: TokenRevocation):
+    session.add(revocation)
+    session.info.setdefault("token_revocations", []).append(revocation)
+
+
+def revoke_token(db: AsyncSession, claims: dict):
+    """Отзывает один токен; применяется в памяти после коммита"""
+    jti = claims.get("jti")
+    if jti is None:
+        return
+    _stage(
+        db.sync_session,
+        TokenRevocation(
+            jti=jti,
+            user_id=int(claims["sub"]),
+            expires_at=datetime.fromtimestamp(claims["exp"], tz=timezone.utc),
+        ),
+    )
+
+
+def revoke_user_tokens(db: AsyncSession, user_id: int):
+    """Отзывает все выпущенные до этого момента токены пользователя"""
+    now = datetime.now(timezone.utc)
+    _stage(
+        db.sync_session,
+        TokenRevocation(
+            user_id=user_id,
+            revoked_at=now,
+            expires_at=_access_token_expiry(now),
+        ),
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _revoke_on_user_change(session, flush_context, instances):
+    for obj in list(session.dirty):
+        if not isinstance(obj, User) or obj.id is None:
+            continue
+        state = inspect(obj)
+        if any(
+            state.attrs[field].history.has_changes()
+            for field in REVOKING_USER_FIELDS
+        ):
+            now = datetime.now(timezone.utc)
+            _stage(
+                session,
+                TokenRevocation(
+                    user_id=obj.id,
+                    revoked_at=now,
+                    expires_at=_access_token_expiry(now),
+                ),
+            )
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_revocations(session):
+    for revocation in session.info.pop("token_revocations", ()):
+        revocation_filter.apply(revocation)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_revocations(session):
+    session.info.pop("token_revocations", None)
+
+
+async def sync_revocations(session_maker: async_sessionmaker, interval: float):
+    """
+    Фоновая синхронизация с БД: подхватывает отзывы других процессов и
+    удаляет истекшие записи.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await revocation_filter.load(session_maker)
+            now = datetime.now(timezone.utc)
+            revocation_filter.purge(now.timestamp())
+            async with session_maker() as session:
+                await session.execute(
+                    delete(TokenRevocation).where(
+                        TokenRevocation.expires_at < now
+                    )
+                )
+                await session.commit()
+        except Exception as e:
+            print(f"Token revocation sync failed: {e}")
+
+
+def new_jti() -> str:
+    return uuid4().hex
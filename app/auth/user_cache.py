@@ -0,0 +1,146 @@
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core import settings
+from app.db import User
+
+# Маркер в session.info: после коммита сбросить весь кэш
+INVALIDATE_ALL = "*"
+
+
+class UserCache:
+    """
+    LRU-кэш пользователей с TTL для get_current_user.
+
+    Хранятся значения колонок, а не ORM-объекты: при попадании объект
+    присоединяется к сессии запроса без обращения к БД. Счетчик поколений
+    не дает запросу, прочитавшему пользователя до инвалидации, положить
+    в кэш устаревшие данные.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        ttl_seconds: float = 30.0,
+        max_size: int = 10_000,
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+
+        self._entries: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+        self.generation = 0
+        self.reset()
+
+    def reset(self):
+        self._entries.clear()
+        self.generation += 1
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> dict | None:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(user_id)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+            self._entries.pop(user_id, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user: User, generation: int):
+        if not self.enabled or generation != self.generation:
+            return
+        values = {
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(User).column_attrs
+        }
+        self._entries[user.id] = (time.monotonic(), values)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        self.generation += 1
+        self.invalidations += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self.generation += 1
+        self.invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+
+user_cache = UserCache(
+    enabled=settings.AUTH_USER_CACHE_ENABLED,
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+    max_size=settings.AUTH_USER_CACHE_MAX_SIZE,
+)
+
+
+async def attach_cached_user(db, values: dict) -> User:
+    """Присоединяет пользователя из кэша к сессии без запроса к БД"""
+    user = User(**values)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+def _pending(session) -> set:
+    return session.info.setdefault("user_cache_invalidate", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            _pending(session).add(obj.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_changes(orm_execute_state):
+    statement = orm_execute_state.statement
+    if (
+        isinstance(statement, UpdateBase)
+        and getattr(statement.table, "name", None) == User.__tablename__
+        and (orm_execute_state.is_update or orm_execute_state.is_delete)
+    ):
+        # затронутые строки заранее неизвестны
+        _pending(orm_execute_state.session).add(INVALIDATE_ALL)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session):
+    pending = session.info.pop("user_cache_invalidate", None)
+    if not pending:
+        return
+    if INVALIDATE_ALL in pending:
+        user_cache.clear()
+        return
+    for user_id in pending:
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop("user_cache_invalidate", None)
@@ -4,7 +4,7 @@ import aio_pika
 from sqlalchemy import select
 
 from app.db import get_async_db_session, CoursePurchase
-from app.helpers import payments, obj_exist_check
+from app.helpers import payments, obj_exist_check, course_stats
 from app.schemas import SCoursePaymentRequest
 from app.core.rabbitmq import get_rabbitmq_connection
 
@@ -81,6 +81,9 @@ async def process_payment_request(message: aio_pika.IncomingMessage):
                         transaction_id=transaction.id,
                     )
                     db_session.add(cp)
+                    await course_stats.apply_delta(
+                        db_session, course.id, purchases=1
+                    )
                     await db_session.commit()
                     print(
                         f" [✔] Payment for course {course_id} by user {user_id} processed successfully. Transaction ID: {transaction.id}, Intent ID: {payment_intent_id}"
@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import SecretStr, Field
@@ -13,6 +14,19 @@ class DBSettings(BaseSettings):
     host: str = "localhost"
     port: int = 5432
     echo: bool = False
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100
+    pgbouncer: bool = False
+    replica_host: str | None = None
+    replica_port: int | None = None
+    replica_name: str | None = None
+    replica_max_lag_seconds: float = 5.0
+    replica_lag_check_interval: float = 1.0
+    read_your_writes_seconds: float = 5.0
 
     model_config = SettingsConfigDict(
         extra="forbid",
@@ -44,6 +58,59 @@ class RabbitMQSettings(BaseSettings):
     )
 
 
+class AuthSettings(BaseSettings):
+    user_cache_enabled: bool = True
+    user_cache_ttl_seconds: float = 30.0
+    user_cache_max_size: int = 10_000
+    password_hash_executor: Literal["thread", "process"] = "thread"
+    password_hash_workers: int = 4
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536
+    argon2_parallelism: int = 4
+    revocation_bloom_capacity: int = 100_000
+    revocation_bloom_error_rate: float = 0.001
+    revocation_sync_seconds: float = 5.0
+    refresh_max_sessions: int = 10
+    refresh_sweep_seconds: float = 300.0
+    refresh_sweep_batch_size: int = 1000
+    rate_limit_enabled: bool = True
+    rate_limit_backend: Literal["memory", "redis"] = "memory"
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    rate_limit_max_keys: int = 100_000
+    login_email_burst: int = 5
+    login_email_per_minute: float = 5.0
+    login_ip_burst: int = 20
+    login_ip_per_minute: float = 60.0
+    refresh_ip_burst: int = 30
+    refresh_ip_per_minute: float = 120.0
+
+    model_config = SettingsConfigDict(
+        extra="forbid",
+    )
+
+
+class CatalogSettings(BaseSettings):
+    cache_enabled: bool = True
+    cache_ttl_seconds: float = 60.0
+    cache_max_entries: int = 1000
+    cache_max_bytes: int = 32 * 1024 * 1024
+    suggest_refresh_seconds: float = 300.0
+
+    model_config = SettingsConfigDict(
+        extra="forbid",
+    )
+
+
+class ContentSettings(BaseSettings):
+    cache_enabled: bool = True
+    cache_max_entries: int = 500
+    cache_max_bytes: int = 64 * 1024 * 1024
+
+    model_config = SettingsConfigDict(
+        extra="forbid",
+    )
+
+
 class Settings(BaseSettings):
     app_name: str = "EduMaster"
     debug: bool = False
@@ -52,6 +119,9 @@ class Settings(BaseSettings):
     rabbitmq_settings: RabbitMQSettings = Field(
         default_factory=RabbitMQSettings
     )
+    auth_settings: AuthSettings = Field(default_factory=AuthSettings)
+    catalog_settings: CatalogSettings = Field(default_factory=CatalogSettings)
+    content_settings: ContentSettings = Field(default_factory=ContentSettings)
     secret_key: str
     algorithm: str
 
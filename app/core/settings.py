@@ -18,8 +18,35 @@ DB_NAME = settings.db_settings.name
 SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 print(SQLALCHEMY_DATABASE_URL)
 
+# Реплика для чтения (если не задана, чтение идет с основной БД)
+DB_REPLICA_HOST = settings.db_settings.replica_host
+DB_REPLICA_PORT = settings.db_settings.replica_port or DB_PORT
+DB_REPLICA_NAME = settings.db_settings.replica_name or DB_NAME
+
+SQLALCHEMY_REPLICA_DATABASE_URL = (
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_REPLICA_NAME}"
+    if DB_REPLICA_HOST
+    else None
+)
+
+DB_REPLICA_MAX_LAG_SECONDS = settings.db_settings.replica_max_lag_seconds
+DB_REPLICA_LAG_CHECK_INTERVAL = settings.db_settings.replica_lag_check_interval
+# Сколько секунд после записи пользователь читает с основной БД
+DB_READ_YOUR_WRITES_SECONDS = settings.db_settings.read_your_writes_seconds
+
 SQLALCHEMY_ECHO = settings.db_settings.echo == "true"
 
+DB_POOL_SIZE = settings.db_settings.pool_size
+DB_MAX_OVERFLOW = settings.db_settings.max_overflow
+DB_POOL_TIMEOUT = settings.db_settings.pool_timeout
+DB_POOL_RECYCLE = settings.db_settings.pool_recycle
+DB_POOL_PRE_PING = settings.db_settings.pool_pre_ping
+# Размер кэша prepared statements asyncpg (0 - кэш отключен)
+DB_STATEMENT_CACHE_SIZE = settings.db_settings.statement_cache_size
+# Режим совместимости с PgBouncer (transaction pooling): без серверных
+# prepared statements
+DB_PGBOUNCER = settings.db_settings.pgbouncer
+
 MINIO_USER = settings.minio_settings.user
 MINIO_PASSWORD = settings.minio_settings.password.get_secret_value()
 MINIO_ACCESS_KEY = settings.minio_settings.access_key
@@ -38,6 +65,65 @@ RABBITMQ_PASS = settings.rabbitmq_settings.password.get_secret_value()
 ACCESS_TOKEN_EXPIRE_MINUTES = 1 * 24 * 60  # 1 день
 REFRESH_TOKEN_EXPIRE_DAYS = 30  # 30 дней
 
+# Кэш пользователей в get_current_user
+AUTH_USER_CACHE_ENABLED = settings.auth_settings.user_cache_enabled
+AUTH_USER_CACHE_TTL_SECONDS = settings.auth_settings.user_cache_ttl_seconds
+AUTH_USER_CACHE_MAX_SIZE = settings.auth_settings.user_cache_max_size
+
+# Пул для хэширования паролей: "thread" (argon2 и bcrypt отпускают GIL)
+# или "process"
+AUTH_PASSWORD_HASH_EXECUTOR = settings.auth_settings.password_hash_executor
+AUTH_PASSWORD_HASH_WORKERS = settings.auth_settings.password_hash_workers
+
+# Параметры argon2id: число проходов, память в КиБ, число потоков
+AUTH_ARGON2_TIME_COST = settings.auth_settings.argon2_time_cost
+AUTH_ARGON2_MEMORY_COST = settings.auth_settings.argon2_memory_cost
+AUTH_ARGON2_PARALLELISM = settings.auth_settings.argon2_parallelism
+
+# Фильтр отозванных access-токенов
+AUTH_REVOCATION_BLOOM_CAPACITY = (
+    settings.auth_settings.revocation_bloom_capacity
+)
+AUTH_REVOCATION_BLOOM_ERROR_RATE = (
+    settings.auth_settings.revocation_bloom_error_rate
+)
+# Как часто подгружать отзывы, сделанные другими процессами
+AUTH_REVOCATION_SYNC_SECONDS = settings.auth_settings.revocation_sync_seconds
+
+# Refresh-токены: сколько сессий держит один пользователь (старые
+# вытесняются) и как часто и какими порциями удаляются истекшие токены
+AUTH_REFRESH_MAX_SESSIONS = settings.auth_settings.refresh_max_sessions
+AUTH_REFRESH_SWEEP_SECONDS = settings.auth_settings.refresh_sweep_seconds
+AUTH_REFRESH_SWEEP_BATCH_SIZE = settings.auth_settings.refresh_sweep_batch_size
+
+# Ограничение частоты логинов и обновлений токенов (token bucket):
+# burst - емкость корзины, per_minute - скорость пополнения
+AUTH_RATE_LIMIT_ENABLED = settings.auth_settings.rate_limit_enabled
+AUTH_RATE_LIMIT_BACKEND = settings.auth_settings.rate_limit_backend
+AUTH_RATE_LIMIT_REDIS_URL = settings.auth_settings.rate_limit_redis_url
+AUTH_RATE_LIMIT_MAX_KEYS = settings.auth_settings.rate_limit_max_keys
+AUTH_LOGIN_EMAIL_BURST = settings.auth_settings.login_email_burst
+AUTH_LOGIN_EMAIL_PER_MINUTE = settings.auth_settings.login_email_per_minute
+AUTH_LOGIN_IP_BURST = settings.auth_settings.login_ip_burst
+AUTH_LOGIN_IP_PER_MINUTE = settings.auth_settings.login_ip_per_minute
+AUTH_REFRESH_IP_BURST = settings.auth_settings.refresh_ip_burst
+AUTH_REFRESH_IP_PER_MINUTE = settings.auth_settings.refresh_ip_per_minute
+
+# Кэш ответов каталога курсов (GET /course/)
+CATALOG_CACHE_ENABLED = settings.catalog_settings.cache_enabled
+CATALOG_CACHE_TTL_SECONDS = settings.catalog_settings.cache_ttl_seconds
+CATALOG_CACHE_MAX_ENTRIES = settings.catalog_settings.cache_max_entries
+CATALOG_CACHE_MAX_BYTES = settings.catalog_settings.cache_max_bytes
+# Период перестройки индекса подсказок (GET /course/suggest)
+CATALOG_SUGGEST_REFRESH_SECONDS = (
+    settings.catalog_settings.suggest_refresh_seconds
+)
+
+# Кэш деревьев содержимого курса (GET /course/{id}/content/, модуль)
+CONTENT_CACHE_ENABLED = settings.content_settings.cache_enabled
+CONTENT_CACHE_MAX_ENTRIES = settings.content_settings.cache_max_entries
+CONTENT_CACHE_MAX_BYTES = settings.content_settings.cache_max_bytes
+
 
 def get_auth_data():
     return {"secret_key": settings.secret_key, "algorithm": settings.algorithm}
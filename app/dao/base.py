@@ -1,146 +1,373 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update as sqlalchemy_update, delete as sqlalchemy_delete
+from sqlalchemy import (
+    update as sqlalchemy_update,
+    delete as sqlalchemy_delete,
+    insert as sqlalchemy_insert,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.db import async_session_maker
 
+# Размер пачки для массовых операций: 1000 строк * ~10 колонок укладываются
+# в лимит 32767 параметров на запрос у PostgreSQL
+BULK_CHUNK_SIZE = 1000
+# Сколько строк за раз забирается из серверного курсора при потоковом чтении
+STREAM_BATCH_SIZE = 500
+
+
+def _chunks(rows: list, size: int):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
 
 class BaseDAO:
+    """
+    Все методы принимают необязательный аргумент session.
+
+    Если сессия передана (например, сессия запроса из get_async_db_session),
+    DAO работает в ней и только делает flush: транзакцией и commit управляет
+    вызывающий код, поэтому весь запрос использует одно соединение.
+    Без session DAO открывает собственную сессию и коммитит ее сам.
+    """
+
     model = None
 
     @classmethod
-    async def find_one_or_none_by_id(cls, data_id: int):
+    @asynccontextmanager
+    async def _session_scope(cls, session: AsyncSession | None):
+        if session is not None:
+            yield session
+            return
+
+        async with async_session_maker() as own_session:
+            try:
+                yield own_session
+                await own_session.commit()
+            except SQLAlchemyError as e:
+                await own_session.rollback()
+                raise e
+
+    @classmethod
+    async def find_one_or_none_by_id(
+        cls, data_id: int, session: AsyncSession | None = None
+    ):
         """
         Асинхронно находит и возвращает один экземпляр модели по указанным критериям или None.
 
         Аргументы:
             data_id: Критерии фильтрации в виде идентификатора записи.
+            session: Сессия вызывающего кода (необязательно).
 
         Возвращает:
             Экземпляр модели или None, если ничего не найдено.
         """
-        async with async_session_maker() as session:
+        async with cls._session_scope(session) as session:
             query = select(cls.model).filter_by(id=data_id)
             result = await session.execute(query)
             return result.scalar_one_or_none()
 
     @classmethod
-    async def find_one_or_none(cls, **filter_by):
+    async def find_one_or_none(
+        cls, session: AsyncSession | None = None, **filter_by
+    ):
         """
         Асинхронно находит и возвращает один экземпляр модели по указанным критериям или None.
 
         Аргументы:
+            session: Сессия вызывающего кода (необязательно).
             **filter_by: Критерии фильтрации в виде именованных параметров.
 
         Возвращает:
             Экземпляр модели или None, если ничего не найдено.
         """
-        async with async_session_maker() as session:
+        async with cls._session_scope(session) as session:
             query = select(cls.model).filter_by(**filter_by)
             result = await session.execute(query)
             return result.scalar_one_or_none()
 
     @classmethod
-    async def find_all(cls, **filter_by):
+    async def find_all(cls, session: AsyncSession | None = None, **filter_by):
         """
         Асинхронно находит и возвращает все экземпляры модели, удовлетворяющие указанным критериям.
 
         Аргументы:
+            session: Сессия вызывающего кода (необязательно).
+            **filter_by: Критерии фильтрации в виде именованных параметров.
+
+        Возвращает:
+            Список экземпляров модели.
+        """
+        async with cls._session_scope(session) as session:
+            query = select(cls.model).filter_by(**filter_by)
+            result = await session.execute(query)
+            return result.scalars().all()
+
+    @classmethod
+    async def find_page(
+        cls,
+        after_id: int | None = None,
+        limit: int = 100,
+        session: AsyncSession | None = None,
+        **filter_by,
+    ):
+        """
+        Асинхронно возвращает страницу экземпляров модели с пагинацией по
+        ключу: записи с id > after_id в порядке возрастания id. Стоимость не
+        растет с номером страницы, в отличие от OFFSET.
+
+        Аргументы:
+            after_id: id последней записи предыдущей страницы (None - с начала).
+            limit: Максимальное количество записей на странице.
+            session: Сессия вызывающего кода (необязательно).
             **filter_by: Критерии фильтрации в виде именованных параметров.
 
         Возвращает:
             Список экземпляров модели.
         """
-        async with async_session_maker() as session:
+        async with cls._session_scope(session) as session:
             query = select(cls.model).filter_by(**filter_by)
+            if after_id is not None:
+                query = query.where(cls.model.id > after_id)
+            query = query.order_by(cls.model.id).limit(limit)
             result = await session.execute(query)
             return result.scalars().all()
 
     @classmethod
-    async def add(cls, **values):
+    async def stream_all(
+        cls,
+        after_id: int | None = None,
+        limit: int | None = None,
+        session: AsyncSession | None = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+        **filter_by,
+    ) -> AsyncIterator:
+        """
+        Асинхронный генератор экземпляров модели в порядке возрастания id.
+        Строки читаются из серверного курсора пачками по batch_size, поэтому
+        вся таблица не загружается в память.
+
+        Аргументы:
+            after_id: Начать с записей с id > after_id (None - с начала).
+            limit: Максимальное количество записей (None - без ограничения).
+            session: Сессия вызывающего кода (необязательно).
+            batch_size: Количество строк, забираемых из курсора за раз.
+            **filter_by: Критерии фильтрации в виде именованных параметров.
+
+        Возвращает:
+            Асинхронный итератор экземпляров модели.
+        """
+        async with cls._session_scope(session) as session:
+            query = select(cls.model).filter_by(**filter_by)
+            if after_id is not None:
+                query = query.where(cls.model.id > after_id)
+            query = query.order_by(cls.model.id)
+            if limit is not None:
+                query = query.limit(limit)
+
+            result = await session.stream_scalars(
+                query.execution_options(yield_per=batch_size)
+            )
+            async for instance in result:
+                yield instance
+
+    @classmethod
+    async def add(cls, session: AsyncSession | None = None, **values):
         """
         Асинхронно создает новый экземпляр модели с указанными значениями.
 
         Аргументы:
+            session: Сессия вызывающего кода (необязательно).
             **values: Именованные параметры для создания нового экземпляра модели.
 
         Возвращает:
             Созданный экземпляр модели.
         """
-        async with async_session_maker() as session:
-            async with session.begin():
-                new_instance = cls.model(**values)
-                session.add(new_instance)
-                try:
-                    await session.commit()
-                except SQLAlchemyError as e:
-                    await session.rollback()
-                    raise e
-                return new_instance
+        async with cls._session_scope(session) as session:
+            new_instance = cls.model(**values)
+            session.add(new_instance)
+            await session.flush()
+            return new_instance
 
     @classmethod
-    async def add_many(cls, instances: list[dict]):
+    async def add_many(
+        cls, instances: list[dict], session: AsyncSession | None = None
+    ):
         """
         Асинхронно создает несколько новых экземпляров модели с указанными значениями.
 
         Аргументы:
             instances: Список словарей, где каждый словарь содержит именованные параметры для создания нового
             экземпляра модели.
+            session: Сессия вызывающего кода (необязательно).
 
         Возвращает:
             Список созданных экземпляров модели.
         """
-        async with async_session_maker() as session:
-            async with session.begin():
-                new_instances = [cls.model(**values) for values in instances]
-                session.add_all(new_instances)
-                try:
-                    await session.commit()
-                except SQLAlchemyError as e:
-                    await session.rollback()
-                    raise e
-                return new_instances
+        async with cls._session_scope(session) as session:
+            new_instances = [cls.model(**values) for values in instances]
+            session.add_all(new_instances)
+            await session.flush()
+            return new_instances
+
+    @classmethod
+    async def bulk_insert(
+        cls,
+        rows: list[dict],
+        session: AsyncSession | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> list:
+        """
+        Асинхронно вставляет строки пачками через INSERT ... RETURNING без
+        создания ORM-объектов и отслеживания их состояния.
+
+        Аргументы:
+            rows: Список словарей со значениями колонок.
+            session: Сессия вызывающего кода (необязательно).
+            chunk_size: Количество строк в одном запросе.
+
+        Возвращает:
+            Список первичных ключей вставленных строк в порядке rows.
+        """
+        ids = []
+        async with cls._session_scope(session) as session:
+            for chunk in _chunks(rows, chunk_size):
+                result = await session.execute(
+                    sqlalchemy_insert(cls.model.__table__).returning(
+                        cls.model.__table__.c.id, sort_by_parameter_order=True
+                    ),
+                    chunk,
+                )
+                ids.extend(result.scalars().all())
+        return ids
+
+    @classmethod
+    async def upsert(
+        cls,
+        rows: list[dict],
+        index_elements: list[str],
+        update_fields: list[str] | None = None,
+        session: AsyncSession | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> int:
+        """
+        Асинхронно вставляет строки, а при конфликте по index_elements
+        обновляет поля update_fields (INSERT ... ON CONFLICT).
+
+        Аргументы:
+            rows: Список словарей со значениями колонок.
+            index_elements: Колонки уникального индекса для ON CONFLICT.
+            update_fields: Обновляемые при конфликте колонки. Если не указаны,
+                конфликтующие строки пропускаются (DO NOTHING).
+            session: Сессия вызывающего кода (необязательно).
+            chunk_size: Количество строк в одном запросе.
+
+        Возвращает:
+            Количество вставленных или обновленных строк.
+        """
+        affected = 0
+        async with cls._session_scope(session) as session:
+            dialect = session.bind.dialect.name
+            insert = pg_insert if dialect == "postgresql" else sqlite_insert
+
+            for chunk in _chunks(rows, chunk_size):
+                stmt = insert(cls.model.__table__).values(chunk)
+                if update_fields:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=index_elements,
+                        set_={f: stmt.excluded[f] for f in update_fields},
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(
+                        index_elements=index_elements
+                    )
+                result = await session.execute(stmt)
+                affected += result.rowcount
+        return affected
+
+    @classmethod
+    async def bulk_update(
+        cls,
+        rows: list[dict],
+        session: AsyncSession | None = None,
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> int:
+        """
+        Асинхронно обновляет строки по первичному ключу: у каждой строки свои
+        значения, все строки пачки уходят одним executemany.
+
+        Аргументы:
+            rows: Список словарей, каждый содержит id и новые значения колонок.
+            session: Сессия вызывающего кода (необязательно).
+            chunk_size: Количество строк в одном запросе.
+
+        Возвращает:
+            Количество переданных строк. ORM-обновление по первичному ключу
+            не отдает rowcount; если драйвер сообщает число строк
+            executemany, отсутствующий id вызывает StaleDataError, и
+            результат совпадает с числом обновленных строк. У asyncpg
+            (supports_sane_multi_rowcount = False) проверки нет: строки с
+            несуществующим id пропускаются молча.
+        """
+        async with cls._session_scope(session) as session:
+            for chunk in _chunks(rows, chunk_size):
+                await session.execute(sqlalchemy_update(cls.model), chunk)
+        return len(rows)
 
     @classmethod
-    async def update(cls, filter_by, **values):
+    async def update(
+        cls,
+        filter_by,
+        session: AsyncSession | None = None,
+        synchronize_session: str | bool = "fetch",
+        **values,
+    ):
         """
         Асинхронно обновляет экземпляры модели, удовлетворяющие критериям фильтрации, указанным в filter_by,
         новыми значениями, указанными в values.
 
         Аргументы:
             filter_by: Критерии фильтрации в виде именованных параметров.
+            session: Сессия вызывающего кода (необязательно).
+            synchronize_session: Способ синхронизации объектов сессии.
+                "fetch" (по умолчанию) получает id обновленных строк из БД,
+                "evaluate" применяет условия к объектам в памяти без
+                дополнительного запроса, но не поддерживает сложные условия
+                и серверные значения, False не синхронизирует.
             **values: Именованные параметры для обновления значений экземпляров модели.
 
         Возвращает:
             Количество обновленных экземпляров модели.
         """
-        async with async_session_maker() as session:
-            async with session.begin():
-                query = (
-                    sqlalchemy_update(cls.model)
-                    .where(
-                        *[
-                            getattr(cls.model, k) == v
-                            for k, v in filter_by.items()
-                        ]
-                    )
-                    .values(**values)
-                    .execution_options(synchronize_session="fetch")
+        async with cls._session_scope(session) as session:
+            query = (
+                sqlalchemy_update(cls.model)
+                .where(
+                    *[getattr(cls.model, k) == v for k, v in filter_by.items()]
                 )
-                result = await session.execute(query)
-                try:
-                    await session.commit()
-                except SQLAlchemyError as e:
-                    await session.rollback()
-                    raise e
-                return result.rowcount
+                .values(**values)
+                .execution_options(synchronize_session=synchronize_session)
+            )
+            result = await session.execute(query)
+            return result.rowcount
 
     @classmethod
-    async def delete(cls, delete_all: bool = False, **filter_by):
+    async def delete(
+        cls,
+        delete_all: bool = False,
+        session: AsyncSession | None = None,
+        **filter_by,
+    ):
         """
         Асинхронно удаляет экземпляры модели, удовлетворяющие критериям фильтрации, указанным в filter_by.
 
         Аргументы:
             delete_all: Если True, удаляет все экземпляры модели без фильтрации.
+            session: Сессия вызывающего кода (необязательно).
             **filter_by: Критерии фильтрации в виде именованных параметров.
 
         Возвращает:
@@ -152,13 +379,7 @@ class BaseDAO:
                     "Необходимо указать хотя бы один параметр для удаления."
                 )
 
-        async with async_session_maker() as session:
-            async with session.begin():
-                query = sqlalchemy_delete(cls.model).filter_by(**filter_by)
-                result = await session.execute(query)
-                try:
-                    await session.commit()
-                except SQLAlchemyError as e:
-                    await session.rollback()
-                    raise e
-                return result.rowcount
+        async with cls._session_scope(session) as session:
+            query = sqlalchemy_delete(cls.model).filter_by(**filter_by)
+            result = await session.execute(query)
+            return result.rowcount
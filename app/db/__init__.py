@@ -1,9 +1,12 @@
 from .base import (
     Base,
     get_async_db_session,
+    get_async_db_read_session,
+    get_async_db_session_maker,
     async_session_maker,
     ORDER_STEP,
     ObjectStatus,
+    NOT_ARCHIVED,
 )
 from .user import User, UserRole
 from .file import File
@@ -11,8 +14,11 @@ from .course import Course
 from .module import Module, ModuleContentType
 from .lesson import Lesson, LessonBlock, LessonBlockType
 from .refresh_token import RefreshToken
+from .token_revocation import TokenRevocation
 from .payment_transaction import PaymentTransaction
 from .course_purchase import CoursePurchase
+from .course_stats import CourseStats
+from .module_closure import ModuleClosure
 from .secondaries import user_course
 
 # __all__ = [
@@ -1,8 +1,9 @@
 import datetime
 from typing import AsyncGenerator
 
+from fastapi import Request
 from sqlalchemy import MetaData
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, text
 from sqlalchemy.ext.asyncio import (
     AsyncAttrs,
     AsyncSession,
@@ -13,6 +14,12 @@ from sqlalchemy.orm import DeclarativeBase
 import enum
 
 from app.core import settings
+from app.db.pool import PoolStats, engine_options
+from app.db.replica import (
+    ReadReplicaRouter,
+    WriteTrackingSession,
+    request_write_key,
+)
 
 ORDER_STEP = 100
 
@@ -23,6 +30,10 @@ class ObjectStatus(enum.Enum):
     archived = "archived"
 
 
+# Условие частичных индексов: архивные объекты в рабочих запросах не читаются
+NOT_ARCHIVED = text("status <> 'archived'")
+
+
 class Base(AsyncAttrs, DeclarativeBase):
     """Base class for all models"""
 
@@ -41,11 +52,64 @@ class Base(AsyncAttrs, DeclarativeBase):
     )
 
 
-engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URL)
+pool_stats = PoolStats()
+
+engine = create_async_engine(
+    settings.SQLALCHEMY_DATABASE_URL, **engine_options(pool_stats)
+)
+
+async_session_maker = async_sessionmaker(
+    engine, expire_on_commit=False, sync_session_class=WriteTrackingSession
+)
+
+replica_pool_stats = PoolStats()
+read_engine = None
+async_read_session_maker = None
+
+if settings.SQLALCHEMY_REPLICA_DATABASE_URL:
+    read_engine = create_async_engine(
+        settings.SQLALCHEMY_REPLICA_DATABASE_URL,
+        **engine_options(replica_pool_stats),
+    )
+    async_read_session_maker = async_sessionmaker(
+        read_engine, expire_on_commit=False
+    )
 
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+replica_router = ReadReplicaRouter(
+    async_session_maker,
+    async_read_session_maker,
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+    read_your_writes_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
+)
 
 
-async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+async def get_async_db_session(
+    request: Request = None,
+) -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
+        session.info.update(
+            replica_router=replica_router,
+            write_key=request_write_key(request),
+        )
+        yield session
+
+
+def get_async_db_session_maker() -> async_sessionmaker:
+    """
+    Фабрика сессий для кода, который работает с БД после выхода из
+    обработчика (например, генератор StreamingResponse): сессия из
+    get_async_db_session к этому моменту уже закрыта.
+    """
+    return async_session_maker
+
+
+async def get_async_db_read_session(
+    request: Request = None,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Сессия только для чтения: реплика, если она свежая, иначе основная БД"""
+    session_maker = await replica_router.session_maker_for(
+        request_write_key(request)
+    )
+    async with session_maker() as session:
         yield session
@@ -1,13 +1,37 @@
-from sqlalchemy import Integer, String, Float, Text, DateTime, ForeignKey
+from sqlalchemy import (
+    Integer,
+    String,
+    Float,
+    Text,
+    DateTime,
+    ForeignKey,
+    Index,
+)
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy.dialects.postgresql import ENUM as Enum
 from datetime import datetime, timezone
 
-from app.db import Base, ObjectStatus
+from app.db import Base, ObjectStatus, NOT_ARCHIVED
 
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        # порядок каталога (created_at desc, id desc) и курсор по нему
+        Index("ix_courses_created_at_id", "created_at", "id"),
+        Index("ix_courses_status_created_at_id", "status", "created_at", "id"),
+        Index(
+            "ix_courses_owner_id_created_at_id_not_archived",
+            "owner_id",
+            "created_at",
+            "id",
+            postgresql_where=NOT_ARCHIVED,
+            sqlite_where=NOT_ARCHIVED,
+        ),
+        # фильтры и сортировки каталога: владелец, диапазон и порядок цены
+        Index("ix_courses_owner_id_status", "owner_id", "status"),
+        Index("ix_courses_status_price_id", "status", "price", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -19,16 +43,17 @@ class Course(Base):
         default=ObjectStatus.draft,
         server_default="draft",
     )
+    # created_at не меняется после создания: по нему (и id) строится
+    # курсорная пагинация каталога
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -57,3 +82,12 @@ class Course(Base):
     )
 
     purchases = relationship("CoursePurchase", back_populates="course")
+
+    # одна строка на курс, читается тем же запросом через LEFT JOIN
+    stats = relationship(
+        "CourseStats",
+        back_populates="course",
+        uselist=False,
+        lazy="joined",
+        passive_deletes=True,
+    )
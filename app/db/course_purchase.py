@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, ForeignKey
+from sqlalchemy import Integer, ForeignKey, Index
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from app.db import Base, PaymentTransaction
@@ -6,6 +6,11 @@ from app.db import Base, PaymentTransaction
 
 class CoursePurchase(Base):
     __tablename__ = "course_purchases"
+    __table_args__ = (
+        Index("ix_course_purchases_user_id_course_id", "user_id", "course_id"),
+        # пересчет счетчика покупок курса (course_stats)
+        Index("ix_course_purchases_course_id", "course_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
@@ -0,0 +1,40 @@
+from sqlalchemy import Integer, ForeignKey
+from sqlalchemy.orm import mapped_column, Mapped, relationship
+
+from app.db import Base
+
+
+class CourseStats(Base):
+    """
+    Сводные счетчики курса для каталога. Модули и уроки считаются без
+    архивных, длительность - сумма Lesson.duration неархивных уроков.
+
+    Строка обновляется приращениями в той же транзакции, что и изменение
+    модулей, уроков и покупок (app.helpers.course_stats); расхождения
+    исправляет пересчет: python -m app.helpers.course_stats
+    """
+
+    __tablename__ = "course_stats"
+
+    course_id: Mapped[int] = mapped_column(
+        ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True
+    )
+    modules_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    lessons_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    total_duration: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    purchases_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    # растет при каждом изменении модулей и уроков курса: часть ключа
+    # кэша дерева содержимого (app.helpers.content_cache)
+    content_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+
+    course = relationship("Course", back_populates="stats")
@@ -7,11 +7,12 @@ from sqlalchemy import (
     ForeignKey,
     DateTime,
     Enum,
+    Index,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
-from app.db import Base, ObjectStatus
+from app.db import Base, ObjectStatus, NOT_ARCHIVED
 
 
 class LessonBlockType(enum.Enum):
@@ -26,6 +27,21 @@ class LessonBlockType(enum.Enum):
 
 class Lesson(Base):
     __tablename__ = "lessons"
+    __table_args__ = (
+        Index(
+            "ix_lessons_course_id_module_id_order",
+            "course_id",
+            "module_id",
+            "order",
+        ),
+        Index(
+            "ix_lessons_course_id_order_not_archived",
+            "course_id",
+            "order",
+            postgresql_where=NOT_ARCHIVED,
+            sqlite_where=NOT_ARCHIVED,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer,
@@ -107,6 +123,9 @@ class Lesson(Base):
 
 class LessonBlock(Base):
     __tablename__ = "lesson_blocks"
+    __table_args__ = (
+        Index("ix_lesson_blocks_lesson_id_order", "lesson_id", "order"),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer,
@@ -1,11 +1,19 @@
 import enum
 from typing import List, Optional
 from datetime import datetime, timezone
-from sqlalchemy import Integer, String, Text, ForeignKey, DateTime, Enum
+from sqlalchemy import (
+    Integer,
+    String,
+    Text,
+    ForeignKey,
+    DateTime,
+    Enum,
+    Index,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from sqlalchemy.sql import func
 
-from app.db import Base, ObjectStatus
+from app.db import Base, ObjectStatus, NOT_ARCHIVED
 
 
 class ModuleContentType(enum.Enum):
@@ -16,6 +24,21 @@ class ModuleContentType(enum.Enum):
 
 class Module(Base):
     __tablename__ = "modules"
+    __table_args__ = (
+        Index(
+            "ix_modules_course_id_parent_module_id_order",
+            "course_id",
+            "parent_module_id",
+            "order",
+        ),
+        Index(
+            "ix_modules_course_id_order_not_archived",
+            "course_id",
+            "order",
+            postgresql_where=NOT_ARCHIVED,
+            sqlite_where=NOT_ARCHIVED,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer,
@@ -0,0 +1,125 @@
+from sqlalchemy import (
+    ForeignKey,
+    Index,
+    Integer,
+    delete,
+    event,
+    insert,
+    inspect,
+    literal,
+    or_,
+    select,
+    true,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base, Module
+
+
+class ModuleClosure(Base):
+    """
+    Таблица замыкания иерархии модулей: строка на каждую пару
+    (предок, потомок), включая сам модуль с depth = 0. Поддерево,
+    предки и потомки читаются одним запросом по индексу без рекурсии.
+
+    Строки поддерживают события маппера Module ниже: создание, смена
+    parent_module_id и удаление через ORM. Массовые insert/update
+    модулей их обходят - после них нужен
+    app.helpers.module_closure.rebuild.
+    """
+
+    __tablename__ = "module_closure"
+    __table_args__ = (
+        # предки модуля: WHERE descendant_id = ? ORDER BY depth
+        Index(
+            "ix_module_closure_descendant_id_depth", "descendant_id", "depth"
+        ),
+    )
+
+    ancestor_id: Mapped[int] = mapped_column(
+        ForeignKey("modules.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id: Mapped[int] = mapped_column(
+        ForeignKey("modules.id", ondelete="CASCADE"), primary_key=True
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+def link_module(connection, module_id: int, parent_id: int | None):
+    """Строки нового модуля: сам модуль и все предки родителя"""
+    self_row = select(literal(module_id), literal(module_id), literal(0))
+    if parent_id is not None:
+        self_row = self_row.union_all(
+            select(
+                ModuleClosure.ancestor_id,
+                literal(module_id),
+                ModuleClosure.depth + 1,
+            ).where(ModuleClosure.descendant_id == parent_id)
+        )
+    connection.execute(
+        insert(ModuleClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"], self_row
+        )
+    )
+
+
+def move_subtree(connection, module_id: int, parent_id: int | None):
+    """
+    Переносит поддерево module_id под parent_id: связи поддерева с
+    прежними предками удаляются, с предками нового родителя - создаются.
+    """
+    subtree = select(ModuleClosure.descendant_id).where(
+        ModuleClosure.ancestor_id == module_id
+    )
+    connection.execute(
+        delete(ModuleClosure).where(
+            ModuleClosure.descendant_id.in_(subtree),
+            ModuleClosure.ancestor_id.not_in(subtree),
+        )
+    )
+    if parent_id is None:
+        return
+
+    above = ModuleClosure.__table__.alias("above")
+    below = ModuleClosure.__table__.alias("below")
+    connection.execute(
+        insert(ModuleClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(
+                above.c.ancestor_id,
+                below.c.descendant_id,
+                above.c.depth + below.c.depth + 1,
+            )
+            # все предки нового родителя x все узлы поддерева
+            .select_from(above.join(below, true())).where(
+                above.c.descendant_id == parent_id,
+                below.c.ancestor_id == module_id,
+            ),
+        )
+    )
+
+
+@event.listens_for(Module, "after_insert")
+def _link_inserted_module(mapper, connection, target: Module):
+    link_module(connection, target.id, target.parent_module_id)
+
+
+@event.listens_for(Module, "after_update")
+def _move_updated_module(mapper, connection, target: Module):
+    history = inspect(target).attrs.parent_module_id.history
+    if history.has_changes():
+        move_subtree(connection, target.id, target.parent_module_id)
+
+
+@event.listens_for(Module, "before_delete")
+def _unlink_deleted_module(mapper, connection, target: Module):
+    # ORM удаляет поддерево по одному модулю (cascade submodules),
+    # ondelete=CASCADE не срабатывает без внешних ключей (SQLite)
+    connection.execute(
+        delete(ModuleClosure).where(
+            or_(
+                ModuleClosure.ancestor_id == target.id,
+                ModuleClosure.descendant_id == target.id,
+            )
+        )
+    )
@@ -0,0 +1,133 @@
+import time
+from uuid import uuid4
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from app.core import settings
+
+# Верхние границы корзин гистограммы времени выдачи соединения, мс
+CHECKOUT_LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolStats:
+    """Счетчики выдачи соединений из пула одного движка"""
+
+    def __init__(self, buckets: tuple = CHECKOUT_LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.latency_histogram = [0] * (len(self.buckets) + 1)
+
+    def observe_wait(self, seconds: float):
+        if seconds > 0.001:
+            self.waits += 1
+        self.wait_time_total += seconds
+        self.wait_time_max = max(self.wait_time_max, seconds)
+
+    def observe_checkout(self, seconds: float):
+        self.checkouts += 1
+        ms = seconds * 1000
+        for idx, bound in enumerate(self.buckets):
+            if ms <= bound:
+                self.latency_histogram[idx] += 1
+                return
+        self.latency_histogram[-1] += 1
+
+    def snapshot(self, pool) -> dict:
+        data = {
+            "pool_class": type(pool).__name__,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "waits": self.waits,
+            "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+            "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+            "checkout_latency_ms": {
+                **{
+                    f"le_{bound}": count
+                    for bound, count in zip(
+                        self.buckets, self.latency_histogram
+                    )
+                },
+                "le_inf": self.latency_histogram[-1],
+            },
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            data.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return data
+
+
+def instrumented_pool_class(stats: PoolStats, base=AsyncAdaptedQueuePool):
+    """
+    Возвращает подкласс пула, пишущий метрики в stats.
+
+    Статистика хранится в атрибуте класса, поэтому переживает
+    pool.recreate() (он создает новый пул через self.__class__).
+    """
+
+    class InstrumentedPool(base):
+        pool_stats = stats
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except PoolTimeoutError:
+                self.pool_stats.timeouts += 1
+                raise
+            finally:
+                self.pool_stats.observe_wait(time.perf_counter() - start)
+
+        def connect(self):
+            start = time.perf_counter()
+            connection = super().connect()
+            self.pool_stats.observe_checkout(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def engine_options(stats: PoolStats) -> dict:
+    """Параметры create_async_engine из настроек DB_SETTINGS__*"""
+    connect_args = {
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+
+    if settings.DB_PGBOUNCER:
+        # PgBouncer в режиме transaction pooling не поддерживает именованные
+        # prepared statements: отключаем оба кэша и делаем имена уникальными
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
+
+    if settings.DB_POOL_SIZE <= 0:
+        options["poolclass"] = instrumented_pool_class(stats, NullPool)
+    else:
+        options.update(
+            poolclass=instrumented_pool_class(stats),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+
+    return options
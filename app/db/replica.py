@@ -0,0 +1,159 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+from jose import jwt, JWTError
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE("
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class WriteTrackingSession(Session):
+    """Сессия, которая сообщает роутеру реплик о закоммиченных записях"""
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _mark_dml(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_commit")
+def _remember_commit(session):
+    if not session.info.pop("has_writes", False):
+        return
+    router = session.info.get("replica_router")
+    key = session.info.get("write_key")
+    if router is not None and key is not None:
+        router.mark_write(key)
+
+
+def request_write_key(request: Request | None) -> str | None:
+    """
+    Ключ пользователя для read-your-writes.
+
+    Подпись токена не проверяется: ключ влияет только на выбор БД для
+    чтения, а аутентификацию выполняет get_current_user.
+    """
+    if request is None:
+        return None
+    token = request.cookies.get("users_access_token")
+    if not token:
+        return None
+    try:
+        return jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+
+
+class ReadReplicaRouter:
+    """
+    Выбирает фабрику сессий для чтения: реплику или основную БД.
+
+    Основная БД используется, если реплика не настроена, ее отставание
+    больше max_lag_seconds (или его не удалось измерить), либо пользователь
+    писал в основную БД последние read_your_writes_seconds секунд.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replica: async_sessionmaker | None = None,
+        *,
+        max_lag_seconds: float = 5.0,
+        lag_check_interval: float = 1.0,
+        read_your_writes_seconds: float = 5.0,
+        max_tracked_writers: int = 10_000,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.max_tracked_writers = max_tracked_writers
+
+        self._recent_writes: OrderedDict[str, float] = OrderedDict()
+        self._lag: float | None = None
+        self._lag_checked_at = float("-inf")
+        self._lag_lock = asyncio.Lock()
+
+        self.replica_reads = 0
+        self.primary_reads = 0
+
+    def mark_write(self, key: str):
+        self._recent_writes[key] = time.monotonic()
+        self._recent_writes.move_to_end(key)
+        while len(self._recent_writes) > self.max_tracked_writers:
+            self._recent_writes.popitem(last=False)
+
+    def recently_wrote(self, key: str | None) -> bool:
+        if key is None:
+            return False
+        written_at = self._recent_writes.get(key)
+        if written_at is None:
+            return False
+        if time.monotonic() - written_at > self.read_your_writes_seconds:
+            self._recent_writes.pop(key, None)
+            return False
+        return True
+
+    async def _measure_lag(self) -> float | None:
+        async with self.replica() as session:
+            if session.bind.dialect.name != "postgresql":
+                return 0.0
+            return float(await session.scalar(REPLICA_LAG_QUERY) or 0)
+
+    async def replica_lag(self) -> float | None:
+        """Отставание реплики в секундах (None, если реплика недоступна)"""
+        if time.monotonic() - self._lag_checked_at < self.lag_check_interval:
+            return self._lag
+
+        async with self._lag_lock:
+            if (
+                time.monotonic() - self._lag_checked_at
+                < self.lag_check_interval
+            ):
+                return self._lag
+            try:
+                self._lag = await self._measure_lag()
+            except Exception as e:
+                print(f"Replica lag check failed: {e}")
+                self._lag = None
+            self._lag_checked_at = time.monotonic()
+        return self._lag
+
+    async def session_maker_for(self, key: str | None) -> async_sessionmaker:
+        if self.replica is None or self.recently_wrote(key):
+            self.primary_reads += 1
+            return self.primary
+
+        lag = await self.replica_lag()
+        if lag is None or lag > self.max_lag_seconds:
+            self.primary_reads += 1
+            return self.primary
+
+        self.replica_reads += 1
+        return self.replica
+
+    def stats(self) -> dict:
+        return {
+            "replica_configured": self.replica is not None,
+            "replica_lag_seconds": self._lag,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "tracked_writers": len(self._recent_writes),
+        }
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+from sqlalchemy import ForeignKey, String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class TokenRevocation(Base):
+    """
+    Отзыв access-токенов.
+
+    Запись с jti отзывает один токен, запись без jti - все токены
+    пользователя, выпущенные до revoked_at. После expires_at такие токены
+    истекают сами, и запись можно удалить.
+    """
+
+    __tablename__ = "token_revocations"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    jti: Mapped[str | None] = mapped_column(
+        String(64), unique=True, nullable=True
+    )
+    user_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=True
+    )
+    revoked_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), index=True
+    )
@@ -1,7 +1,11 @@
 from .user import (
     get_auth_data,
     get_current_user,
+    get_current_user_read,
     get_current_user_admin,
     get_current_user_teacher,
+    get_current_user_teacher_read,
+    get_token_claims,
+    TokenUser,
 )
 from .course import get_authorized_course
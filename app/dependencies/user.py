@@ -1,10 +1,14 @@
 from jose import jwt, JWTError
 from fastapi import Request, status, HTTPException, Depends
 from datetime import datetime, timezone
+from typing import NamedTuple
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.revocation import revocation_filter
+from app.auth.user_cache import user_cache, attach_cached_user
 from app.core.settings import get_auth_data
 from app.dao.user import UserDAO
-from app.db import User
+from app.db import User, get_async_db_session, get_async_db_read_session
 from app.db.user import UserRole
 
 
@@ -17,7 +21,8 @@ def get_token(request: Request):
     return token
 
 
-async def get_current_user(token: str = Depends(get_token)):
+def get_token_claims(token: str = Depends(get_token)) -> dict:
+    """Проверенные claims access-токена, без обращения к БД"""
     try:
         auth_data = get_auth_data()
         payload = jwt.decode(
@@ -35,24 +40,114 @@ async def get_current_user(token: str = Depends(get_token)):
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен Истек"
         )
 
-    user_id = payload.get("sub")
-    if not user_id:
+    if not payload.get("sub"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Не найден ID пользователя",
         )
 
-    user = await UserDAO.find_one_or_none_by_id(int(user_id))
+    if revocation_filter.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Токен отозван"
+        )
+
+    if payload.get("active") is False:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Пользователь деактивирован",
+        )
+
+    return payload
+
+
+async def _resolve_user(claims: dict, db: AsyncSession) -> User:
+    user_id = int(claims["sub"])
+
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return await attach_cached_user(db, cached)
+
+    generation = user_cache.generation
+    user = await UserDAO.find_one_or_none_by_id(user_id, session=db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Пользователь с таким ID не найден",
         )
 
+    user_cache.put(user, generation)
     return user
 
 
-async def get_current_user_admin(user: User = Depends(get_current_user)):
+async def get_current_user(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_async_db_session),
+):
+    return await _resolve_user(claims, db)
+
+
+async def get_current_user_read(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_async_db_read_session),
+):
+    """
+    get_current_user для маршрутов на get_async_db_read_session: при
+    промахе кэша пользователь читается той же сессией, что и маршрут,
+    и запрос держит одно соединение (реплики, если она свежая).
+    Отставание реплики не ослабляет проверки: отзыв и деактивация
+    проверяются по токену в get_token_claims.
+    """
+    return await _resolve_user(claims, db)
+
+
+def require_role_claim(*roles: UserRole):
+    """
+    Отклоняет запрос по роли из токена до загрузки пользователя.
+
+    Токены, выпущенные до появления claim role, пропускаются: их роль
+    проверяется по пользователю из БД.
+    """
+    allowed = {role.value for role in roles}
+
+    def check(claims: dict = Depends(get_token_claims)) -> dict:
+        role = claims.get("role")
+        if role is not None and role not in allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Недостаточно прав",
+            )
+        return claims
+
+    return check
+
+
+class TokenUser(NamedTuple):
+    """
+    Пользователь ролевых маршрутов: id и роль из проверенного токена.
+    Проверкам прав и владения (CoursePolicy, owner_id) этого достаточно,
+    строка users не читается.
+    """
+
+    id: int
+    role: UserRole
+
+
+async def _token_user(claims: dict, db: AsyncSession) -> TokenUser:
+    role = claims.get("role")
+    if role is not None:
+        # активность и отзыв уже проверены в get_token_claims, смена
+        # роли отзывает токены пользователя
+        return TokenUser(int(claims["sub"]), UserRole(role))
+    # токен без claim role: роль берется из БД
+    user = await _resolve_user(claims, db)
+    return TokenUser(user.id, user.role)
+
+
+async def get_current_user_admin(
+    claims: dict = Depends(require_role_claim(UserRole.admin)),
+    db: AsyncSession = Depends(get_async_db_session),
+) -> TokenUser:
+    user = await _token_user(claims, db)
     if user.role == UserRole.admin:
         return user
     raise HTTPException(
@@ -60,9 +155,27 @@ async def get_current_user_admin(user: User = Depends(get_current_user)):
     )
 
 
-async def get_current_user_teacher(user: User = Depends(get_current_user)):
+def _require_teacher(user: TokenUser) -> TokenUser:
     if user.role == UserRole.teacher or user.role == UserRole.admin:
         return user
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN, detail="Недостаточно прав"
     )
+
+
+async def get_current_user_teacher(
+    claims: dict = Depends(
+        require_role_claim(UserRole.teacher, UserRole.admin)
+    ),
+    db: AsyncSession = Depends(get_async_db_session),
+) -> TokenUser:
+    return _require_teacher(await _token_user(claims, db))
+
+
+async def get_current_user_teacher_read(
+    claims: dict = Depends(
+        require_role_claim(UserRole.teacher, UserRole.admin)
+    ),
+    db: AsyncSession = Depends(get_async_db_read_session),
+) -> TokenUser:
+    return _require_teacher(await _token_user(claims, db))
@@ -0,0 +1,220 @@
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import NamedTuple
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core import settings
+from app.db import Course, CourseStats, User, UserRole
+from app.schemas import SCourseResponse
+
+# Маркер в session.info: после коммита сбросить кэш каталога
+CATALOG_CHANGED = "catalog_changed"
+# Таблицы, из которых собирается страница каталога
+CATALOG_TABLES = {Course.__tablename__, CourseStats.__tablename__}
+
+courses_adapter = TypeAdapter(list[SCourseResponse])
+
+
+class CachedPage(NamedTuple):
+    created_at: float
+    etag: str
+    body: bytes
+    link: str | None
+
+
+def make_etag(body: bytes) -> str:
+    # сильный ETag: одинаковые байты ответа - одинаковый тег
+    return '"%s"' % blake2b(body, digest_size=16).hexdigest()
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Совпадение по If-None-Match (RFC 9110, слабое сравнение): список
+    тегов через запятую, префикс W/ не учитывается, "*" - любой тег.
+    """
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def role_class(user: User) -> str | None:
+    """
+    Класс пользователей, которым каталог отдается одинаково. Учителя
+    видят еще и свои черновики, их ответы не кэшируются.
+    """
+    if user.role == UserRole.student:
+        return "student"
+    if user.role == UserRole.admin:
+        return "admin"
+    return None
+
+
+class CatalogCache:
+    """
+    LRU-кэш готовых (сериализованных) страниц GET /course/ с TTL.
+
+    Ключ - класс роли и нормализованные параметры запроса. Любой коммит,
+    меняющий курсы, сбрасывает кэш этого процесса; другие процессы видят
+    изменения не позже чем через ttl_seconds. Счетчик поколений не дает
+    запросу, начатому до сброса, положить устаревшую страницу.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        ttl_seconds: float = 60.0,
+        max_entries: int = 1000,
+        max_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: OrderedDict[tuple, CachedPage] = OrderedDict()
+        self.generation = 0
+        self.reset()
+
+    def reset(self):
+        self._entries.clear()
+        self.generation += 1
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self.bytes_served = 0
+
+    @staticmethod
+    def key(request: Request, user: User) -> tuple | None:
+        user_class = role_class(user)
+        if user_class is None:
+            return None
+        return (user_class, tuple(sorted(request.query_params.multi_items())))
+
+    def get(self, key: tuple) -> CachedPage | None:
+        if not self.enabled or key is None:
+            return None
+        page = self._entries.get(key)
+        if page is None or time.monotonic() - page.created_at > (
+            self.ttl_seconds
+        ):
+            self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return page
+
+    def put(self, key: tuple, page: CachedPage, generation: int):
+        if not self.enabled or key is None or generation != self.generation:
+            return
+        if len(page.body) > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = page
+        self.bytes += len(page.body)
+        while (
+            len(self._entries) > self.max_entries or self.bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted.body)
+
+    def _drop(self, key: tuple):
+        page = self._entries.pop(key, None)
+        if page is not None:
+            self.bytes -= len(page.body)
+
+    def invalidate(self):
+        self.generation += 1
+        self.invalidations += 1
+        self._entries.clear()
+        self.bytes = 0
+
+    def respond(self, request: Request, page: CachedPage) -> Response:
+        """Ответ из страницы: 304, если у клиента та же версия"""
+        headers = {"ETag": page.etag}
+        if page.link:
+            headers["Link"] = page.link
+        if etag_matches(request.headers.get("if-none-match", ""), page.etag):
+            self.not_modified += 1
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+        self.bytes_served += len(page.body)
+        return Response(
+            content=page.body, media_type="application/json", headers=headers
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "not_modified": self.not_modified,
+            "bytes_served": self.bytes_served,
+            "invalidations": self.invalidations,
+        }
+
+
+catalog_cache = CatalogCache(
+    enabled=settings.CATALOG_CACHE_ENABLED,
+    ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+    max_entries=settings.CATALOG_CACHE_MAX_ENTRIES,
+    max_bytes=settings.CATALOG_CACHE_MAX_BYTES,
+)
+
+
+def serialize_page(courses, link: str | None) -> CachedPage:
+    # pydantic-core сериализует список сразу в байты, без промежуточных dict;
+    # валидация нужна для значений по умолчанию (курс без course_stats)
+    body = courses_adapter.dump_json(
+        courses_adapter.validate_python(courses, from_attributes=True)
+    )
+    return CachedPage(time.monotonic(), make_etag(body), body, link)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_course_changes(session, flush_context):
+    if any(
+        isinstance(obj, (Course, CourseStats))
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        session.info[CATALOG_CHANGED] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_course_changes(orm_execute_state):
+    statement = orm_execute_state.statement
+    if (
+        isinstance(statement, UpdateBase)
+        and getattr(statement.table, "name", None) in CATALOG_TABLES
+    ):
+        orm_execute_state.session.info[CATALOG_CHANGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_catalog_invalidation(session):
+    if session.info.pop(CATALOG_CHANGED, False):
+        catalog_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_invalidation(session):
+    session.info.pop(CATALOG_CHANGED, None)
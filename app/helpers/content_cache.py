@@ -0,0 +1,135 @@
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from app.core import settings
+from app.db import Course
+
+
+def content_version(course: Course) -> int:
+    # строка course_stats появляется при первом изменении содержимого
+    return course.stats.content_version if course.stats is not None else 0
+
+
+class ContentTreeCache:
+    """
+    LRU-кэш сериализованных деревьев содержимого курса.
+
+    Ключ включает content_version курса, которую меняет каждая правка
+    модулей и уроков в той же транзакции: после коммита запрос читает
+    новую версию и строит дерево заново, старые записи вытесняются сами.
+    Инвалидация не нужна, процессы не могут отдать устаревшее дерево.
+
+    Одновременные промахи по одному ключу ждут одно построение
+    (single-flight); если оно упало, ожидающие строят сами.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        max_entries: int = 500,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self._flights: dict[tuple, asyncio.Future] = {}
+        self.reset()
+
+    def reset(self):
+        self._entries.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.fill_errors = 0
+
+    def get(self, key: tuple) -> bytes | None:
+        body = self._entries.get(key)
+        if body is not None:
+            self._entries.move_to_end(key)
+        return body
+
+    def put(self, key: tuple, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old)
+        self._entries[key] = body
+        self.bytes += len(body)
+        while (
+            len(self._entries) > self.max_entries or self.bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+
+    async def get_or_fill(
+        self, key: tuple, fill: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        if not self.enabled:
+            return await fill()
+
+        while True:
+            body = self.get(key)
+            if body is not None:
+                self.hits += 1
+                return body
+            flight = self._flights.get(key)
+            if flight is None:
+                break
+            # отмена этого запроса прерывает только ожидание, не построение
+            await asyncio.wait({flight})
+            if not flight.cancelled() and flight.exception() is None:
+                self.shared += 1
+                return flight.result()
+
+        self.misses += 1
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            body = await fill()
+        except BaseException as e:
+            self.fill_errors += 1
+            if isinstance(e, Exception):
+                flight.set_exception(e)
+                # ошибку получает и обрабатывает вызывающий код
+                flight.exception()
+            else:
+                flight.cancel()
+            raise
+        finally:
+            self._flights.pop(key, None)
+
+        self.put(key, body)
+        flight.set_result(body)
+        return body
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.shared
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_fills": self.shared,
+            "in_flight": len(self._flights),
+            "fill_errors": self.fill_errors,
+            "hit_ratio": (
+                round((self.hits + self.shared) / lookups, 4)
+                if lookups
+                else None
+            ),
+        }
+
+
+content_cache = ContentTreeCache(
+    enabled=settings.CONTENT_CACHE_ENABLED,
+    max_entries=settings.CONTENT_CACHE_MAX_ENTRIES,
+    max_bytes=settings.CONTENT_CACHE_MAX_BYTES,
+)
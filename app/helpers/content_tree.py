@@ -0,0 +1,176 @@
+from pydantic import TypeAdapter
+from sqlalchemy import select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import (
+    Course,
+    Lesson,
+    Module,
+    ModuleClosure,
+    ModuleContentType,
+    ObjectStatus,
+    User,
+    UserRole,
+)
+from app.helpers import module_closure
+
+tree_adapter = TypeAdapter(list[dict])
+node_adapter = TypeAdapter(dict)
+
+# Только колонки: без ORM-объектов и без JOIN parent (Module.parent - joined)
+MODULE_COLUMNS = (
+    Module.id,
+    Module.title,
+    Module.description,
+    Module.order,
+    Module.status,
+    Module.created_at,
+    Module.updated_at,
+    Module.course_id,
+    Module.parent_module_id,
+    Module.content_type,
+)
+LESSON_COLUMNS = (
+    Lesson.id,
+    Lesson.title,
+    Lesson.summary,
+    Lesson.duration,
+    Lesson.module_id,
+    Lesson.order,
+    Lesson.status,
+    Lesson.created_at,
+    Lesson.updated_at,
+)
+
+
+def visibility_class(user: User, course: Course) -> str:
+    """
+    Класс видимости содержимого: admin - все, owner - без архивных,
+    student (и чужие учителя) - только опубликованное.
+    """
+    if user.role == UserRole.admin:
+        return "admin"
+    if course.owner_id == user.id:
+        return "owner"
+    return "student"
+
+
+def visible(status_column, visibility: str):
+    if visibility == "admin":
+        return true()
+    if visibility == "owner":
+        return status_column != ObjectStatus.archived
+    return status_column == ObjectStatus.published
+
+
+def rows_as_dicts(result):
+    # dict(zip(...)) по кортежам заметно быстрее, чем RowMapping
+    keys = list(result.keys())
+    return (dict(zip(keys, row)) for row in result)
+
+
+def assemble_tree(modules, lessons, *, root_id: int | None = None):
+    """
+    Собирает дерево из плоских строк (словарей) за O(n). Строки модулей
+    и уроков должны идти в порядке order: узлы дописываются в конец
+    списков и не сортируются. Модуль, родитель которого не виден, не попадает в
+    дерево вместе с поддеревом; content модуля - подмодули или уроки в
+    зависимости от content_type. root_id - корень поддерева, если
+    строки выбраны по одному модулю.
+    """
+    nodes = {}
+    for node in modules:
+        node["content"] = []
+        nodes[node["id"]] = node
+
+    roots = []
+    for node in nodes.values():
+        parent_id = node["parent_module_id"]
+        if parent_id is None or node["id"] == root_id:
+            roots.append(node)
+            continue
+        parent = nodes.get(parent_id)
+        if parent is not None and (
+            parent["content_type"] == ModuleContentType.modules
+        ):
+            parent["content"].append(node)
+
+    for lesson in lessons:
+        module = nodes.get(lesson["module_id"])
+        if module is not None and (
+            module["content_type"] != ModuleContentType.modules
+        ):
+            module["content"].append(lesson)
+
+    return roots
+
+
+async def fetch_course_tree(
+    db: AsyncSession, course_id: int, visibility: str
+) -> list[dict]:
+    """
+    Дерево модулей курса с видимыми уроками: два плоских запроса по
+    индексам (course_id, ...) и сборка в памяти.
+    """
+    modules = await db.execute(
+        select(*MODULE_COLUMNS)
+        .where(
+            Module.course_id == course_id, visible(Module.status, visibility)
+        )
+        .order_by(Module.order, Module.id)
+    )
+    lessons = await db.execute(
+        select(*LESSON_COLUMNS)
+        .where(
+            Lesson.course_id == course_id,
+            Lesson.module_id.is_not(None),
+            visible(Lesson.status, visibility),
+        )
+        .order_by(Lesson.order, Lesson.id)
+    )
+    return assemble_tree(rows_as_dicts(modules), rows_as_dicts(lessons))
+
+
+async def fetch_module_tree(
+    db: AsyncSession, course_id: int, module_id: int, visibility: str
+) -> dict | None:
+    """
+    Поддерево одного модуля: модули по таблице замыкания и уроки только
+    этих модулей. Объем чтения зависит от размера поддерева, а не
+    курса. None, если модуль не виден.
+    """
+    subtree = module_closure.descendant_ids(module_id)
+    modules = await db.execute(
+        select(*MODULE_COLUMNS)
+        .join(ModuleClosure, ModuleClosure.descendant_id == Module.id)
+        .where(
+            ModuleClosure.ancestor_id == module_id,
+            visible(Module.status, visibility),
+        )
+        .order_by(Module.order, Module.id)
+    )
+    lessons = await db.execute(
+        select(*LESSON_COLUMNS)
+        .where(
+            Lesson.course_id == course_id,
+            Lesson.module_id.in_(subtree),
+            visible(Lesson.status, visibility),
+        )
+        .order_by(Lesson.order, Lesson.id)
+    )
+    roots = assemble_tree(
+        rows_as_dicts(modules), rows_as_dicts(lessons), root_id=module_id
+    )
+    return roots[0] if roots else None
+
+
+def serialize_tree(roots: list[dict]) -> bytes:
+    """
+    JSON дерева без промежуточных моделей: значения пришли из колонок
+    БД, ключи совпадают с полями SModuleTreeResponse и SLessonResponse.
+    """
+    return tree_adapter.dump_json(roots)
+
+
+def serialize_module(node: dict) -> bytes:
+    return node_adapter.dump_json(node)
@@ -0,0 +1,127 @@
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import Course, ObjectStatus, User, UserRole
+from app.policies import CoursePolicy
+
+# Поля сортировки каталога: "price,-created_at" - по цене, затем новые
+SORT_FIELDS = {
+    "price": Course.price,
+    "created_at": Course.created_at,
+    "title": Course.title,
+}
+DEFAULT_SORT = "-created_at"
+
+# Границы ценовых диапазонов для фасетов: [0, 500), [500, 2000), ...
+PRICE_BUCKETS = (500, 2000, 5000)
+
+
+def parse_sort(sort: str) -> list:
+    ordering = []
+    for key in sort.split(","):
+        field = SORT_FIELDS.get(key.strip().lstrip("-"))
+        if field is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Неизвестное поле сортировки: {key}",
+            )
+        ordering.append(field.desc() if key.strip()[0] == "-" else field)
+    # id делает порядок однозначным при равных значениях полей
+    ordering.append(Course.id.desc())
+    return ordering
+
+
+def status_condition(user: User, course_status: ObjectStatus | None):
+    if course_status is None:
+        return true()
+    if user.role != UserRole.admin and (
+        course_status not in CoursePolicy.allowed_statuses(user)
+    ):
+        raise HTTPException(403, "Forbidden status filter")
+    return Course.status == course_status
+
+
+def price_condition(min_price: float | None, max_price: float | None):
+    conditions = []
+    if min_price is not None:
+        conditions.append(Course.price >= min_price)
+    if max_price is not None:
+        conditions.append(Course.price <= max_price)
+    return and_(true(), *conditions)
+
+
+def price_buckets() -> list[tuple[str, object]]:
+    edges = (0, *PRICE_BUCKETS)
+    buckets = [
+        (f"{low}-{high}", and_(Course.price >= low, Course.price < high))
+        for low, high in zip(edges, edges[1:])
+    ]
+    buckets.append((f"{edges[-1]}+", Course.price >= edges[-1]))
+    return buckets
+
+
+class CatalogQuery:
+    """
+    Фильтры каталога, собранные для одного запроса.
+
+    Владелец фильтруется через JOIN users, а не отдельным запросом.
+    Условия по статусу и цене хранятся отдельно от остальных: фасет
+    считается без собственного фильтра, чтобы показать, сколько курсов
+    даст выбор другого значения.
+    """
+
+    def __init__(
+        self,
+        user: User,
+        *,
+        search_condition=None,
+        owner_username: str | None = None,
+        course_status: ObjectStatus | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+    ):
+        self.owner_username = owner_username
+        self.common = [CoursePolicy.build_access_condition(user)]
+        if search_condition is not None:
+            self.common.append(search_condition)
+        if owner_username:
+            self.common.append(User.username == owner_username)
+        self.status = status_condition(user, course_status)
+        self.price = price_condition(min_price, max_price)
+
+    def _from(self, query):
+        query = query.select_from(Course)
+        if self.owner_username:
+            query = query.join(User, Course.owner_id == User.id)
+        return query.where(*self.common)
+
+    def courses(self):
+        return self._from(select(Course)).where(self.status, self.price)
+
+    def facets(self):
+        """
+        Все счетчики фасетов одним агрегатом за один проход по строкам,
+        подходящим под общие фильтры.
+        """
+        columns = [func.count().filter(and_(self.status, self.price))]
+        columns += [
+            func.count().filter(and_(Course.status == value, self.price))
+            for value in ObjectStatus
+        ]
+        columns += [
+            func.count().filter(and_(condition, self.status))
+            for _, condition in price_buckets()
+        ]
+        return self._from(select(*columns))
+
+
+async def get_facets(db: AsyncSession, catalog: CatalogQuery) -> dict:
+    counts = list((await db.execute(catalog.facets())).one())
+    total = counts.pop(0)
+    by_status = {value.value: counts.pop(0) for value in ObjectStatus}
+    return {
+        "total": total,
+        "status": {key: count for key, count in by_status.items() if count},
+        "price": {label: counts.pop(0) for label, _ in price_buckets()},
+    }
@@ -1,64 +1,51 @@
 from sqlalchemy import select, update, or_, exists
-from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import Module, Lesson, ObjectStatus, User, Course, UserRole
+from app.helpers import course_stats, module_closure
 
 
 async def archive_module_tree(db: AsyncSession, module_id: int):
-    modules = Module.__table__
-    parent = aliased(modules, name="parent")
-    child = aliased(modules, name="child")
-
-    cte = (
-        select(parent.c.id).where(parent.c.id == module_id).cte(recursive=True)
-    )
-
-    cte = cte.union_all(
-        select(child.c.id)
-        .select_from(child)
-        .join(cte, child.c.parent_module_id == cte.c.id)
-    )
+    subtree = module_closure.descendant_ids(module_id)
 
     await db.execute(
         update(Module)
-        .where(Module.id.in_(select(cte.c.id)))
+        .where(Module.id.in_(subtree))
         .values(status=ObjectStatus.archived)
     )
 
-    result = await db.execute(select(cte.c.id))
-    module_ids = [row[0] for row in result]
-
     await db.execute(
         update(Lesson)
-        .where(Lesson.module_id.in_(module_ids))
+        .where(Lesson.module_id.in_(subtree))
         .values(status=ObjectStatus.archived)
     )
 
-    await db.commit()
-
 
 async def archive_children(
-    db: AsyncSession,
-    *,
-    course_id: int | None = None,
-    module_id: int | None = None
+    db: AsyncSession, *, course_id: int, module_id: int | None = None
 ):
-    if course_id:
-        if course_id:
-            await db.execute(
-                update(Module)
-                .where(Module.course_id == course_id)
-                .values(status=ObjectStatus.archived)
-            )
-
-            await db.execute(
-                update(Lesson)
-                .where(Lesson.course_id == course_id)
-                .values(status=ObjectStatus.archived)
-            )
-    elif module_id:
+    """
+    Архивирует поддерево модуля module_id или все содержимое курса.
+    Счетчики и версия содержимого курса пересчитываются в той же
+    транзакции.
+    """
+    if module_id:
         await archive_module_tree(db, module_id)
+    else:
+        await db.execute(
+            update(Module)
+            .where(Module.course_id == course_id)
+            .values(status=ObjectStatus.archived)
+        )
+
+        await db.execute(
+            update(Lesson)
+            .where(Lesson.course_id == course_id)
+            .values(status=ObjectStatus.archived)
+        )
+
+    await course_stats.refresh_course(db, course_id)
 
 
 async def get_non_archived_courses_with_archived_content(
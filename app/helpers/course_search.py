@@ -0,0 +1,35 @@
+from sqlalchemy import case, cast, func, literal_column, or_
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import Course
+
+# Конфигурация словаря должна совпадать с выражением генерируемой колонки
+# courses.search_vector (миграция ecaa169ef542)
+SEARCH_CONFIG = "russian"
+
+# Колонка не объявлена в модели: выражение GENERATED ALWAYS специфично для
+# PostgreSQL и не создается в SQLite через create_all
+search_vector = literal_column("courses.search_vector", TSVECTOR)
+
+
+def search_clauses(db: AsyncSession, term: str):
+    """
+    Условие поиска курсов и выражение релевантности для сортировки.
+
+    В PostgreSQL используется полнотекстовый поиск по search_vector
+    (GIN-индекс), релевантность - ts_rank_cd, где заголовок весит больше
+    описания. В остальных СУБД - ILIKE, совпадения в заголовке выше.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        query = func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), term)
+        return (
+            search_vector.bool_op("@@")(query),
+            func.ts_rank_cd(search_vector, query),
+        )
+
+    pattern = f"%{term}%"
+    return (
+        or_(Course.title.ilike(pattern), Course.description.ilike(pattern)),
+        case((Course.title.ilike(pattern), 1), else_=0),
+    )
@@ -0,0 +1,187 @@
+"""
+Счетчики курса (course_stats): приращения из маршрутов и пересчет.
+
+Пересчет всей таблицы пачками по id курсов:
+    python -m app.helpers.course_stats --batch-size 500
+
+Пересчет читает данные на момент выполнения запроса пачки: приращение
+параллельной транзакции, закоммиченное между чтением и записью пачки,
+будет перезаписано. Запускайте при небольшой нагрузке либо повторно.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import (
+    Course,
+    CoursePurchase,
+    CourseStats,
+    Lesson,
+    Module,
+    ObjectStatus,
+    async_session_maker,
+)
+from app.db.base import engine
+
+COUNTERS = (
+    "modules_count",
+    "lessons_count",
+    "total_duration",
+    "purchases_count",
+)
+RECONCILE_BATCH_SIZE = 500
+
+
+def _insert(db: AsyncSession):
+    dialect = db.get_bind().dialect.name
+    return pg_insert if dialect == "postgresql" else sqlite_insert
+
+
+def lesson_weight(lesson: Lesson) -> tuple[int, int]:
+    """Вклад урока в (lessons_count, total_duration)"""
+    if lesson.status == ObjectStatus.archived:
+        return 0, 0
+    return 1, lesson.duration or 0
+
+
+async def apply_delta(
+    db: AsyncSession,
+    course_id: int,
+    *,
+    modules: int = 0,
+    lessons: int = 0,
+    duration: int = 0,
+    purchases: int = 0,
+    content: bool = False,
+):
+    """
+    Прибавляет приращения к счетчикам курса одним INSERT ... ON CONFLICT
+    DO UPDATE SET x = x + excluded.x: параллельные транзакции не теряют
+    изменений друг друга, строка создается при первом изменении.
+    content=True - изменилось дерево модулей и уроков, растет
+    content_version. Коммит - за вызывающим кодом.
+    """
+    deltas = dict(
+        zip(COUNTERS, (modules, lessons, duration, purchases), strict=True)
+    )
+    deltas["content_version"] = int(content)
+    if not any(deltas.values()):
+        return
+
+    table = CourseStats.__table__
+    stmt = _insert(db)(table).values(course_id=course_id, **deltas)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.course_id],
+            set_={
+                name: table.c[name] + stmt.excluded[name]
+                for name, delta in deltas.items()
+                if delta
+            },
+        )
+    )
+
+
+def stats_select(condition):
+    """
+    Счетчики курсов, подходящих под condition, коррелированными
+    подзапросами: каждый идет по индексу с course_id в начале.
+    """
+    modules = (
+        select(func.count())
+        .where(
+            Module.course_id == Course.id,
+            Module.status != ObjectStatus.archived,
+        )
+        .scalar_subquery()
+    )
+    lessons = select(func.count()).where(
+        Lesson.course_id == Course.id,
+        Lesson.status != ObjectStatus.archived,
+    )
+    duration = lessons.with_only_columns(
+        func.coalesce(func.sum(Lesson.duration), 0)
+    )
+    purchases = select(func.count()).where(
+        CoursePurchase.course_id == Course.id
+    )
+    return select(
+        Course.id,
+        modules,
+        lessons.scalar_subquery(),
+        duration.scalar_subquery(),
+        purchases.scalar_subquery(),
+    ).where(condition)
+
+
+async def recount(db: AsyncSession, condition):
+    """
+    Пересчитывает счетчики курсов по condition с нуля и увеличивает
+    content_version. Используется там, где меняется сразу поддерево
+    (архивирование, удаление модуля).
+    """
+    table = CourseStats.__table__
+    stmt = _insert(db)(table).from_select(
+        ["course_id", *COUNTERS, "content_version"],
+        stats_select(condition).add_columns(literal(1)),
+    )
+    set_ = {name: stmt.excluded[name] for name in COUNTERS}
+    set_["content_version"] = table.c.content_version + 1
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.course_id], set_=set_
+        )
+    )
+
+
+async def refresh_course(db: AsyncSession, course_id: int):
+    await recount(db, Course.id == course_id)
+
+
+async def reconcile(
+    session_maker, batch_size: int = RECONCILE_BATCH_SIZE
+) -> int:
+    """
+    Пересчитывает course_stats для всех курсов пачками по batch_size,
+    каждая пачка - отдельная короткая транзакция. Возвращает число курсов.
+    """
+    total = 0
+    last_id = 0
+    while True:
+        async with session_maker() as db:
+            ids = (
+                await db.scalars(
+                    select(Course.id)
+                    .where(Course.id > last_id)
+                    .order_by(Course.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not ids:
+                return total
+            await recount(db, Course.id.in_(ids))
+            await db.commit()
+        total += len(ids)
+        last_id = ids[-1]
+
+
+async def _run(batch_size: int):
+    total = await reconcile(async_session_maker, batch_size)
+    print(f"course_stats: пересчитано курсов: {total}")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(_run(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
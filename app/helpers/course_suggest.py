@@ -0,0 +1,191 @@
+import asyncio
+import time
+from bisect import bisect_left, insort
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.db import Course, ObjectStatus
+
+# Изменения курсов в session.info, применяются к индексу после коммита
+SUGGEST_CHANGES = "suggest_changes"
+
+
+def normalize(title: str) -> str:
+    """Ключ индекса: без регистра, ё = е, пробелы схлопнуты"""
+    return " ".join(title.casefold().replace("ё", "е").split())
+
+
+class SuggestIndex:
+    """
+    Префиксный индекс названий опубликованных курсов в памяти процесса.
+
+    Отсортированный массив пар (ключ, id) и бинарный поиск: подсказка -
+    O(log n + k), изменение курса - вставка/удаление в массиве. Совпадения
+    отдаются в порядке ключа, одинаковые названия - по id.
+
+    Изменения своего процесса применяются после коммита; изменения других
+    процессов подхватывает периодическая перестройка (refresh_suggest_index).
+    """
+
+    def __init__(self):
+        self._keys: list[tuple[str, int]] = []
+        self._titles: dict[int, tuple[str, str]] = {}
+        # изменения, примененные во время перестройки, повторяются на новом
+        # массиве: загруженный из БД снимок может быть старше их
+        self._replay: list[tuple[int, str | None]] | None = None
+        self.reset()
+
+    def reset(self):
+        self._keys.clear()
+        self._titles.clear()
+        self.lookups = 0
+        self.lookup_seconds = 0.0
+        self.rebuilds = 0
+        self.updates = 0
+        self.built_at = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def put(self, course_id: int, title: str):
+        self.remove(course_id)
+        key = normalize(title)
+        insort(self._keys, (key, course_id))
+        self._titles[course_id] = (key, title)
+
+    def remove(self, course_id: int):
+        entry = self._titles.pop(course_id, None)
+        if entry is not None:
+            del self._keys[bisect_left(self._keys, (entry[0], course_id))]
+
+    def apply(self, course_id: int, title: str | None):
+        """title=None - курс снят с публикации или удален"""
+        self.updates += 1
+        if self._replay is not None:
+            self._replay.append((course_id, title))
+        if title is None:
+            self.remove(course_id)
+        else:
+            self.put(course_id, title)
+
+    def suggest(self, prefix: str, limit: int) -> list[dict]:
+        started = time.perf_counter()
+        key = normalize(prefix)
+        result = []
+        if key:
+            keys = self._keys
+            # (key,) меньше любой пары (key, id): первый ключ с префиксом
+            i = bisect_left(keys, (key,))
+            while i < len(keys) and len(result) < limit:
+                entry_key, course_id = keys[i]
+                if not entry_key.startswith(key):
+                    break
+                result.append(
+                    {"id": course_id, "title": self._titles[course_id][1]}
+                )
+                i += 1
+        self.lookups += 1
+        self.lookup_seconds += time.perf_counter() - started
+        return result
+
+    def build(self, rows):
+        """Строит новый массив из пар (id, title) и подменяет текущий"""
+        titles = {
+            course_id: (normalize(title), title) for course_id, title in rows
+        }
+        self._keys = sorted(
+            (key, course_id) for course_id, (key, _) in titles.items()
+        )
+        self._titles = titles
+        for course_id, title in self._replay or ():
+            if title is None:
+                self.remove(course_id)
+            else:
+                self.put(course_id, title)
+        self.rebuilds += 1
+        self.built_at = time.time()
+
+    async def load(self, session_maker: async_sessionmaker):
+        """Перестраивает индекс по опубликованным курсам из БД"""
+        self._replay = []
+        try:
+            async with session_maker() as session:
+                result = await session.execute(
+                    select(Course.id, Course.title).where(
+                        Course.status == ObjectStatus.published
+                    )
+                )
+                rows = result.all()
+            self.build(rows)
+        finally:
+            self._replay = None
+
+    def stats(self) -> dict:
+        return {
+            "titles": len(self._keys),
+            "lookups": self.lookups,
+            "avg_lookup_ms": (
+                round(self.lookup_seconds / self.lookups * 1000, 4)
+                if self.lookups
+                else None
+            ),
+            "updates": self.updates,
+            "rebuilds": self.rebuilds,
+            "built_at": self.built_at,
+        }
+
+
+suggest_index = SuggestIndex()
+
+
+def stage_course(
+    db: AsyncSession | Session,
+    course_id: int,
+    title: str,
+    course_status: ObjectStatus,
+):
+    """
+    Запоминает состояние курса для индекса подсказок. Изменения через ORM
+    отслеживаются событием flush; после массового UPDATE courses нужно
+    вызвать эту функцию с новыми значениями.
+    """
+    session = getattr(db, "sync_session", db)
+    published = course_status == ObjectStatus.published
+    session.info.setdefault(SUGGEST_CHANGES, []).append(
+        (course_id, title if published else None)
+    )
+
+
+async def refresh_suggest_index(
+    session_maker: async_sessionmaker, interval: float
+):
+    """Фоновая перестройка: подхватывает изменения других процессов"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await suggest_index.load(session_maker)
+        except Exception as e:
+            print(f"Course suggest index refresh failed: {e}")
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_course_titles(session, flush_context):
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, Course):
+            stage_course(session, obj.id, obj.title, obj.status)
+    for obj in session.deleted:
+        if isinstance(obj, Course):
+            session.info.setdefault(SUGGEST_CHANGES, []).append((obj.id, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_course_titles(session):
+    for course_id, title in session.info.pop(SUGGEST_CHANGES, ()):
+        suggest_index.apply(course_id, title)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_course_titles(session):
+    session.info.pop(SUGGEST_CHANGES, None)
@@ -0,0 +1,76 @@
+"""
+Запросы по иерархии модулей через таблицу замыкания module_closure.
+
+Полное перестроение таблицы (после массовых insert/update модулей):
+    python -m app.helpers.module_closure
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import Module, ModuleClosure, async_session_maker
+from app.db.base import engine
+
+
+def descendant_ids(module_id: int, *, include_self: bool = True):
+    """id модулей поддерева: одно чтение по первичному ключу"""
+    query = select(ModuleClosure.descendant_id).where(
+        ModuleClosure.ancestor_id == module_id
+    )
+    if not include_self:
+        query = query.where(ModuleClosure.depth > 0)
+    return query
+
+
+def ancestor_ids(module_id: int, *, include_self: bool = False):
+    """id предков модуля от корня курса к модулю"""
+    query = (
+        select(ModuleClosure.ancestor_id)
+        .where(ModuleClosure.descendant_id == module_id)
+        .order_by(ModuleClosure.depth.desc())
+    )
+    if not include_self:
+        query = query.where(ModuleClosure.depth > 0)
+    return query
+
+
+async def rebuild(db: AsyncSession):
+    """Перестраивает module_closure по modules.parent_module_id"""
+    tree = select(
+        Module.id.label("ancestor_id"),
+        Module.id.label("descendant_id"),
+        literal(0).label("depth"),
+    ).cte("tree", recursive=True)
+    child = Module.__table__.alias("child")
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, child.c.id, tree.c.depth + 1).join(
+            child, child.c.parent_module_id == tree.c.descendant_id
+        )
+    )
+
+    await db.execute(delete(ModuleClosure))
+    await db.execute(
+        insert(ModuleClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"], select(tree)
+        )
+    )
+
+
+async def _run():
+    async with async_session_maker() as db:
+        await rebuild(db)
+        await db.commit()
+    print("module_closure: таблица перестроена")
+    await engine.dispose()
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__).parse_args()
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
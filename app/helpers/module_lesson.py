@@ -2,7 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func, select
 from enum import Enum
 
-from app.db import Module, Lesson, LessonBlock, ORDER_STEP
+from app.db import Module, ModuleClosure, Lesson, LessonBlock, ORDER_STEP
 
 
 class EntityType(Enum):
@@ -61,11 +61,15 @@ async def get_max_order(
     return max_order + ORDER_STEP
 
 
-def get_all_submodules(module: Module) -> Module | None:
-    modules = [module]
-    for submodule in module.submodules:
-        modules.extend(get_all_submodules(submodule))
-    return modules
+async def get_all_submodules(db: AsyncSession, module_id: int) -> list[Module]:
+    """Модуль и все его подмодули, от верхних уровней к нижним"""
+    result = await db.scalars(
+        select(Module)
+        .join(ModuleClosure, ModuleClosure.descendant_id == Module.id)
+        .where(ModuleClosure.ancestor_id == module_id)
+        .order_by(ModuleClosure.depth, Module.order)
+    )
+    return list(result.unique())
 
 
 # async def auto_set_order(
@@ -1,45 +1,153 @@
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import inspect, literal, select
+from sqlalchemy.orm import joinedload, lazyload, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import Course, Module, Lesson, LessonBlock
 
+# Суммарные счетчики всех загрузчиков с момента запуска процесса
+loader_stats = {"queries": 0, "lookups": 0, "queries_saved": 0}
+
+
+class ObjectLoader:
+    """
+    Загрузчик курсов, модулей и уроков в рамках одной сессии (запроса).
+
+    Запрошенные вместе объекты читаются одним SELECT, уже загруженные
+    отдаются без обращения к БД. Каждый объект, полученный без отдельного
+    запроса, учитывается в queries_saved.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._cache: dict[tuple[type, int], object] = {}
+        self.queries = 0
+        self.queries_saved = 0
+
+    def _cached(self, model: type, obj_id: int):
+        obj = self._cache.get((model, obj_id))
+        if obj is not None and not inspect(obj).persistent:
+            self._cache.pop((model, obj_id))
+            return None
+        return obj
+
+    async def _fetch(self, wanted: list[tuple[type, int]]) -> list:
+        if len(wanted) == 1:
+            model, obj_id = wanted[0]
+            stmt = select(model).where(model.id == obj_id)
+        else:
+            # ON-условия не ссылаются на якорь: каждый LEFT JOIN независимо
+            # дает свою строку или NULL, итог - ровно одна строка
+            anchor = select(literal(1).label("anchor")).subquery()
+            stmt = select(*[model for model, _ in wanted]).select_from(anchor)
+            for model, obj_id in wanted:
+                stmt = stmt.outerjoin(model, model.id == obj_id)
+
+        if any(model is Course for model, _ in wanted):
+            # уроки и студенты курса (lazy="selectin") проверкам не нужны и
+            # стоили бы двух дополнительных запросов; lazyload, а не
+            # raiseload: объект остается в identity map сессии, и коду
+            # после проверки связи по-прежнему доступны (awaitable_attrs)
+            stmt = stmt.options(
+                lazyload(Course.lessons), lazyload(Course.students)
+            )
+
+        if any(model is Lesson for model, _ in wanted):
+            stmt = stmt.options(
+                joinedload(Lesson.module), joinedload(Lesson.blocks)
+            )
+
+        result = await self.db.execute(stmt)
+        row = result.unique().first()
+
+        self.queries += 1
+        self.queries_saved += len(wanted) - 1
+        loader_stats["queries"] += 1
+        loader_stats["queries_saved"] += len(wanted) - 1
+
+        return list(row) if row is not None else [None] * len(wanted)
+
+    async def load(
+        self,
+        *,
+        course_id: int | None = None,
+        module_id: int | None = None,
+        lesson_id: int | None = None,
+    ) -> tuple[Course | None, Module | None, Lesson | None]:
+        requested = [
+            (Course, course_id),
+            (Module, module_id),
+            (Lesson, lesson_id),
+        ]
+        found = {}
+        wanted = []
+
+        for model, obj_id in requested:
+            if obj_id is None:
+                continue
+            loader_stats["lookups"] += 1
+            obj = self._cached(model, obj_id)
+            if obj is not None:
+                found[model] = obj
+                self.queries_saved += 1
+                loader_stats["queries_saved"] += 1
+            else:
+                wanted.append((model, obj_id))
+
+        if wanted:
+            for (model, obj_id), obj in zip(wanted, await self._fetch(wanted)):
+                if obj is not None:
+                    self._cache[(model, obj_id)] = obj
+                found[model] = obj
+
+        return found.get(Course), found.get(Module), found.get(Lesson)
+
+
+def get_loader(db: AsyncSession) -> ObjectLoader:
+    loader = db.info.get("object_loader")
+    if loader is None:
+        loader = db.info["object_loader"] = ObjectLoader(db)
+    return loader
+
+
+def _not_found(detail: str):
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+
+async def resolve(
+    db: AsyncSession,
+    *,
+    course_id: int | None = None,
+    module_id: int | None = None,
+    lesson_id: int | None = None,
+) -> tuple[Course | None, Module | None, Lesson | None]:
+    """Загружает курс, модуль и урок одним запросом, 404 если чего-то нет"""
+    course, module, lesson = await get_loader(db).load(
+        course_id=course_id, module_id=module_id, lesson_id=lesson_id
+    )
 
-async def course_exists(course_id: int, db: AsyncSession):
-    course = await db.scalar(select(Course).where(Course.id == course_id))
+    if course_id is not None and course is None:
+        raise _not_found("Курс не найден")
+    if module_id is not None and module is None:
+        raise _not_found("Модуль не найден")
+    if lesson_id is not None and lesson is None:
+        raise _not_found("Урок не найден")
 
-    if course is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Курс не найден"
-        )
+    return course, module, lesson
 
+
+async def course_exists(course_id: int, db: AsyncSession):
+    course, _, _ = await resolve(db, course_id=course_id)
     return course
 
 
 async def module_exists(module_id: int, db: AsyncSession):
-    module = await db.scalar(select(Module).where(Module.id == module_id))
-
-    if module is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Модуль не найден"
-        )
-
+    _, module, _ = await resolve(db, module_id=module_id)
     return module
 
 
 async def lesson_exists(lesson_id: int, db: AsyncSession):
-    lesson = await db.scalar(
-        select(Lesson)
-        .where(Lesson.id == lesson_id)
-        .options(selectinload(Lesson.module), selectinload(Lesson.blocks))
-    )
-
-    if lesson is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Урок не найден"
-        )
-
+    _, _, lesson = await resolve(db, lesson_id=lesson_id)
     return lesson
 
 
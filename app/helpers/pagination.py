@@ -0,0 +1,64 @@
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import tuple_
+
+from app.db import Course
+
+# Порядок каталога: новые курсы первыми, id разрешает равенство created_at
+COURSE_ORDERING = (Course.created_at.desc(), Course.id.desc())
+
+
+def encode_cursor(course: Course) -> str:
+    """Непрозрачный курсор: позиция последнего курса страницы"""
+    payload = json.dumps([course.created_at.isoformat(), course.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, course_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(course_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор",
+        )
+
+
+def cursor_condition(cursor: str, skip: int, keyset: bool):
+    """
+    Условие "строго после курсора" в порядке COURSE_ORDERING. Сравнение
+    кортежей идет по индексу (..., created_at, id) без пропуска строк,
+    поэтому стоимость страницы не зависит от ее глубины.
+
+    keyset=False - страница упорядочена иначе (поиск, другая сортировка),
+    курсор к ней неприменим.
+    """
+    if skip or not keyset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Курсор нельзя сочетать с skip, search и sort",
+        )
+    created_at, course_id = decode_cursor(cursor)
+    return tuple_(Course.created_at, Course.id) < tuple_(created_at, course_id)
+
+
+def set_next_link(
+    request: Request, response: Response, courses: list[Course], limit: int
+):
+    """
+    Добавляет заголовок Link с rel="next", если выбрано больше limit
+    курсов (запрашивается limit + 1), и отбрасывает лишний.
+    """
+    if len(courses) <= limit:
+        return courses
+    courses = courses[:limit]
+    next_url = request.url.remove_query_params("skip").include_query_params(
+        cursor=encode_cursor(courses[-1])
+    )
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return courses
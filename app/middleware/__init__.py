@@ -0,0 +1 @@
+from .query_stats import QueryStatsMiddleware, current_query_stats
@@ -0,0 +1,124 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Одинаковая форма запроса, повторенная столько раз за запрос, считается N+1
+N_PLUS_ONE_THRESHOLD = 5
+
+_PARAM_LIST_RE = re.compile(
+    r"\(\s*(?:\?|\$\d+|%\(\w+\)s)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s))*\s*\)"
+)
+_NUMBERED_PARAM_RE = re.compile(r"\$\d+")
+
+
+def statement_shape(statement: str) -> str:
+    """Нормализует SQL: списки параметров IN (...) и номера $N не важны"""
+    shape = _PARAM_LIST_RE.sub("(...)", statement)
+    shape = _NUMBERED_PARAM_RE.sub("$?", shape)
+    return " ".join(shape.split())
+
+
+class QueryStats:
+    """SQL-статистика одного HTTP-запроса"""
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.db_time += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> dict:
+        return {
+            shape: count
+            for shape, count in self.shapes.items()
+            if count >= threshold
+        }
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    if current_query_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    stats = current_query_stats.get()
+    starts = conn.info.get("query_start")
+    if stats is None or not starts:
+        return
+    stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def _server_timing(stats: QueryStats, total: float) -> str:
+    metrics = [
+        f'db;dur={stats.db_time * 1000:.3f};desc="{stats.count} queries"',
+        f"app;dur={total * 1000:.3f}",
+    ]
+    for shape, count in stats.repeated().items():
+        desc = shape[:80].replace('"', "'").replace("\\", "")
+        metrics.append(f'n-plus-one;desc="{count}x {desc}"')
+    return ", ".join(metrics)
+
+
+class QueryStatsMiddleware:
+    """
+    Считает SQL-запросы и время в БД для каждого HTTP-запроса и отдает их
+    в заголовке Server-Timing. Формы запросов, повторенные не менее
+    N_PLUS_ONE_THRESHOLD раз, помечаются как n-plus-one и пишутся в лог.
+
+    Запросы, выполненные при отдаче тела StreamingResponse, в заголовок
+    не попадают: к этому моменту заголовки уже отправлены.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                timing = _server_timing(stats, time.perf_counter() - start)
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (b"server-timing", timing.encode("latin-1", "replace"))
+                )
+                message = {**message, "headers": headers}
+
+                repeated = stats.repeated()
+                if repeated:
+                    print(
+                        f" [!] Possible N+1 in {scope['method']} {scope['path']}: "
+                        f"{sum(repeated.values())} repeated queries "
+                        f"of {len(repeated)} shape(s)"
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
@@ -1,8 +1,11 @@
-from .user import SUserAuth, SUserRegister
+from .user import SUserAuth, SUserRegister, SUserResponse
 from .course import (
     SCourseCreate,
     SCourseResponse,
     SCourseUpdate,
+    SCourseFacets,
+    SCourseStats,
+    SCourseSuggestion,
     SArchivedCourseResponse,
 )
 from .lesson import (
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional
 
 from app.db import ObjectStatus
@@ -25,13 +25,39 @@ class SCourseUpdate(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
 
+class SCourseStats(BaseModel):
+    modules_count: int = 0
+    lessons_count: int = 0
+    total_duration: int = 0
+    purchases_count: int = 0
+    model_config = ConfigDict(from_attributes=True)
+
+
 class SCourseResponse(SCourseBase):
     id: int
     owner_id: int
     status: ObjectStatus
     created_at: datetime
+    stats: SCourseStats = SCourseStats()
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator("stats", mode="before")
+    @classmethod
+    def empty_stats(cls, value):
+        # строка course_stats появляется при первом изменении курса
+        return SCourseStats() if value is None else value
+
+
+class SCourseSuggestion(BaseModel):
+    id: int
+    title: str
+
+
+class SCourseFacets(BaseModel):
+    total: int
+    status: dict[ObjectStatus, int]
+    price: dict[str, int]
+
 
 class SArchivedCourseResponse(BaseModel):
     id: int
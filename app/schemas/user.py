@@ -1,5 +1,7 @@
 from datetime import datetime
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
+
+from app.db import UserRole
 
 
 class SUserRegister(BaseModel):
@@ -41,3 +43,15 @@ class SUserAuth(BaseModel):
         max_length=50,
         description="Пароль, от 5 до 50 знаков",
     )
+
+
+class SUserResponse(BaseModel):
+    id: int
+    username: str
+    email: str
+    first_name: str | None
+    last_name: str | None
+    role: UserRole
+    is_active: bool | None
+    created_at: datetime | None
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,173 @@
+"""
+Запросы каталога курсов на синтетическом каталоге (по умолчанию 100k).
+
+Сравнивается старый get_courses (отдельный SELECT владельца, затем
+страница и selectinload владельцев) с одним запросом CatalogQuery при
+разных фильтрах и сортировках, и подсчет фасетов одним агрегатом.
+
+Запуск:
+    python -m benchmarks.catalog_query --courses 100000 --repeat 20
+    BENCH_DATABASE_URL=postgresql+asyncpg://... \\
+        python -m benchmarks.catalog_query
+
+По умолчанию используется временная SQLite-база. Таблицы в указанной БД
+пересоздаются, не запускайте на рабочей базе.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.db.base import Base, ObjectStatus
+from app.db.course import Course
+from app.db.user import User, UserRole
+from app.helpers.course_catalog import CatalogQuery, get_facets, parse_sort
+from app.policies import CoursePolicy
+
+TEACHERS = 200
+PAGE_SIZE = 20
+CHUNK_SIZE = 5000
+STATUSES = [ObjectStatus.published] * 8 + [
+    ObjectStatus.draft,
+    ObjectStatus.archived,
+]
+
+
+async def seed(engine, courses: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "username": f"teacher_{i}",
+                    "email": f"teacher_{i}@example.com",
+                    "hashed_password": "fakehashed",
+                    "role": UserRole.teacher,
+                }
+                for i in range(1, TEACHERS + 1)
+            ],
+        )
+        rng = random.Random(42)
+        now = datetime.now(timezone.utc)
+        for start in range(0, courses, CHUNK_SIZE):
+            await conn.execute(
+                insert(Course),
+                [
+                    {
+                        "title": f"Курс {i:06d}",
+                        "description": "Синтетический курс",
+                        "price": round(rng.uniform(100, 10000), 2),
+                        "status": STATUSES[i % len(STATUSES)],
+                        "owner_id": i % TEACHERS + 1,
+                        "created_at": now - timedelta(minutes=i),
+                        "updated_at": now,
+                    }
+                    for i in range(start, min(start + CHUNK_SIZE, courses))
+                ],
+            )
+
+
+async def legacy_page(session, user, owner_username, sort):
+    owner = (
+        await session.execute(
+            select(User).where(User.username == owner_username)
+        )
+    ).scalar_one()
+    result = await session.execute(
+        select(Course)
+        .where(
+            CoursePolicy.build_access_condition(user),
+            Course.owner_id == owner.id,
+        )
+        .order_by(Course.created_at.desc())
+        .limit(PAGE_SIZE)
+        .options(selectinload(Course.owner))
+    )
+    return result.scalars().all()
+
+
+def catalog_page(**filters):
+    sort = filters.pop("sort", "-created_at")
+
+    async def run(session, user, owner_username, _):
+        catalog = CatalogQuery(user, owner_username=owner_username, **filters)
+        result = await session.execute(
+            catalog.courses().order_by(*parse_sort(sort)).limit(PAGE_SIZE)
+        )
+        return result.scalars().all()
+
+    return run
+
+
+async def facets(session, user, owner_username, _):
+    return await get_facets(
+        session, CatalogQuery(user, owner_username=owner_username)
+    )
+
+
+CASES = [
+    ("старый: владелец + страница + selectinload", legacy_page),
+    ("один запрос: владелец, -created_at", catalog_page()),
+    ("один запрос: владелец, price,-created_at", catalog_page(sort="price")),
+    ("один запрос: владелец, title", catalog_page(sort="title")),
+    (
+        "один запрос: владелец, цена 1000-3000",
+        catalog_page(min_price=1000, max_price=3000, sort="-price"),
+    ),
+    ("фасеты владельца (один агрегат)", facets),
+]
+
+
+async def run(url: str, args):
+    engine = create_async_engine(url)
+    start = time.perf_counter()
+    await seed(engine, args.courses)
+    print(f"seed: {args.courses} курсов за {time.perf_counter() - start:.1f}s")
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    student = User(id=0, role=UserRole.student)
+    rng = random.Random(7)
+
+    for label, case in CASES:
+        timings = []
+        for _ in range(args.repeat):
+            owner = f"teacher_{rng.randint(1, TEACHERS)}"
+            async with session_maker() as session:
+                started = time.perf_counter()
+                await case(session, student, owner, None)
+                timings.append(time.perf_counter() - started)
+        print(
+            f"{label:<46} median={statistics.median(timings) * 1000:8.2f}ms "
+            f"max={max(timings) * 1000:8.2f}ms"
+        )
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        url = f"sqlite+aiosqlite:///{path}"
+
+    asyncio.run(run(url, args))
+
+
+if __name__ == "__main__":
+    main()
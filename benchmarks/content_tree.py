@@ -0,0 +1,267 @@
+"""
+Дерево содержимого курса (GET /course/{id}/content/) на большом курсе
+(по умолчанию 10k модулей и 100k уроков).
+
+Сравнивается старая загрузка (ORM-объекты модулей, selectinload
+подмодулей и уроков, JOIN parent на каждую строку, сортировки в
+Python, валидация ответа по модели) с двумя плоскими запросами по
+колонкам, сборкой за O(n) и сериализацией словарей. Отдельно по всем
+строкам курса измеряются сборка, сериализация и валидация по модели.
+
+Запуск:
+    python -m benchmarks.content_tree --modules 10000 --lessons 100000
+    BENCH_DATABASE_URL=postgresql+asyncpg://... \\
+        python -m benchmarks.content_tree
+
+По умолчанию используется временная SQLite-база. Таблицы в указанной БД
+пересоздаются, не запускайте на рабочей базе.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.db.base import Base, ObjectStatus
+from app.db.course import Course
+from app.db.lesson import Lesson
+from app.db.module import Module, ModuleContentType
+from app.db.user import User, UserRole
+from app.helpers.content_tree import (
+    LESSON_COLUMNS,
+    MODULE_COLUMNS,
+    assemble_tree,
+    fetch_course_tree,
+    serialize_tree,
+)
+from app.schemas import (
+    SLessonResponse,
+    SModuleTreeResponse,
+    build_module_tree_response,
+)
+
+CHUNK_SIZE = 5000
+# доля разделов верхнего уровня: остальные модули - их подмодули с уроками
+SECTIONS_SHARE = 0.1
+STATUSES = [ObjectStatus.published] * 8 + [
+    ObjectStatus.draft,
+    ObjectStatus.archived,
+]
+
+tree_adapter = TypeAdapter(list[SModuleTreeResponse | SLessonResponse])
+
+
+async def seed(engine, modules: int, lessons: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "username": "teacher",
+                    "email": "teacher@example.com",
+                    "hashed_password": "fakehashed",
+                    "role": UserRole.teacher,
+                }
+            ],
+        )
+        now = datetime.now(timezone.utc)
+        await conn.execute(
+            insert(Course),
+            [
+                {
+                    "title": "Большой курс",
+                    "description": "Синтетический курс",
+                    "price": 1000,
+                    "status": ObjectStatus.published,
+                    "owner_id": 1,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            ],
+        )
+
+        sections = max(1, int(modules * SECTIONS_SHARE))
+        rows = []
+        for i in range(1, modules + 1):
+            is_section = i <= sections
+            rows.append(
+                {
+                    "id": i,
+                    "title": f"Модуль {i}",
+                    "description": "Модуль",
+                    "course_id": 1,
+                    "parent_module_id": (
+                        None if is_section else i % sections + 1
+                    ),
+                    "status": STATUSES[i % len(STATUSES)],
+                    "content_type": (
+                        ModuleContentType.modules
+                        if is_section
+                        else ModuleContentType.lessons
+                    ),
+                    # порядок не совпадает с id: сортировка обязательна
+                    "order": (modules - i) * 100,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+        for start in range(0, len(rows), CHUNK_SIZE):
+            await conn.execute(insert(Module), rows[start : start + CHUNK_SIZE])
+
+        leaves = modules - sections
+        for start in range(0, lessons, CHUNK_SIZE):
+            await conn.execute(
+                insert(Lesson),
+                [
+                    {
+                        "title": f"Урок {j}",
+                        "course_id": 1,
+                        "module_id": sections + 1 + j % max(1, leaves),
+                        "status": STATUSES[j % len(STATUSES)],
+                        "order": (lessons - j) * 100,
+                        "duration": 10,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for j in range(start, min(start + CHUNK_SIZE, lessons))
+                ],
+            )
+
+
+async def legacy_tree(session):
+    """Загрузка и сборка дерева до перехода на плоские запросы"""
+    result = await session.execute(
+        select(Module)
+        .where(Module.course_id == 1, Module.status == ObjectStatus.published)
+        .options(selectinload(Module.submodules), selectinload(Module.lessons))
+    )
+    flat_modules = result.unique().scalars().all()
+    module_map = {}
+    for module in flat_modules:
+        module_map[module.id] = {
+            "module": module,
+            "children": [],
+            "lessons": [
+                lesson
+                for lesson in module.lessons
+                if lesson.status == ObjectStatus.published
+            ],
+        }
+    roots = []
+    for module in flat_modules:
+        node = module_map[module.id]
+        if module.parent_module_id is None:
+            roots.append(node)
+        elif module.parent_module_id in module_map:
+            module_map[module.parent_module_id]["children"].append(node)
+    for node in module_map.values():
+        node["children"].sort(key=lambda x: x["module"].order)
+        node["lessons"].sort(key=lambda x: x.order)
+    # так ответ сериализовал FastAPI: валидация по response_model и dump
+    return tree_adapter.dump_json(
+        tree_adapter.validate_python(
+            [build_module_tree_response(node) for node in roots]
+        )
+    )
+
+
+async def flat_tree(session):
+    roots = await fetch_course_tree(session, 1, "student")
+    return serialize_tree(roots)
+
+
+def timed(timings: list[float], started: float):
+    timings.append(time.perf_counter() - started)
+
+
+def report(label: str, timings: list[float]):
+    print(
+        f"{label:<44} median={statistics.median(timings) * 1000:9.1f}ms "
+        f"max={max(timings) * 1000:9.1f}ms"
+    )
+
+
+async def run(url: str, args):
+    engine = create_async_engine(url)
+    start = time.perf_counter()
+    await seed(engine, args.modules, args.lessons)
+    print(
+        f"seed: {args.modules} модулей, {args.lessons} уроков "
+        f"за {time.perf_counter() - start:.1f}s"
+    )
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    for label, case in (
+        ("старый: selectinload + JOIN parent + sort", legacy_tree),
+        ("два плоских запроса + сборка O(n)", flat_tree),
+    ):
+        timings = []
+        for _ in range(args.repeat):
+            async with session_maker() as session:
+                started = time.perf_counter()
+                await case(session)
+                timed(timings, started)
+        report(label, timings)
+
+    async with session_maker() as session:
+        modules = await session.execute(
+            select(*MODULE_COLUMNS)
+            .where(Module.course_id == 1)
+            .order_by(Module.order)
+        )
+        module_keys, module_rows = list(modules.keys()), modules.all()
+        lessons = await session.execute(
+            select(*LESSON_COLUMNS)
+            .where(Lesson.course_id == 1)
+            .order_by(Lesson.order)
+        )
+        lesson_keys, lesson_rows = list(lessons.keys()), lessons.all()
+
+    assemble, serialize, validate = [], [], []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        roots = assemble_tree(
+            (dict(zip(module_keys, row)) for row in module_rows),
+            (dict(zip(lesson_keys, row)) for row in lesson_rows),
+        )
+        timed(assemble, started)
+        started = time.perf_counter()
+        serialize_tree(roots)
+        timed(serialize, started)
+        started = time.perf_counter()
+        tree_adapter.dump_json(tree_adapter.validate_python(roots))
+        timed(validate, started)
+    report("все строки: сборка дерева", assemble)
+    report("все строки: serialize_tree", serialize)
+    report("все строки: валидация + dump по модели", validate)
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modules", type=int, default=10_000)
+    parser.add_argument("--lessons", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        url = f"sqlite+aiosqlite:///{path}"
+
+    asyncio.run(run(url, args))
+
+
+if __name__ == "__main__":
+    main()
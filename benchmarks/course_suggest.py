@@ -0,0 +1,94 @@
+"""
+Префиксный индекс подсказок (GET /course/suggest) на синтетических
+названиях (по умолчанию 1M).
+
+Измеряются построение индекса, задержка подсказки для префиксов разной
+длины (короткий префикс - много совпадений, берутся первые k) и
+изменение курса (вставка/удаление в отсортированном массиве).
+
+Запуск:
+    python -m benchmarks.course_suggest --titles 1000000 --repeat 2000
+
+БД не используется.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from app.helpers.course_suggest import SuggestIndex
+
+WORDS = [
+    "основы",
+    "python",
+    "алгебра",
+    "история",
+    "машинное",
+    "обучение",
+    "дизайн",
+    "английский",
+    "для",
+    "начинающих",
+    "продвинутый",
+    "курс",
+    "sql",
+    "django",
+    "физика",
+    "химия",
+]
+
+
+def make_titles(count: int, rng: random.Random):
+    for i in range(count):
+        words = rng.choices(WORDS, k=rng.randint(2, 5))
+        yield i + 1, f"{' '.join(words).capitalize()} {i}"
+
+
+def measure(label: str, timings: list[float]):
+    timings = sorted(timings)
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(
+        f"{label:<34} median={statistics.median(timings) * 1000:7.4f}ms "
+        f"p99={p99 * 1000:7.4f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    rows = list(make_titles(args.titles, rng))
+
+    index = SuggestIndex()
+    started = time.perf_counter()
+    index.build(rows)
+    print(
+        f"build: {len(index)} названий за {time.perf_counter() - started:.1f}s"
+    )
+
+    for length in (1, 3, 6, 12):
+        timings = []
+        for _ in range(args.repeat):
+            _, title = rows[rng.randrange(len(rows))]
+            prefix = title[:length]
+            started = time.perf_counter()
+            index.suggest(prefix, args.limit)
+            timings.append(time.perf_counter() - started)
+        measure(f"suggest, префикс {length} симв.", timings)
+
+    timings = []
+    for _ in range(args.repeat):
+        course_id, title = rows[rng.randrange(len(rows))]
+        started = time.perf_counter()
+        index.apply(course_id, f"{title} (обновлен)")
+        timings.append(time.perf_counter() - started)
+    measure("изменение названия", timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Сравнение массовых операций BaseDAO со старыми методами.
+
+Запуск:
+    python -m benchmarks.dao_bulk --rows 10000 100000
+    BENCH_DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.dao_bulk
+
+По умолчанию используется временная SQLite-база. Таблицы в указанной БД
+пересоздаются, не запускайте на рабочей базе.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.dao.user import UserDAO
+from app.db.base import Base
+from app.db.user import User, UserRole
+
+
+def user_rows(count: int, prefix: str) -> list[dict]:
+    return [
+        {
+            "username": f"{prefix}_{i}",
+            "email": f"{prefix}_{i}@example.com",
+            "hashed_password": "fakehashed",
+            "role": UserRole.student,
+        }
+        for i in range(count)
+    ]
+
+
+async def timed(label: str, rows: int, coro):
+    start = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<32} rows={rows:<7} {elapsed:8.3f}s "
+        f"{rows / elapsed:12.0f} rows/s"
+    )
+    return result
+
+
+async def per_row_update(ids: list[int], session):
+    for user_id in ids:
+        await UserDAO.update(
+            {"id": user_id},
+            session=session,
+            synchronize_session="fetch",
+            first_name=f"name_{user_id}",
+        )
+
+
+async def run(url: str, sizes: list[int]):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    for rows in sizes:
+        async with session_maker() as session:
+            instances = await timed(
+                "add_many (ORM add_all)",
+                rows,
+                UserDAO.add_many(user_rows(rows, "orm"), session=session),
+            )
+            await session.commit()
+            ids = [user.id for user in instances]
+            session.expunge_all()
+
+            await timed(
+                "update per row (fetch)", rows, per_row_update(ids, session)
+            )
+            await session.commit()
+            await session.execute(delete(User))
+            await session.commit()
+
+        async with session_maker() as session:
+            ids = await timed(
+                "bulk_insert (INSERT RETURNING)",
+                rows,
+                UserDAO.bulk_insert(user_rows(rows, "bulk"), session=session),
+            )
+            await session.commit()
+
+            await timed(
+                "bulk_update (executemany)",
+                rows,
+                UserDAO.bulk_update(
+                    [{"id": i, "first_name": f"name_{i}"} for i in ids],
+                    session=session,
+                ),
+            )
+            await session.commit()
+
+            await timed(
+                "upsert (ON CONFLICT)",
+                rows,
+                UserDAO.upsert(
+                    user_rows(rows, "bulk"),
+                    index_elements=["username"],
+                    update_fields=["hashed_password"],
+                    session=session,
+                ),
+            )
+            await session.commit()
+            await session.execute(delete(User))
+            await session.commit()
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        url = f"sqlite+aiosqlite:///{path}"
+
+    asyncio.run(run(url, args.rows))
+
+
+if __name__ == "__main__":
+    main()
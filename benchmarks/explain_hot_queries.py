@@ -0,0 +1,342 @@
+"""
+Планы основных запросов эндпоинтов без индексов горячего пути и с ними.
+
+Запуск:
+    python -m benchmarks.explain_hot_queries --courses 2000
+    BENCH_DATABASE_URL=postgresql+asyncpg://... \\
+        python -m benchmarks.explain_hot_queries --analyze
+
+По умолчанию используется временная SQLite-база (EXPLAIN QUERY PLAN), для
+PostgreSQL выводится EXPLAIN, с --analyze - EXPLAIN (ANALYZE, BUFFERS).
+Таблицы в указанной БД пересоздаются, не запускайте на рабочей базе.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.auth.auth import hash_refresh_token
+from app.db.base import Base, ObjectStatus
+from app.db.course import Course
+from app.db.course_purchase import CoursePurchase
+from app.db.lesson import Lesson, LessonBlock, LessonBlockType
+from app.db.module import Module, ModuleContentType
+from app.db.payment_transaction import PaymentTransaction
+from app.db.refresh_token import RefreshToken
+from app.db.user import User, UserRole
+
+# Индексы миграций 6ae0f2801f81 и курсорной пагинации каталога,
+# удаляются для замера "до"
+HOT_PATH_INDEXES = (
+    "ix_modules_course_id_parent_module_id_order",
+    "ix_modules_course_id_order_not_archived",
+    "ix_lessons_course_id_module_id_order",
+    "ix_lessons_course_id_order_not_archived",
+    "ix_lesson_blocks_lesson_id_order",
+    "ix_course_purchases_user_id_course_id",
+    "ix_payment_transactions_payment_intent_id",
+    "ix_refresh_tokens_expires_at",
+    "ix_courses_created_at_id",
+    "ix_courses_status_created_at_id",
+    "ix_courses_owner_id_created_at_id_not_archived",
+)
+
+TEACHERS = 50
+MODULES_PER_COURSE = 4
+LESSONS_PER_MODULE = 4
+BLOCKS_PER_LESSON = 3
+CHUNK_SIZE = 5000
+
+
+def hot_path_indexes():
+    return [
+        index
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+        if index.name in HOT_PATH_INDEXES
+    ]
+
+
+def status_for(i: int) -> ObjectStatus:
+    if i % 5 == 0:
+        return ObjectStatus.archived
+    if i % 5 == 1:
+        return ObjectStatus.draft
+    return ObjectStatus.published
+
+
+async def insert_chunked(conn, model, rows: list[dict]):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        await conn.execute(insert(model), rows[start : start + CHUNK_SIZE])
+
+
+async def seed(conn, courses: int):
+    now = datetime.now(timezone.utc)
+    users = [
+        {
+            "id": i,
+            "username": f"user_{i}",
+            "email": f"user_{i}@example.com",
+            "hashed_password": "fakehashed",
+            "role": UserRole.teacher if i <= TEACHERS else UserRole.student,
+        }
+        for i in range(1, TEACHERS + courses + 1)
+    ]
+    await insert_chunked(conn, User, users)
+
+    await insert_chunked(
+        conn,
+        Course,
+        [
+            {
+                "id": i,
+                "title": f"Курс {i}",
+                "description": "Описание",
+                "price": float(i % 100),
+                "status": status_for(i),
+                "created_at": now - timedelta(minutes=i),
+                "updated_at": now - timedelta(minutes=i),
+                "owner_id": i % TEACHERS + 1,
+            }
+            for i in range(1, courses + 1)
+        ],
+    )
+
+    modules, lessons, blocks = [], [], []
+    for course_id in range(1, courses + 1):
+        for m in range(MODULES_PER_COURSE):
+            module_id = len(modules) + 1
+            modules.append(
+                {
+                    "id": module_id,
+                    "title": f"Модуль {module_id}",
+                    "order": (m + 1) * 100,
+                    "course_id": course_id,
+                    "status": status_for(module_id),
+                    "content_type": ModuleContentType.lessons,
+                }
+            )
+            for lsn in range(LESSONS_PER_MODULE):
+                lesson_id = len(lessons) + 1
+                lessons.append(
+                    {
+                        "id": lesson_id,
+                        "title": f"Урок {lesson_id}",
+                        "order": (lsn + 1) * 100,
+                        "module_id": module_id,
+                        "course_id": course_id,
+                        "status": status_for(lesson_id),
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                )
+                for b in range(BLOCKS_PER_LESSON):
+                    blocks.append(
+                        {
+                            "lesson_id": lesson_id,
+                            "order": (b + 1) * 100,
+                            "type": LessonBlockType.TEXT,
+                            "content": "Текст",
+                        }
+                    )
+
+    await insert_chunked(conn, Module, modules)
+    await insert_chunked(conn, Lesson, lessons)
+    await insert_chunked(conn, LessonBlock, blocks)
+
+    students = range(TEACHERS + 1, TEACHERS + courses + 1)
+    await insert_chunked(
+        conn,
+        PaymentTransaction,
+        [
+            {
+                "id": i,
+                "transaction_uuid": f"00000000-0000-0000-0000-{i:012d}",
+                "course_id": i % courses + 1,
+                "payment_intent_id": f"pi_{i}",
+                "user_id": user_id,
+                "status": "success",
+            }
+            for i, user_id in enumerate(students, start=1)
+        ],
+    )
+    await insert_chunked(
+        conn,
+        CoursePurchase,
+        [
+            {
+                "user_id": user_id,
+                "course_id": i % courses + 1,
+                "transaction_id": i,
+            }
+            for i, user_id in enumerate(students, start=1)
+        ],
+    )
+    await insert_chunked(
+        conn,
+        RefreshToken,
+        [
+            {
+                "user_id": user["id"],
+                "token_hash": hash_refresh_token(f"token_{user['id']}"),
+                "expires_at": now + timedelta(days=user["id"] % 14 - 7),
+                "created_at": now,
+            }
+            for user in users
+        ],
+    )
+
+
+def hot_queries(courses: int) -> list[tuple[str, object]]:
+    course_id = courses // 2
+    lesson_id = course_id * MODULES_PER_COURSE * LESSONS_PER_MODULE
+    student_id = TEACHERS + course_id
+
+    return [
+        (
+            "GET /course/ (каталог)",
+            select(Course)
+            .where(Course.status == ObjectStatus.published)
+            .order_by(Course.created_at.desc(), Course.id.desc())
+            .limit(20),
+        ),
+        (
+            "GET /course/?cursor= (глубокая страница)",
+            select(Course)
+            .where(
+                Course.status == ObjectStatus.published,
+                tuple_(Course.created_at, Course.id)
+                < tuple_(
+                    datetime.now(timezone.utc) - timedelta(minutes=course_id),
+                    course_id,
+                ),
+            )
+            .order_by(Course.created_at.desc(), Course.id.desc())
+            .limit(20),
+        ),
+        (
+            "GET /course/my",
+            select(Course)
+            .where(
+                Course.owner_id == 1,
+                Course.status != ObjectStatus.archived,
+            )
+            .order_by(Course.created_at.desc(), Course.id.desc()),
+        ),
+        (
+            "GET /course/{id} (модули)",
+            select(Module).where(
+                Module.course_id == course_id,
+                Module.status != ObjectStatus.archived,
+            ),
+        ),
+        (
+            "GET /course/{id}/module/{id} (уроки)",
+            select(Lesson)
+            .where(Lesson.course_id == course_id)
+            .order_by(Lesson.order),
+        ),
+        (
+            "POST /course/{id}/module/ (max order)",
+            select(func.max(Module.order)).where(Module.course_id == course_id),
+        ),
+        (
+            "GET /course/{id}/lesson/{id} (блоки)",
+            select(LessonBlock)
+            .where(LessonBlock.lesson_id == lesson_id)
+            .order_by(LessonBlock.order),
+        ),
+        (
+            "POST /payments/ (проверка покупки)",
+            select(CoursePurchase).where(
+                CoursePurchase.user_id == student_id,
+                CoursePurchase.course_id == course_id,
+            ),
+        ),
+        (
+            "GET /payments/intent/{id}",
+            select(PaymentTransaction).where(
+                PaymentTransaction.payment_intent_id == f"pi_{course_id}"
+            ),
+        ),
+        (
+            "истекшие refresh-токены",
+            select(RefreshToken.id).where(
+                RefreshToken.expires_at < func.current_timestamp()
+            ),
+        ),
+    ]
+
+
+async def explain_all(conn, queries, analyze: bool):
+    if conn.dialect.name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+    else:
+        prefix = "EXPLAIN QUERY PLAN "
+
+    for label, stmt in queries:
+        sql = str(
+            stmt.compile(
+                dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+            )
+        )
+        result = await conn.exec_driver_sql(prefix + sql)
+        print(f"\n-- {label}")
+        for row in result:
+            print(f"   {row[-1]}")
+
+
+async def run(url: str, courses: int, analyze: bool):
+    engine = create_async_engine(url)
+    indexes = hot_path_indexes()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for index in indexes:
+            await conn.run_sync(index.drop)
+        await seed(conn, courses)
+
+    queries = hot_queries(courses)
+
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+        print("=" * 30, "без индексов", "=" * 30)
+        await explain_all(conn, queries, analyze)
+
+    async with engine.begin() as conn:
+        for index in indexes:
+            await conn.run_sync(index.create)
+        await conn.exec_driver_sql("ANALYZE")
+        print()
+        print("=" * 30, "с индексами", "=" * 30)
+        await explain_all(conn, queries, analyze)
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument(
+        "--analyze",
+        action="store_true",
+        help="EXPLAIN ANALYZE на PostgreSQL (запросы выполняются)",
+    )
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        url = f"sqlite+aiosqlite:///{path}"
+
+    asyncio.run(run(url, args.courses, args.analyze))
+
+
+if __name__ == "__main__":
+    main()
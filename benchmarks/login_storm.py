@@ -0,0 +1,136 @@
+"""
+Задержка "легких" запросов во время волны логинов.
+
+Параллельно с проверками паролей в том же event loop запускаются
+легкие запросы (1 мс ожидания ввода-вывода) каждые --probe-interval мс.
+Для каждого режима выводится p50/p99/max их задержки и пропускная
+способность логинов:
+    sync    - pwd_context.verify прямо в корутине (старое поведение)
+    thread  - verify_password_async на ThreadPoolExecutor
+    process - то же на ProcessPoolExecutor
+
+Запуск:
+    python -m benchmarks.login_storm --logins 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.auth.auth import get_password_hash, verify_password
+
+PROBE_WORK_SECONDS = 0.001
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+    return ordered[idx]
+
+
+async def probe(arrived_at: float, latencies: list[float]):
+    await asyncio.sleep(PROBE_WORK_SECONDS)
+    latencies.append(time.perf_counter() - arrived_at)
+
+
+async def probe_loop(interval: float, latencies: list[float], stop):
+    """
+    Запросы "приходят" строго по расписанию. Задержка считается от момента
+    прихода, поэтому запросы, пришедшие во время блокировки event loop,
+    учитываются вместе со временем ожидания.
+    """
+    tasks = []
+    started = time.perf_counter()
+    arrivals = 0
+    while True:
+        now = time.perf_counter()
+        while started + arrivals * interval <= now:
+            arrived_at = started + arrivals * interval
+            tasks.append(asyncio.create_task(probe(arrived_at, latencies)))
+            arrivals += 1
+        if stop.is_set():
+            break
+        await asyncio.sleep(started + arrivals * interval - now)
+    await asyncio.gather(*tasks)
+
+
+async def run_mode(mode: str, args, hashed: str):
+    executor = None
+    if mode == "thread":
+        executor = ThreadPoolExecutor(max_workers=args.workers)
+    elif mode == "process":
+        executor = ProcessPoolExecutor(max_workers=args.workers)
+        # прогрев: запуск процессов не должен попасть в замер
+        await asyncio.gather(
+            *[
+                asyncio.get_running_loop().run_in_executor(
+                    executor, verify_password, "password", hashed
+                )
+                for _ in range(args.workers)
+            ]
+        )
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def login():
+        async with semaphore:
+            if executor is None:
+                return verify_password("password", hashed)
+            return await loop.run_in_executor(
+                executor, verify_password, "password", hashed
+            )
+
+    latencies: list[float] = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(
+        probe_loop(args.probe_interval / 1000, latencies, stop)
+    )
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[login() for _ in range(args.logins)])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await prober
+    if executor is not None:
+        executor.shutdown()
+
+    assert all(results)
+    ms = [value * 1000 for value in latencies]
+    print(
+        f"{mode:<8} logins/s={args.logins / elapsed:8.1f} "
+        f"probes={len(ms):<5} "
+        f"p50={statistics.median(ms):8.2f}ms "
+        f"p99={percentile(ms, 99):8.2f}ms "
+        f"max={max(ms):8.2f}ms"
+    )
+
+
+async def run(args):
+    hashed = get_password_hash("password")
+    for mode in args.modes:
+        await run_mode(mode, args, hashed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--probe-interval", type=float, default=5, help="мс между запросами"
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=["sync", "thread", "process"],
+        default=["sync", "thread", "process"],
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
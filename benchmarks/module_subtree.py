@@ -0,0 +1,216 @@
+"""
+Поддерево модуля (GET /course/{id}/module/{module_id}) при росте
+соседних поддеревьев.
+
+Курс состоит из --siblings разделов одинакового размера: у раздела
+--width подмодулей по --lessons уроков. Запрашивается всегда первый
+раздел, меняется только число соседей. Сравнивается старая загрузка
+(все модули и уроки курса ORM-объектами, карта всего курса, валидация
+по модели) с чтением поддерева по таблице замыкания module_closure.
+
+Запуск:
+    python -m benchmarks.module_subtree --siblings 10 100 1000
+    BENCH_DATABASE_URL=postgresql+asyncpg://... \\
+        python -m benchmarks.module_subtree
+
+По умолчанию используется временная SQLite-база. Таблицы в указанной БД
+пересоздаются, не запускайте на рабочей базе.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base, ObjectStatus
+from app.db.course import Course
+from app.db.lesson import Lesson
+from app.db.module import Module, ModuleContentType
+from app.db.user import User, UserRole
+from app.helpers import module_closure
+from app.helpers.content_tree import fetch_module_tree, serialize_module
+from app.schemas import build_module_tree_response
+
+CHUNK_SIZE = 5000
+
+
+async def seed(engine, siblings: int, width: int, lessons: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [
+                {
+                    "username": "teacher",
+                    "email": "teacher@example.com",
+                    "hashed_password": "fakehashed",
+                    "role": UserRole.teacher,
+                }
+            ],
+        )
+        now = datetime.now(timezone.utc)
+        await conn.execute(
+            insert(Course),
+            [
+                {
+                    "title": "Большой курс",
+                    "description": "Синтетический курс",
+                    "price": 1000,
+                    "status": ObjectStatus.published,
+                    "owner_id": 1,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            ],
+        )
+
+        def module(module_id, parent_id, content_type, order):
+            return {
+                "id": module_id,
+                "title": f"Модуль {module_id}",
+                "description": "Модуль",
+                "course_id": 1,
+                "parent_module_id": parent_id,
+                "status": ObjectStatus.published,
+                "content_type": content_type,
+                "order": order,
+                "created_at": now,
+                "updated_at": now,
+            }
+
+        # разделы - id 1..siblings, подмодули раздела s идут следом
+        modules, leaves = [], []
+        for section in range(1, siblings + 1):
+            modules.append(
+                module(section, None, ModuleContentType.modules, section)
+            )
+            for i in range(width):
+                leaf_id = siblings + (section - 1) * width + i + 1
+                modules.append(
+                    module(leaf_id, section, ModuleContentType.lessons, i)
+                )
+                leaves.append(leaf_id)
+        for start in range(0, len(modules), CHUNK_SIZE):
+            await conn.execute(
+                insert(Module), modules[start : start + CHUNK_SIZE]
+            )
+
+        rows = [
+            {
+                "title": f"Урок {leaf_id}.{j}",
+                "course_id": 1,
+                "module_id": leaf_id,
+                "status": ObjectStatus.published,
+                "order": j,
+                "duration": 10,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for leaf_id in leaves
+            for j in range(lessons)
+        ]
+        for start in range(0, len(rows), CHUNK_SIZE):
+            await conn.execute(insert(Lesson), rows[start : start + CHUNK_SIZE])
+
+    # массовая вставка обходит события маппера Module
+    session_maker = async_sessionmaker(engine)
+    async with session_maker() as session:
+        await module_closure.rebuild(session)
+        await session.commit()
+    return len(modules), len(rows)
+
+
+async def legacy_subtree(session, module_id: int):
+    """Сборка поддерева до перехода на module_closure"""
+    all_modules = await session.scalars(
+        select(Module).where(Module.course_id == 1)
+    )
+    flat_modules = all_modules.unique().all()
+    lessons = await session.scalars(
+        select(Lesson).where(Lesson.course_id == 1).order_by(Lesson.order)
+    )
+    lessons_by_module = defaultdict(list)
+    for lesson in lessons.unique().all():
+        lessons_by_module[lesson.module_id].append(lesson)
+
+    module_map = {
+        m.id: {"module": m, "children": [], "lessons": []} for m in flat_modules
+    }
+    for module in flat_modules:
+        node = module_map[module.id]
+        node["lessons"] = lessons_by_module.get(module.id, [])
+        parent = module_map.get(module.parent_module_id)
+        if parent:
+            parent["children"].append(node)
+    return (
+        build_module_tree_response(module_map[module_id])
+        .model_dump_json()
+        .encode()
+    )
+
+
+async def closure_subtree(session, module_id: int):
+    node = await fetch_module_tree(session, 1, module_id, "student")
+    return serialize_module(node)
+
+
+async def run(url: str, args):
+    for siblings in args.siblings:
+        engine = create_async_engine(url)
+        start = time.perf_counter()
+        modules, lessons = await seed(
+            engine, siblings, args.width, args.lessons
+        )
+        print(
+            f"siblings={siblings}: {modules} модулей, {lessons} уроков "
+            f"(seed {time.perf_counter() - start:.1f}s)"
+        )
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+        for label, case in (
+            ("старый: весь курс", legacy_subtree),
+            ("module_closure: только поддерево", closure_subtree),
+        ):
+            timings = []
+            for _ in range(args.repeat):
+                # новая сессия: identity map не переиспользуется
+                async with session_maker() as session:
+                    started = time.perf_counter()
+                    await case(session, 1)
+                    timings.append(time.perf_counter() - started)
+            print(
+                f"  {label:<34} "
+                f"median={statistics.median(timings) * 1000:9.2f}ms "
+                f"max={max(timings) * 1000:9.2f}ms"
+            )
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--siblings", type=int, nargs="+", default=[10, 100, 1000]
+    )
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--lessons", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        url = f"sqlite+aiosqlite:///{path}"
+
+    asyncio.run(run(url, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Время хэширования и пиковая память для разных параметров argon2id и bcrypt.
+
+Каждый набор параметров измеряется в отдельном процессе, пиковая память -
+прирост ru_maxrss процесса после хэширования. Столбец hashes/s/core - сколько
+логинов в секунду выдержит одно ядро при таких параметрах.
+
+Запуск:
+    python -m benchmarks.password_hash_cost
+    python -m benchmarks.password_hash_cost --argon2 2:19456:1 3:65536:4 \\
+        --bcrypt 10 12 --iterations 10
+
+Параметры argon2 задаются как time_cost:memory_cost_kib:parallelism.
+"""
+
+import argparse
+import multiprocessing
+import resource
+import statistics
+import time
+
+from app.core.settings import (
+    AUTH_ARGON2_TIME_COST,
+    AUTH_ARGON2_MEMORY_COST,
+    AUTH_ARGON2_PARALLELISM,
+)
+
+
+def max_rss_kib() -> int:
+    # на Linux ru_maxrss в КиБ
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(scheme: str, params: dict, iterations: int, results):
+    from passlib.context import CryptContext
+
+    context = CryptContext(
+        schemes=[scheme], **{f"{scheme}__{k}": v for k, v in params.items()}
+    )
+    # загрузка бэкенда не должна попасть в замер памяти
+    context.handler(scheme).get_backend()
+    baseline = max_rss_kib()
+    hashed = context.hash("password")
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        context.verify("password", hashed)
+        timings.append(time.perf_counter() - start)
+
+    results.put((timings, max_rss_kib() - baseline))
+
+
+def run_isolated(scheme: str, params: dict, iterations: int):
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(
+        target=measure, args=(scheme, params, iterations, results)
+    )
+    process.start()
+    timings, peak_kib = results.get()
+    process.join()
+    return timings, peak_kib
+
+
+def report(label: str, timings: list[float], peak_kib: int):
+    median = statistics.median(timings)
+    print(
+        f"{label:<34} median={median * 1000:8.1f}ms "
+        f"max={max(timings) * 1000:8.1f}ms "
+        f"hashes/s/core={1 / median:7.1f} "
+        f"peak_mem={peak_kib / 1024:8.1f}MiB"
+    )
+
+
+def parse_argon2(value: str) -> dict:
+    time_cost, memory_cost, parallelism = (int(v) for v in value.split(":"))
+    return {
+        "type": "ID",
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--argon2",
+        nargs="*",
+        default=[
+            "2:19456:1",
+            f"{AUTH_ARGON2_TIME_COST}:{AUTH_ARGON2_MEMORY_COST}:"
+            f"{AUTH_ARGON2_PARALLELISM}",
+        ],
+    )
+    parser.add_argument("--bcrypt", type=int, nargs="*", default=[12])
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    for value in args.argon2:
+        timings, peak_kib = run_isolated(
+            "argon2", parse_argon2(value), args.iterations
+        )
+        report(f"argon2id t:m:p={value}", timings, peak_kib)
+
+    for rounds in args.bcrypt:
+        timings, peak_kib = run_isolated(
+            "bcrypt", {"rounds": rounds}, args.iterations
+        )
+        report(f"bcrypt rounds={rounds}", timings, peak_kib)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Пропускная способность ротации refresh-токенов.
+
+Каждый клиент в цикле обменивает свой refresh-токен на новый:
+    legacy - старый /auth/refresh/: поиск токена, INSERT + COMMIT + SELECT
+             нового, DELETE старого + COMMIT
+    atomic - rotate_refresh_token и один COMMIT (в PostgreSQL ротация -
+             один запрос)
+
+Запуск:
+    python -m benchmarks.refresh_rotation --clients 50 --rotations 20
+    BENCH_DATABASE_URL=postgresql+asyncpg://... \\
+        python -m benchmarks.refresh_rotation
+
+По умолчанию используется временная SQLite-база. Таблицы в указанной БД
+пересоздаются, не запускайте на рабочей базе.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+from app.auth.auth import (
+    create_refresh_token,
+    hash_refresh_token,
+    rotate_refresh_token,
+)
+from app.core.settings import REFRESH_TOKEN_EXPIRE_DAYS
+from app.db.base import Base
+from app.db.refresh_token import RefreshToken
+from app.db.user import User, UserRole
+
+
+async def legacy_rotation(token: str, new_token: str, session):
+    result = await session.execute(
+        select(RefreshToken)
+        .where(
+            RefreshToken.token_hash == hash_refresh_token(token),
+            RefreshToken.expires_at > datetime.now(timezone.utc),
+        )
+        .options(selectinload(RefreshToken.user))
+    )
+    record = result.scalar_one_or_none()
+    if record is None:
+        return None
+    db_token = RefreshToken(
+        user_id=record.user_id,
+        token_hash=hash_refresh_token(new_token),
+        expires_at=datetime.now(timezone.utc)
+        + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    session.add(db_token)
+    await session.commit()
+    await session.refresh(db_token)
+    await session.execute(
+        delete(RefreshToken).where(
+            RefreshToken.token_hash == hash_refresh_token(token)
+        )
+    )
+    await session.commit()
+    return record.user
+
+
+async def atomic_rotation(token: str, new_token: str, session):
+    user = await rotate_refresh_token(token, new_token, session)
+    await session.commit()
+    return user
+
+
+async def client(rotate, session_maker, token: str, rotations: int):
+    latencies = []
+    for _ in range(rotations):
+        new_token = create_refresh_token()
+        start = time.perf_counter()
+        async with session_maker() as session:
+            user = await rotate(token, new_token, session)
+        latencies.append(time.perf_counter() - start)
+        assert user is not None
+        token = new_token
+    return latencies
+
+
+async def seed_tokens(session_maker, clients: int) -> list[str]:
+    async with session_maker() as session:
+        await session.execute(delete(RefreshToken))
+        await session.execute(delete(User))
+        users = [
+            User(
+                username=f"bench_{i}",
+                email=f"bench_{i}@example.com",
+                hashed_password="fakehashed",
+                role=UserRole.student,
+            )
+            for i in range(clients)
+        ]
+        session.add_all(users)
+        await session.flush()
+        tokens = [create_refresh_token() for _ in users]
+        expires_at = datetime.now(timezone.utc) + timedelta(days=1)
+        session.add_all(
+            RefreshToken(
+                user_id=user.id,
+                token_hash=hash_refresh_token(token),
+                expires_at=expires_at,
+            )
+            for user, token in zip(users, tokens)
+        )
+        await session.commit()
+    return tokens
+
+
+async def run(url: str, args):
+    engine = create_async_engine(url, pool_size=args.clients)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    modes = {"legacy": legacy_rotation, "atomic": atomic_rotation}
+    for mode in args.modes:
+        tokens = await seed_tokens(session_maker, args.clients)
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[
+                client(modes[mode], session_maker, token, args.rotations)
+                for token in tokens
+            ]
+        )
+        elapsed = time.perf_counter() - start
+        ms = sorted(value * 1000 for values in results for value in values)
+        print(
+            f"{mode:<8} rotations/s={len(ms) / elapsed:9.1f} "
+            f"p50={statistics.median(ms):8.2f}ms "
+            f"p99={ms[min(len(ms) - 1, int(len(ms) * 0.99))]:8.2f}ms"
+        )
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--rotations", type=int, default=50)
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=["legacy", "atomic"],
+        default=["legacy", "atomic"],
+    )
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        url = f"sqlite+aiosqlite:///{path}"
+
+    asyncio.run(run(url, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import pytest
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
+from datetime import datetime, timedelta, timezone
 
 from app.db import ObjectStatus
 from app.db.user import User, UserRole
@@ -11,6 +12,7 @@ from app.db.module import Module
 from app.db.lesson import Lesson
 
 from app.app import app
+from app.helpers.catalog_cache import catalog_cache
 
 
 @pytest.mark.asyncio
@@ -445,3 +447,189 @@ async def test_get_archived_content_tree_as_student_forbidden(
     ) as ac:
         response = await ac.get("/api/v1/course/archived/")
     assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_get_courses_search_ranks_title_matches_first(
+    test_db: AsyncSession,
+    test_user: User,
+    test_teacher_user: User,
+    override_get_current_user_student,
+):
+    in_description = Course(
+        title="Основы программирования",
+        description="Курс для тех, кто начинает изучать Python",
+        status=ObjectStatus.published,
+        owner_id=test_teacher_user.id,
+        price=500,
+    )
+    in_title = Course(
+        title="Python для анализа данных",
+        description="Pandas, numpy и визуализация",
+        status=ObjectStatus.published,
+        owner_id=test_teacher_user.id,
+        price=700,
+    )
+    unrelated = Course(
+        title="Рисование акварелью",
+        description="Техники и материалы",
+        status=ObjectStatus.published,
+        owner_id=test_teacher_user.id,
+        price=300,
+    )
+    test_db.add_all([in_description, in_title, unrelated])
+    await test_db.commit()
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get("/api/v1/course/", params={"search": "python"})
+    assert response.status_code == 200
+
+    ids = [course["id"] for course in response.json()]
+    assert ids == [in_title.id, in_description.id]
+
+
+@pytest.mark.asyncio
+async def test_get_courses_cursor_pagination(
+    test_db: AsyncSession,
+    test_user: User,
+    test_teacher_user: User,
+    override_get_current_user_student,
+):
+    same_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    courses = [
+        Course(
+            title=f"Курс {i}",
+            description="Описание",
+            status=ObjectStatus.published,
+            owner_id=test_teacher_user.id,
+            price=100,
+            # одинаковое время: порядок внутри определяет id
+            created_at=same_time if i < 3 else same_time + timedelta(days=i),
+        )
+        for i in range(5)
+    ]
+    test_db.add_all(courses)
+    await test_db.commit()
+    ordered = sorted(courses, key=lambda c: (c.created_at, c.id), reverse=True)
+    expected = [course.id for course in ordered]
+
+    seen = []
+    url, params = "/api/v1/course/", {"limit": 2}
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        while url:
+            response = await ac.get(url, params=params)
+            assert response.status_code == 200
+            seen.extend(course["id"] for course in response.json())
+            url = response.links.get("next", {}).get("url")
+            params = None
+
+        mixed = await ac.get(
+            "/api/v1/course/", params={"cursor": "abc", "skip": 2}
+        )
+        # ответ 400 откатывает общую с тестом сессию
+        await test_db.refresh(test_user)
+        broken = await ac.get("/api/v1/course/", params={"cursor": "abc"})
+
+    assert seen == expected
+    assert mixed.status_code == 400
+    assert broken.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_courses_filters_sorts_and_facets(
+    test_db: AsyncSession,
+    test_admin_user: User,
+    test_teacher_user: User,
+    test_another_teacher_user: User,
+    override_get_current_user_admin,
+):
+    def course(title, price, owner, status=ObjectStatus.published):
+        return Course(
+            title=title,
+            description="Описание",
+            price=price,
+            owner_id=owner.id,
+            status=status,
+        )
+
+    courses = [
+        course("B", 300, test_teacher_user),
+        course("A", 300, test_teacher_user),
+        course("C", 1500, test_teacher_user),
+        course("D", 9000, test_teacher_user, ObjectStatus.draft),
+        course("E", 100, test_another_teacher_user),
+    ]
+    test_db.add_all(courses)
+    await test_db.commit()
+    username = test_teacher_user.username
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        sorted_page = await ac.get(
+            "/api/v1/course/",
+            params={
+                "owner_username": username,
+                "max_price": 2000,
+                "sort": "-price,title",
+            },
+        )
+        facets = await ac.get(
+            "/api/v1/course/facets",
+            params={"owner_username": username, "status": "published"},
+        )
+        unknown_sort = await ac.get("/api/v1/course/", params={"sort": "id"})
+
+    assert sorted_page.status_code == 200
+    assert [c["title"] for c in sorted_page.json()] == ["C", "A", "B"]
+    assert "link" not in sorted_page.headers
+
+    assert facets.status_code == 200
+    assert facets.json() == {
+        "total": 3,
+        # фасет статуса считается без фильтра по статусу
+        "status": {"published": 3, "draft": 1},
+        "price": {"0-500": 2, "500-2000": 1, "2000-5000": 0, "5000+": 0},
+    }
+    assert unknown_sort.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_courses_cached_with_etag(
+    test_db: AsyncSession,
+    test_user: User,
+    test_course: Course,
+    override_get_current_user_student,
+):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        first = await ac.get("/api/v1/course/")
+        second = await ac.get("/api/v1/course/")
+        etag = first.headers["etag"]
+        not_modified = await ac.get(
+            "/api/v1/course/", headers={"If-None-Match": etag}
+        )
+
+        test_course.title = "Новое название"
+        await test_db.commit()
+
+        changed = await ac.get(
+            "/api/v1/course/", headers={"If-None-Match": etag}
+        )
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["etag"] == etag
+    assert not_modified.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()[0]["title"] == "Новое название"
+
+    stats = catalog_cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2
+    assert stats["not_modified"] == 1 and stats["invalidations"] == 1
@@ -0,0 +1,47 @@
+# tests/api/v1/test_internal.py
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from app.db.user import User
+from app.db.pool import PoolStats
+
+from app.app import app
+
+
+@pytest.mark.asyncio
+async def test_get_db_pool_stats_as_admin(
+    test_admin_user: User, override_get_current_user_admin
+):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get("/api/v1/internal/db/pool")
+    assert response.status_code == 200
+    data = response.json()["primary"]
+    assert "checked_out" in data
+    assert "overflow" in data
+    assert "le_inf" in data["checkout_latency_ms"]
+
+
+@pytest.mark.asyncio
+async def test_get_db_pool_stats_as_student_forbidden(
+    test_user: User, override_get_current_user_student
+):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get("/api/v1/internal/db/pool")
+    assert response.status_code == 403
+
+
+def test_pool_stats_checkout_histogram():
+    stats = PoolStats(buckets=(1, 10))
+    stats.observe_checkout(0.0005)
+    stats.observe_checkout(0.005)
+    stats.observe_checkout(0.5)
+    stats.observe_wait(0.2)
+
+    assert stats.checkouts == 3
+    assert stats.latency_histogram == [1, 1, 1]
+    assert stats.waits == 1
+    assert stats.wait_time_max == 0.2
@@ -0,0 +1,551 @@
+# tests/api/v1/test_query_budget.py
+"""
+Бюджеты SQL-запросов для эндпоинтов app/api/v1.
+
+Количество запросов берется из заголовка Server-Timing, который выставляет
+QueryStatsMiddleware. Рост числа запросов (например, N+1 из-за ленивых
+связей) ломает тест. Запросы при отдаче тела StreamingResponse в заголовок
+не попадают, для потоковых эндпоинтов они считаются событиями движка
+(фикстура statements). Не покрыты POST /payments/stub (нужен RabbitMQ)
+и POST /upload/ (нужен MinIO).
+"""
+import re
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.auth import (
+    access_token_claims,
+    create_access_token,
+    get_password_hash,
+)
+from app.db import ObjectStatus
+from app.db.user import User, UserRole
+from app.db.course import Course
+from app.db.module import Module, ModuleContentType
+from app.db.lesson import Lesson, LessonBlock, LessonBlockType
+
+from app.app import app
+from app.middleware.query_stats import QueryStats, statement_shape
+
+QUERY_BUDGETS = {
+    "get_course_content": 3,
+    "create_course": 4,
+    "patch_course": 5,
+    "get_courses": 3,
+    "get_teacher_courses": 3,
+    "suggest_courses": 0,
+    "get_archived_content_tree": 11,
+    "get_module_content": 3,
+    "create_module": 7,
+    "patch_module": 4,
+    "delete_module": 6,
+    "create_lesson": 6,
+    "create_lesson_block": 4,
+    "get_lesson": 1,
+    "patch_lesson": 4,
+    "patch_lesson_block": 5,
+    "delete_lesson": 4,
+    "register_user": 2,
+    "auth_user": 3,
+    "refresh_tokens": 3,
+    "get_me": 1,
+    "logout_user": 3,
+    "get_all_users": 1,
+    "get_payment_status": 1,
+    "get_payment_status_by_intent": 1,
+    "get_db_pool_stats": 0,
+}
+
+
+def query_count(response) -> int:
+    match = re.search(
+        r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers["server-timing"]
+    )
+    return int(match.group(1))
+
+
+def assert_query_budget(response, endpoint: str):
+    count = query_count(response)
+    assert count <= QUERY_BUDGETS[endpoint], (
+        f"{endpoint}: {count} SQL queries, budget "
+        f"{QUERY_BUDGETS[endpoint]}\n{response.headers['server-timing']}"
+    )
+
+
+def client():
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+async def _course_tree(test_db: AsyncSession, course: Course, size: int = 5):
+    modules = []
+    for i in range(size):
+        module = Module(
+            title=f"Module {i}",
+            description="Module",
+            course_id=course.id,
+            status=ObjectStatus.published,
+            content_type=ModuleContentType.lessons,
+            order=(i + 1) * 100,
+        )
+        test_db.add(module)
+        modules.append(module)
+    await test_db.flush()
+    for module in modules:
+        for j in range(size):
+            test_db.add(
+                Lesson(
+                    title=f"Lesson {module.id}.{j}",
+                    module_id=module.id,
+                    course_id=course.id,
+                    status=ObjectStatus.published,
+                    order=(j + 1) * 100,
+                )
+            )
+    await test_db.commit()
+    return modules
+
+
+@pytest.mark.asyncio
+async def test_budget_get_course_content(
+    test_db, test_course, override_get_current_user_teacher
+):
+    await _course_tree(test_db, test_course)
+    async with client() as ac:
+        response = await ac.get(f"/api/v1/course/{test_course.id}/content/")
+    assert response.status_code == 200
+    assert_query_budget(response, "get_course_content")
+
+
+@pytest.mark.asyncio
+async def test_budget_create_course(
+    test_db, test_teacher_user, override_get_current_user_teacher
+):
+    async with client() as ac:
+        response = await ac.post(
+            "/api/v1/course/",
+            json={"title": "Budget", "description": "Budget", "price": 10},
+        )
+    assert response.status_code == 201
+    assert_query_budget(response, "create_course")
+
+
+@pytest.mark.asyncio
+async def test_budget_patch_course(
+    test_db, test_draft_course, override_get_current_user_teacher
+):
+    async with client() as ac:
+        response = await ac.patch(
+            f"/api/v1/course/{test_draft_course.id}", json={"title": "New"}
+        )
+    assert response.status_code == 200
+    assert_query_budget(response, "patch_course")
+
+
+@pytest.mark.asyncio
+async def test_budget_get_courses(
+    test_db, test_teacher_user, test_user, override_get_current_user_student
+):
+    for i in range(20):
+        test_db.add(
+            Course(
+                title=f"Course {i}",
+                description="Budget",
+                status=ObjectStatus.published,
+                owner_id=test_teacher_user.id,
+                price=10,
+            )
+        )
+    await test_db.commit()
+
+    async with client() as ac:
+        response = await ac.get("/api/v1/course/")
+    assert response.status_code == 200
+    assert len(response.json()) == 20
+    assert_query_budget(response, "get_courses")
+
+
+@pytest.mark.asyncio
+async def test_budget_get_teacher_courses(
+    test_db,
+    test_course,
+    test_draft_course,
+    override_get_current_user_teacher,
+):
+    async with client() as ac:
+        response = await ac.get("/api/v1/course/my")
+    assert response.status_code == 200
+    assert_query_budget(response, "get_teacher_courses")
+
+
+@pytest.mark.asyncio
+async def test_budget_teacher_route_with_current_token(
+    test_db, test_teacher_user, test_course, statements
+):
+    await test_db.commit()
+    statements.clear()
+    async with client() as ac:
+        # без переопределения зависимостей: роль берется из claims
+        ac.cookies.update(claims_cookies(test_teacher_user))
+        response = await ac.get("/api/v1/course/my")
+    assert response.status_code == 200
+    assert [c["id"] for c in response.json()] == [test_course.id]
+    assert_query_budget(response, "get_teacher_courses")
+    assert not [s for s in statements if "FROM users" in s]
+
+
+@pytest.mark.asyncio
+async def test_budget_suggest_courses(test_db, test_course, test_user):
+    await test_db.commit()
+    async with client() as ac:
+        # подсказкам хватает проверенных claims токена, без users
+        ac.cookies.update(claims_cookies(test_user))
+        response = await ac.get("/api/v1/course/suggest", params={"q": "test"})
+    assert response.status_code == 200
+    assert response.json() == [{"id": test_course.id, "title": "Test Course"}]
+    assert_query_budget(response, "suggest_courses")
+
+
+@pytest.mark.asyncio
+async def test_budget_get_archived_content_tree(
+    test_db,
+    test_course,
+    test_archived_course,
+    test_archived_module,
+    override_get_current_user_teacher,
+):
+    async with client() as ac:
+        response = await ac.get("/api/v1/course/archived/")
+    assert response.status_code == 200
+    assert_query_budget(response, "get_archived_content_tree")
+
+
+@pytest.mark.asyncio
+async def test_budget_get_module_content(
+    test_db, test_course, override_get_current_user_teacher
+):
+    modules = await _course_tree(test_db, test_course)
+    async with client() as ac:
+        response = await ac.get(
+            f"/api/v1/course/{test_course.id}/module/{modules[0].id}"
+        )
+    assert response.status_code == 200
+    assert_query_budget(response, "get_module_content")
+
+
+@pytest.mark.asyncio
+async def test_budget_create_module(
+    test_db, test_course, override_get_current_user_teacher
+):
+    async with client() as ac:
+        response = await ac.post(
+            f"/api/v1/course/{test_course.id}/module/",
+            json={"title": "Module", "description": "Module"},
+        )
+    assert response.status_code == 200
+    assert_query_budget(response, "create_module")
+
+
+@pytest.mark.asyncio
+async def test_budget_patch_module(
+    test_db, test_course, test_module, override_get_current_user_teacher
+):
+    async with client() as ac:
+        response = await ac.patch(
+            f"/api/v1/course/{test_course.id}/module/{test_module.id}",
+            json={"title": "Renamed"},
+        )
+    assert response.status_code == 200
+    assert_query_budget(response, "patch_module")
+
+
+@pytest.mark.asyncio
+async def test_budget_delete_module(
+    test_db, test_course, test_module, override_get_current_user_teacher
+):
+    async with client() as ac:
+        response = await ac.delete(
+            f"/api/v1/course/{test_course.id}/module/{test_module.id}"
+        )
+    assert response.status_code == 204
+    assert_query_budget(response, "delete_module")
+
+
+@pytest.mark.asyncio
+async def test_budget_create_lesson(
+    test_db, test_course, test_module, override_get_current_user_teacher
+):
+    async with client() as ac:
+        response = await ac.post(
+            f"/api/v1/course/{test_course.id}/lesson",
+            json={
+                "title": "Lesson",
+                "summary": None,
+                "duration": 10,
+                "module_id": test_module.id,
+            },
+        )
+    assert response.status_code == 200
+    assert_query_budget(response, "create_lesson")
+
+
+@pytest.mark.asyncio
+async def test_budget_create_lesson_block(
+    test_db, test_course, test_lesson, override_get_current_user_teacher
+):
+    async with client() as ac:
+        response = await ac.post(
+            f"/api/v1/course{test_course.id}/lesson/{test_lesson.id}/block",
+            json={"type": "text", "content": {"text": "Hello"}},
+        )
+    assert response.status_code == 200
+    assert_query_budget(response, "create_lesson_block")
+
+
+async def _lesson_blocks(test_db: AsyncSession, lesson: Lesson, count: int):
+    blocks = [
+        LessonBlock(
+            lesson_id=lesson.id,
+            order=(i + 1) * 100,
+            type=LessonBlockType.TEXT,
+            content=f"Block {i}",
+        )
+        for i in range(count)
+    ]
+    test_db.add_all(blocks)
+    await test_db.commit()
+    return blocks
+
+
+@pytest.mark.asyncio
+async def test_budget_get_lesson(
+    test_db, test_course, test_lesson, override_get_current_user_teacher
+):
+    await _lesson_blocks(test_db, test_lesson, 10)
+    async with client() as ac:
+        response = await ac.get(
+            f"/api/v1/course/{test_course.id}/lesson/{test_lesson.id}"
+        )
+    assert response.status_code == 200
+    assert len(response.json()["blocks"]) == 10
+    assert_query_budget(response, "get_lesson")
+
+
+@pytest.mark.asyncio
+async def test_budget_patch_lesson(
+    test_db, test_course, test_lesson, override_get_current_user_teacher
+):
+    async with client() as ac:
+        response = await ac.patch(
+            f"/api/v1/course/{test_course.id}/lesson/{test_lesson.id}",
+            json={"title": "Renamed"},
+        )
+    assert response.status_code == 200
+    assert_query_budget(response, "patch_lesson")
+
+
+@pytest.mark.asyncio
+async def test_budget_patch_lesson_block(
+    test_db, test_course, test_lesson, override_get_current_user_teacher
+):
+    blocks = await _lesson_blocks(test_db, test_lesson, 1)
+    async with client() as ac:
+        response = await ac.patch(
+            f"/api/v1/course/{test_course.id}/lesson/{test_lesson.id}"
+            f"/block/{blocks[0].id}",
+            json={"type": "text", "content": {"text": "Changed"}},
+        )
+    assert response.status_code == 200
+    assert_query_budget(response, "patch_lesson_block")
+
+
+@pytest.mark.asyncio
+async def test_budget_delete_lesson(
+    test_db, test_course, test_lesson, override_get_current_user_teacher
+):
+    await _lesson_blocks(test_db, test_lesson, 3)
+    async with client() as ac:
+        response = await ac.delete(
+            f"/api/v1/course/{test_course.id}/lesson/{test_lesson.id}"
+        )
+    assert response.status_code == 204
+    assert_query_budget(response, "delete_lesson")
+
+
+@pytest_asyncio.fixture
+async def login_user(test_db: AsyncSession) -> User:
+    user = User(
+        username="login_user",
+        email="login_user@example.com",
+        role=UserRole.student,
+        hashed_password=get_password_hash("password123"),
+        is_active=True,
+    )
+    test_db.add(user)
+    await test_db.commit()
+    return user
+
+
+def auth_cookies(user: User) -> dict:
+    return {"users_access_token": create_access_token({"sub": str(user.id)})}
+
+
+def claims_cookies(user: User) -> dict:
+    """Текущий формат токена: роль и статус пользователя в claims"""
+    return {
+        "users_access_token": create_access_token(access_token_claims(user))
+    }
+
+
+@pytest.mark.asyncio
+async def test_budget_register_user(test_db):
+    async with client() as ac:
+        response = await ac.post(
+            "/api/v1/auth/register/",
+            json={
+                "username": "new_student",
+                "email": "new_student@example.com",
+                "password": "password123",
+                "first_name": "New",
+                "last_name": "Student",
+                "role": "student",
+            },
+        )
+    assert response.status_code == 200
+    assert_query_budget(response, "register_user")
+
+
+@pytest.mark.asyncio
+async def test_budget_auth_user(test_db, login_user):
+    async with client() as ac:
+        response = await ac.post(
+            "/api/v1/auth/login/",
+            json={"email": login_user.email, "password": "password123"},
+        )
+        # повторный вход с cookie прошлого: замена токена в том же бюджете
+        relogin = await ac.post(
+            "/api/v1/auth/login/",
+            json={"email": login_user.email, "password": "password123"},
+        )
+    assert response.status_code == relogin.status_code == 200
+    assert_query_budget(response, "auth_user")
+    assert_query_budget(relogin, "auth_user")
+
+
+@pytest.mark.asyncio
+async def test_budget_refresh_tokens(test_db, login_user):
+    async with client() as ac:
+        login = await ac.post(
+            "/api/v1/auth/login/",
+            json={"email": login_user.email, "password": "password123"},
+        )
+        response = await ac.post(
+            "/api/v1/auth/refresh/",
+            json={"refresh_token": login.json()["refresh_token"]},
+        )
+    assert response.status_code == 200
+    assert_query_budget(response, "refresh_tokens")
+
+
+@pytest.mark.asyncio
+async def test_budget_get_me(test_db, login_user):
+    async with client() as ac:
+        ac.cookies.update(auth_cookies(login_user))
+        response = await ac.get("/api/v1/auth/me/")
+    assert response.status_code == 200
+    assert_query_budget(response, "get_me")
+
+
+@pytest.mark.asyncio
+async def test_budget_logout_user(test_db, login_user):
+    async with client() as ac:
+        login = await ac.post(
+            "/api/v1/auth/login/",
+            json={"email": login_user.email, "password": "password123"},
+        )
+        ac.cookies.set("users_access_token", login.json()["access_token"])
+        response = await ac.post("/api/v1/auth/logout/")
+    assert response.status_code == 200
+    assert_query_budget(response, "logout_user")
+
+
+@pytest.mark.asyncio
+async def test_budget_get_all_users(
+    test_db, test_user, test_admin_user, statements
+):
+    await test_db.commit()
+    statements.clear()
+    async with client() as ac:
+        ac.cookies.update(claims_cookies(test_admin_user))
+        response = await ac.get("/api/v1/auth/all_users")
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 2
+    count = len(statements)
+    assert count <= QUERY_BUDGETS["get_all_users"], (
+        f"get_all_users: {count} SQL queries, budget "
+        f"{QUERY_BUDGETS['get_all_users']}\n" + "\n".join(statements)
+    )
+
+
+@pytest.mark.asyncio
+async def test_budget_get_payment_status(test_db):
+    async with client() as ac:
+        response = await ac.get("/api/v1/payments/stub/1")
+    assert response.status_code == 404
+    assert_query_budget(response, "get_payment_status")
+
+
+@pytest.mark.asyncio
+async def test_budget_get_payment_status_by_intent(test_db):
+    async with client() as ac:
+        response = await ac.get("/api/v1/payments/status/unknown")
+    assert response.status_code == 200
+    assert_query_budget(response, "get_payment_status_by_intent")
+
+
+@pytest.mark.asyncio
+async def test_budget_get_db_pool_stats(test_db, test_admin_user):
+    await test_db.commit()
+    async with client() as ac:
+        ac.cookies.update(claims_cookies(test_admin_user))
+        response = await ac.get("/api/v1/internal/db/pool")
+    assert response.status_code == 200
+    assert_query_budget(response, "get_db_pool_stats")
+
+
+@pytest.mark.asyncio
+async def test_legacy_token_role_checked_by_user_row(
+    test_db, test_user, test_admin_user
+):
+    await test_db.commit()
+    async with client() as ac:
+        # токен без claim role: роль читается из users
+        ac.cookies.update(auth_cookies(test_admin_user))
+        admin = await ac.get("/api/v1/internal/db/pool")
+        ac.cookies.update(auth_cookies(test_user))
+        student = await ac.get("/api/v1/internal/db/pool")
+    assert admin.status_code == 200
+    assert query_count(admin) == 1
+    assert student.status_code == 403
+
+
+def test_repeated_statement_shapes_are_flagged():
+    stats = QueryStats()
+    for i in range(5):
+        stats.record(
+            "SELECT * FROM lessons WHERE lessons.module_id = $1", 0.001
+        )
+    stats.record(
+        "SELECT * FROM modules WHERE modules.id IN ($1, $2, $3)", 0.001
+    )
+    stats.record("SELECT * FROM modules WHERE modules.id IN ($1)", 0.001)
+
+    assert stats.count == 7
+    assert stats.repeated() == {
+        "SELECT * FROM lessons WHERE lessons.module_id = $?": 5
+    }
+    assert statement_shape("SELECT 1 WHERE id IN (?, ?)") == (
+        "SELECT 1 WHERE id IN (...)"
+    )
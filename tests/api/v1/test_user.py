@@ -0,0 +1,64 @@
+# tests/api/v1/test_user.py
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.user import User
+
+from app.app import app
+
+
+@pytest.mark.asyncio
+async def test_get_all_users_streams_ndjson(
+    test_db: AsyncSession,
+    test_user: User,
+    test_teacher_user: User,
+    test_admin_user: User,
+    override_get_current_user_admin,
+):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get("/api/v1/auth/all_users")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    users = [json.loads(line) for line in response.text.splitlines()]
+    assert [u["id"] for u in users] == sorted(
+        [test_user.id, test_teacher_user.id, test_admin_user.id]
+    )
+    assert all("hashed_password" not in u for u in users)
+
+
+@pytest.mark.asyncio
+async def test_get_all_users_keyset_page(
+    test_db: AsyncSession,
+    test_user: User,
+    test_teacher_user: User,
+    test_admin_user: User,
+    override_get_current_user_admin,
+):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get(
+            "/api/v1/auth/all_users",
+            params={"after_id": test_user.id, "limit": 1},
+        )
+    assert response.status_code == 200
+
+    users = [json.loads(line) for line in response.text.splitlines()]
+    assert [u["id"] for u in users] == [test_teacher_user.id]
+
+
+@pytest.mark.asyncio
+async def test_get_all_users_as_student_forbidden(
+    test_db: AsyncSession, test_user: User, override_get_current_user_student
+):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get("/api/v1/auth/all_users")
+    assert response.status_code == 403
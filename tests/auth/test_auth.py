@@ -0,0 +1,219 @@
+# tests/auth/test_auth.py
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.auth.auth import (
+    authenticate_user,
+    create_refresh_token,
+    delete_expired_refresh_tokens,
+    evict_sessions_statement,
+    get_password_hash_async,
+    get_user_by_refresh_token,
+    hash_refresh_token,
+    pwd_context,
+    rotate_refresh_token,
+    rotation_statement,
+    save_refresh_token,
+    verify_password_async,
+)
+from app.auth.user_cache import user_cache
+from app.db import RefreshToken
+from app.db.user import User, UserRole
+
+
+@pytest.mark.asyncio
+async def test_async_hash_and_verify_roundtrip():
+    hashed = await get_password_hash_async("password123")
+
+    assert hashed.startswith("$argon2id$")
+    assert await verify_password_async("password123", hashed) is True
+    assert await verify_password_async("wrong", hashed) is False
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_bcrypt_password(test_db: AsyncSession):
+    user = User(
+        username="legacy",
+        email="legacy@example.com",
+        role=UserRole.student,
+        hashed_password=pwd_context.handler("bcrypt").hash("password123"),
+    )
+    test_db.add(user)
+    await test_db.commit()
+
+    assert await authenticate_user(user.email, "wrong", test_db) is None
+    assert user.hashed_password.startswith("$2b$")
+
+    authenticated = await authenticate_user(user.email, "password123", test_db)
+    await test_db.commit()
+
+    assert authenticated.id == user.id
+    assert user.hashed_password.startswith("$argon2id$")
+    assert await verify_password_async("password123", user.hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_rehash_on_login_keeps_other_cached_users(
+    test_db: AsyncSession, test_user: User
+):
+    legacy = User(
+        username="legacy",
+        email="legacy@example.com",
+        role=UserRole.student,
+        hashed_password=pwd_context.handler("bcrypt").hash("password123"),
+    )
+    test_db.add(legacy)
+    await test_db.commit()
+    user_cache.put(test_user, user_cache.generation)
+    user_cache.put(legacy, user_cache.generation)
+
+    await authenticate_user(legacy.email, "password123", test_db)
+    await test_db.commit()
+
+    assert user_cache.get(test_user.id) is not None
+    assert user_cache.get(legacy.id) is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_stored_as_digest(
+    test_db: AsyncSession, test_user: User
+):
+    token = create_refresh_token()
+    saved = await save_refresh_token(test_user.id, token, test_db)
+
+    assert saved.token_hash == hash_refresh_token(token)
+    assert len(saved.token_hash) == 64 and token not in saved.token_hash
+    assert (await get_user_by_refresh_token(token, test_db)).id == test_user.id
+    assert await get_user_by_refresh_token(saved.token_hash, test_db) is None
+
+
+@pytest.mark.asyncio
+async def test_session_cap_evicts_oldest(
+    test_db: AsyncSession, test_user: User
+):
+    now = datetime.now(timezone.utc)
+    tokens = [create_refresh_token() for _ in range(4)]
+    for i, token in enumerate(tokens):
+        test_db.add(
+            RefreshToken(
+                user_id=test_user.id,
+                token_hash=hash_refresh_token(token),
+                expires_at=now + timedelta(days=1),
+                created_at=now - timedelta(minutes=10 - i),
+            )
+        )
+    await test_db.flush()
+    new_token = create_refresh_token()
+    await save_refresh_token(test_user.id, new_token, test_db, max_sessions=3)
+
+    assert await get_user_by_refresh_token(tokens[0], test_db) is None
+    assert await get_user_by_refresh_token(tokens[1], test_db) is None
+    assert await get_user_by_refresh_token(tokens[2], test_db) is not None
+    assert await get_user_by_refresh_token(tokens[3], test_db) is not None
+    assert await get_user_by_refresh_token(new_token, test_db) is not None
+
+
+@pytest.mark.asyncio
+async def test_save_refresh_token_replaces_previous(
+    test_db: AsyncSession, test_user: User
+):
+    first, other = create_refresh_token(), create_refresh_token()
+    await save_refresh_token(test_user.id, first, test_db)
+    await save_refresh_token(test_user.id, other, test_db)
+
+    second = create_refresh_token()
+    await save_refresh_token(test_user.id, second, test_db, replaces=first)
+
+    assert await get_user_by_refresh_token(first, test_db) is None
+    assert await get_user_by_refresh_token(other, test_db) is not None
+    assert await get_user_by_refresh_token(second, test_db) is not None
+
+
+def test_save_refresh_token_statement_on_postgresql():
+    # SQLite не поддерживает DML в CTE, поэтому проверяется текст запроса
+    stmt = (
+        insert(RefreshToken)
+        .values(user_id=1, token_hash="new")
+        .add_cte(evict_sessions_statement(1, "old", 5).cte("evicted"))
+    )
+    sql = " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+
+    assert sql.startswith("WITH evicted AS (DELETE FROM refresh_tokens WHERE")
+    assert ") INSERT INTO refresh_tokens" in sql
+    assert "refresh_tokens.id NOT IN (SELECT refresh_tokens.id" in sql
+    assert "LIMIT" in sql
+
+
+@pytest.mark.asyncio
+async def test_sweeper_deletes_expired_in_batches(
+    test_db: AsyncSession, test_user: User, async_engine
+):
+    now = datetime.now(timezone.utc)
+    for i in range(7):
+        test_db.add(
+            RefreshToken(
+                user_id=test_user.id,
+                token_hash=hash_refresh_token(f"expired-{i}"),
+                expires_at=now - timedelta(minutes=1),
+            )
+        )
+    live = create_refresh_token()
+    await save_refresh_token(test_user.id, live, test_db)
+
+    deleted = await delete_expired_refresh_tokens(
+        async_sessionmaker(async_engine), batch_size=3
+    )
+
+    assert deleted == 7
+    assert await test_db.scalar(select(func.count(RefreshToken.id))) == 1
+    assert await get_user_by_refresh_token(live, test_db) is not None
+
+
+@pytest.mark.asyncio
+async def test_rotate_refresh_token_is_single_use(
+    test_db: AsyncSession, test_user: User
+):
+    token = create_refresh_token()
+    await save_refresh_token(test_user.id, token, test_db)
+
+    new_token = create_refresh_token()
+    user = await rotate_refresh_token(token, new_token, test_db)
+    await test_db.commit()
+
+    assert user.id == test_user.id
+    assert await get_user_by_refresh_token(token, test_db) is None
+    assert await get_user_by_refresh_token(new_token, test_db) is not None
+    # повторное использование старого токена не выдает новый
+    assert (
+        await rotate_refresh_token(token, create_refresh_token(), test_db)
+        is None
+    )
+    assert await test_db.scalar(select(func.count(RefreshToken.id))) == 1
+
+
+def test_rotation_statement_on_postgresql():
+    sql = " ".join(
+        str(
+            rotation_statement("old", "new").compile(
+                dialect=postgresql.dialect()
+            )
+        ).split()
+    )
+
+    assert sql.startswith(
+        "WITH old_token AS (DELETE FROM refresh_tokens WHERE "
+        "refresh_tokens.token_hash = %(token_hash_1)s AND "
+        "refresh_tokens.expires_at > %(expires_at_1)s "
+        "RETURNING refresh_tokens.user_id), "
+        "new_token AS (INSERT INTO refresh_tokens "
+        "(user_id, token_hash, expires_at, created_at) "
+        "SELECT old_token.user_id"
+    )
+    assert "FROM old_token RETURNING refresh_tokens.user_id)" in sql
+    assert sql.endswith(
+        "FROM users JOIN new_token ON users.id = new_token.user_id"
+    )
@@ -0,0 +1,194 @@
+# tests/auth/test_rate_limit.py
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.auth.auth as auth_module
+from app.app import app
+from app.auth.auth import get_password_hash
+from app.auth.rate_limit import (
+    LOGIN_EMAIL,
+    TAKE_SCRIPT,
+    TAKE_SCRIPT_SHA,
+    Bucket,
+    MemoryBackend,
+    RateLimiter,
+    RedisBackend,
+    RespClient,
+    rate_limiter,
+    refill,
+)
+from app.db.user import User, UserRole
+
+
+class RespStandIn:
+    """
+    Локальный сервер с протоколом Redis для тестов: понимает EVALSHA/EVAL
+    скрипта лимитера и выполняет тот же шаг корзины на Python.
+    """
+
+    def __init__(self):
+        self.buckets: dict[str, tuple[float, float]] = {}
+        self.scripts: set[str] = set()
+        self.commands: list[str] = []
+
+    @staticmethod
+    def encode(value) -> bytes:
+        if isinstance(value, Exception):
+            return f"-{value}\r\n".encode()
+        data = str(value).encode()
+        return b"$%d\r\n%s\r\n" % (len(data), data)
+
+    async def read_command(self, reader) -> list[str]:
+        count = int((await reader.readline())[1:])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2].decode())
+        return args
+
+    def take(self, key: str, capacity: str, per_second: str) -> str:
+        now = time.time()
+        tokens, updated_at = self.buckets.get(key, (int(capacity), now))
+        tokens, retry_after = refill(
+            tokens, updated_at, now, int(capacity), float(per_second)
+        )
+        self.buckets[key] = (tokens, now)
+        return str(retry_after)
+
+    async def handle(self, reader, writer):
+        while not reader.at_eof():
+            try:
+                command, *args = await self.read_command(reader)
+            except (ValueError, asyncio.IncompleteReadError):
+                break
+            self.commands.append(command)
+            if command == "EVALSHA" and args[0] not in self.scripts:
+                reply = Exception("NOSCRIPT No matching script")
+            elif command == "EVAL":
+                self.scripts.add(TAKE_SCRIPT_SHA)
+                assert args[0] == TAKE_SCRIPT
+                reply = self.take(*args[2:])
+            else:
+                reply = self.take(*args[2:])
+            writer.write(self.encode(reply))
+            await writer.drain()
+        writer.close()
+
+
+def test_bucket_refills_over_time():
+    tokens, retry_after = refill(0, 0, 0, capacity=2, per_second=0.5)
+    assert retry_after == 2.0
+
+    tokens, retry_after = refill(tokens, 0, 2, capacity=2, per_second=0.5)
+    assert retry_after == 0 and tokens == 0
+
+    tokens, retry_after = refill(0, 0, 100, capacity=2, per_second=0.5)
+    assert tokens == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_rejects_after_burst():
+    limiter = RateLimiter(MemoryBackend(max_keys=2))
+    bucket = Bucket("test", capacity=2, per_second=0.01)
+
+    assert await limiter.hit(bucket, "a") == 0
+    assert await limiter.hit(bucket, "a") == 0
+    assert await limiter.hit(bucket, "a") > 0
+    assert await limiter.hit(bucket, "b") == 0
+
+    await limiter.hit(bucket, "c")
+    stats = limiter.stats()
+    assert stats["allowed"] == {"test": 4}
+    assert stats["rejected"] == {"test": 1}
+    assert stats["keys"] == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_with_stand_in_server():
+    stand_in = RespStandIn()
+    server = await asyncio.start_server(stand_in.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    backend = RedisBackend(RespClient(f"redis://127.0.0.1:{port}/0"))
+    limiter = RateLimiter(backend)
+    bucket = Bucket("test", capacity=2, per_second=0.01)
+
+    try:
+        results = [await limiter.hit(bucket, "key") for _ in range(3)]
+    finally:
+        await backend.close()
+        server.close()
+        await server.wait_closed()
+
+    assert results[:2] == [0, 0] and results[2] > 0
+    # скрипт загружается один раз, дальше - только EVALSHA
+    assert stand_in.commands == ["EVALSHA", "EVAL", "EVALSHA", "EVALSHA"]
+    assert list(stand_in.buckets) == ["rate_limit:test:key"]
+
+
+@pytest.mark.asyncio
+async def test_unavailable_backend_fails_open():
+    server = await asyncio.start_server(lambda r, w: None, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    server.close()
+    await server.wait_closed()
+
+    limiter = RateLimiter(
+        RedisBackend(RespClient(f"redis://127.0.0.1:{port}/0"))
+    )
+
+    assert await limiter.hit(LOGIN_EMAIL, "user@example.com") == 0
+    assert limiter.stats()["backend_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_login_rejected_before_password_check(
+    test_db: AsyncSession, monkeypatch
+):
+    user = User(
+        username="throttled",
+        email="throttled@example.com",
+        role=UserRole.student,
+        hashed_password=get_password_hash("password123"),
+    )
+    test_db.add(user)
+    await test_db.commit()
+    # отклоненный логин откатывает сессию и сбрасывает атрибуты user
+    email = user.email
+
+    verified = []
+    verify = auth_module.verify_and_update_password_async
+
+    async def _counting_verify(password, hashed):
+        verified.append(password)
+        return await verify(password, hashed)
+
+    monkeypatch.setattr(
+        auth_module, "verify_and_update_password_async", _counting_verify
+    )
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        statuses = [
+            (
+                await ac.post(
+                    "/api/v1/auth/login/",
+                    json={"email": email, "password": "wrong"},
+                )
+            ).status_code
+            for _ in range(LOGIN_EMAIL.capacity)
+        ]
+        rejected = await ac.post(
+            "/api/v1/auth/login/",
+            json={"email": email.upper(), "password": "password123"},
+        )
+
+    assert statuses == [401] * LOGIN_EMAIL.capacity
+    assert rejected.status_code == 429
+    assert int(rejected.headers["retry-after"]) > 0
+    assert len(verified) == LOGIN_EMAIL.capacity
+    assert rate_limiter.stats()["rejected"] == {"login_email": 1}
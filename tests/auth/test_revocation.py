@@ -0,0 +1,128 @@
+# tests/auth/test_revocation.py
+import pytest
+from httpx import AsyncClient, ASGITransport
+from jose import jwt
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.app import app
+from app.auth.auth import access_token_claims, create_access_token
+from app.auth.revocation import BloomFilter, RevocationFilter
+from app.core.settings import get_auth_data
+from app.db import TokenRevocation
+from app.db.user import User, UserRole
+
+
+@pytest.fixture
+def statements(async_engine):
+    executed = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _count)
+    yield executed
+    event.remove(async_engine.sync_engine, "before_cursor_execute", _count)
+
+
+def client(token: str) -> AsyncClient:
+    ac = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    ac.cookies.update({"users_access_token": token})
+    return ac
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_access_token_carries_role_claims(test_teacher_user: User):
+    token = create_access_token(access_token_claims(test_teacher_user))
+    auth_data = get_auth_data()
+    claims = jwt.decode(
+        token, auth_data["secret_key"], algorithms=[auth_data["algorithm"]]
+    )
+
+    assert claims["role"] == UserRole.teacher.value
+    assert claims["active"] is True
+    assert claims["jti"]
+    assert claims["iat"] <= claims["exp"]
+
+
+@pytest.mark.asyncio
+async def test_role_claim_rejects_without_db(
+    test_db: AsyncSession, test_user: User, statements
+):
+    await test_db.commit()
+    token = create_access_token(access_token_claims(test_user))
+    statements.clear()
+
+    async with client(token) as ac:
+        response = await ac.get("/api/v1/course/my")
+
+    assert response.status_code == 403
+    assert statements == []
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_access_token(
+    test_db: AsyncSession, test_user: User
+):
+    await test_db.commit()
+    token = create_access_token(access_token_claims(test_user))
+
+    async with client(token) as ac:
+        assert (await ac.get("/api/v1/auth/me/")).status_code == 200
+        assert (await ac.post("/api/v1/auth/logout/")).status_code == 200
+
+        ac.cookies.update({"users_access_token": token})
+        response = await ac.get("/api/v1/auth/me/")
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Токен отозван"
+    assert await test_db.scalar(select(TokenRevocation.jti)) is not None
+
+
+@pytest.mark.asyncio
+async def test_role_change_revokes_existing_tokens(
+    test_db: AsyncSession, test_user: User
+):
+    await test_db.commit()
+    token = create_access_token(access_token_claims(test_user))
+
+    test_user.role = UserRole.teacher
+    await test_db.commit()
+
+    async with client(token) as ac:
+        response = await ac.get("/api/v1/auth/me/")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_filter_loads_revocations_from_db(
+    test_db: AsyncSession, test_user: User, async_engine
+):
+    await test_db.commit()
+    claims = access_token_claims(test_user)
+    token = create_access_token(claims)
+    auth_data = get_auth_data()
+    claims = jwt.decode(
+        token, auth_data["secret_key"], algorithms=[auth_data["algorithm"]]
+    )
+
+    async with client(token) as ac:
+        await ac.post("/api/v1/auth/logout/")
+
+    fresh = RevocationFilter(capacity=100, error_rate=0.01)
+    assert fresh.is_revoked(claims) is False
+
+    await fresh.load(async_sessionmaker(async_engine))
+
+    assert fresh.is_revoked(claims) is True
+    assert fresh.last_id > 0
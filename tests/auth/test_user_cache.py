@@ -0,0 +1,125 @@
+# tests/auth/test_user_cache.py
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.app import app
+from app.auth.auth import create_access_token
+from app.auth.user_cache import user_cache
+from app.dao.user import UserDAO
+from app.db.user import User, UserRole
+
+
+def client(user: User) -> AsyncClient:
+    ac = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    ac.cookies.update(
+        {"users_access_token": create_access_token({"sub": str(user.id)})}
+    )
+    return ac
+
+
+@pytest.mark.asyncio
+async def test_second_request_is_served_from_cache(
+    test_db: AsyncSession, test_user: User, statements
+):
+    await test_db.commit()
+
+    async with client(test_user) as ac:
+        first = await ac.get("/api/v1/auth/me/")
+        statements.clear()
+        second = await ac.get("/api/v1/auth/me/")
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["id"] == test_user.id
+    assert statements == []
+    assert user_cache.hits == 1
+    assert user_cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_role_change_invalidates_cache(
+    test_db: AsyncSession, test_user: User
+):
+    await test_db.commit()
+
+    async with client(test_user) as ac:
+        await ac.get("/api/v1/auth/me/")
+
+        await UserDAO.update(
+            {"id": test_user.id}, session=test_db, role=UserRole.teacher
+        )
+        await test_db.commit()
+
+        response = await ac.get("/api/v1/auth/me/")
+
+    assert response.json()["role"] == UserRole.teacher.value
+    assert user_cache.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_deactivation_via_flush_invalidates_cache(
+    test_db: AsyncSession, test_user: User
+):
+    await test_db.commit()
+
+    async with client(test_user) as ac:
+        await ac.get("/api/v1/auth/me/")
+
+        test_user.is_active = False
+        await test_db.commit()
+
+        response = await ac.get("/api/v1/auth/me/")
+
+    # деактивация отзывает выпущенные токены пользователя
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Токен отозван"
+    assert user_cache.get(test_user.id) is None
+    assert user_cache.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_change_invalidates_cache(
+    test_db: AsyncSession, test_user: User
+):
+    await test_db.commit()
+
+    async with client(test_user) as ac:
+        await ac.get("/api/v1/auth/me/")
+
+        test_user.first_name = "Renamed"
+        await test_db.commit()
+
+        response = await ac.get("/api/v1/auth/me/")
+
+    assert response.json()["first_name"] == "Renamed"
+    assert user_cache.hits == 0
+
+
+@pytest.mark.asyncio
+async def test_logout_invalidates_cache(test_db: AsyncSession, test_user: User):
+    await test_db.commit()
+
+    async with client(test_user) as ac:
+        await ac.get("/api/v1/auth/me/")
+        assert user_cache.stats()["size"] == 1
+
+        response = await ac.post("/api/v1/auth/logout/")
+
+    assert response.status_code == 200
+    assert user_cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_queries(
+    test_db: AsyncSession, test_user: User, statements, monkeypatch
+):
+    monkeypatch.setattr(user_cache, "enabled", False)
+    await test_db.commit()
+
+    async with client(test_user) as ac:
+        await ac.get("/api/v1/auth/me/")
+        statements.clear()
+        await ac.get("/api/v1/auth/me/")
+
+    assert len(statements) == 1
+    assert user_cache.hits == user_cache.misses == 0
@@ -1,6 +1,8 @@
 import asyncio
+from contextlib import asynccontextmanager
 import pytest
 import pytest_asyncio
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
@@ -12,8 +14,23 @@ from app.db.lesson import Lesson
 from app.db.course_purchase import CoursePurchase
 
 from app.app import app
-from app.db import get_async_db_session
-from app.dependencies import get_current_user, get_current_user_teacher
+from app.auth.auth import access_token_claims
+from app.auth.rate_limit import rate_limiter
+from app.auth.revocation import revocation_filter
+from app.auth.user_cache import user_cache
+from app.helpers.catalog_cache import catalog_cache
+from app.helpers.content_cache import content_cache
+from app.helpers.course_suggest import suggest_index
+from app.db import (
+    get_async_db_session,
+    get_async_db_read_session,
+    get_async_db_session_maker,
+)
+from app.dependencies import (
+    get_current_user,
+    get_current_user_read,
+    get_token_claims,
+)
 
 DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -34,6 +51,19 @@ async def async_engine():
     await engine.dispose()
 
 
+@pytest.fixture
+def statements(async_engine):
+    """Все запросы к тестовой БД, включая выполненные при отдаче тела"""
+    executed = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _count)
+    yield executed
+    event.remove(async_engine.sync_engine, "before_cursor_execute", _count)
+
+
 @pytest_asyncio.fixture
 async def test_db(async_engine):
     async_session = sessionmaker(
@@ -252,9 +282,43 @@ async def test_course_purchase(
 
 @pytest.fixture(autouse=True)
 def override_db_session(test_db: AsyncSession):
+    @asynccontextmanager
+    async def _test_session_maker():
+        yield test_db
+
     app.dependency_overrides[get_async_db_session] = lambda: test_db
+    app.dependency_overrides[get_async_db_read_session] = lambda: test_db
+    app.dependency_overrides[get_async_db_session_maker] = (
+        lambda: _test_session_maker
+    )
     yield
     app.dependency_overrides.pop(get_async_db_session, None)
+    app.dependency_overrides.pop(get_async_db_read_session, None)
+    app.dependency_overrides.pop(get_async_db_session_maker, None)
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    # id пользователей повторяются между тестами: база очищается после каждого
+    user_cache.reset()
+    revocation_filter.reset()
+    rate_limiter.reset()
+    catalog_cache.reset()
+    suggest_index.reset()
+    content_cache.reset()
+    yield
+    user_cache.reset()
+    revocation_filter.reset()
+    rate_limiter.reset()
+    catalog_cache.reset()
+    suggest_index.reset()
+    content_cache.reset()
+
+
+def override_claims(user: User):
+    app.dependency_overrides[get_token_claims] = lambda: access_token_claims(
+        user
+    )
 
 
 @pytest.fixture
@@ -263,8 +327,12 @@ def override_get_current_user_student(test_user: User):
         return test_user
 
     app.dependency_overrides[get_current_user] = _override_user
+    app.dependency_overrides[get_current_user_read] = _override_user
+    override_claims(test_user)
     yield
     app.dependency_overrides.pop(get_current_user, None)
+    app.dependency_overrides.pop(get_current_user_read, None)
+    app.dependency_overrides.pop(get_token_claims, None)
 
 
 @pytest.fixture
@@ -273,10 +341,12 @@ def override_get_current_user_teacher(test_teacher_user: User):
         return test_teacher_user
 
     app.dependency_overrides[get_current_user] = _override_teacher_user
-    app.dependency_overrides[get_current_user_teacher] = _override_teacher_user
+    app.dependency_overrides[get_current_user_read] = _override_teacher_user
+    override_claims(test_teacher_user)
     yield
     app.dependency_overrides.pop(get_current_user, None)
-    app.dependency_overrides.pop(get_current_user_teacher, None)
+    app.dependency_overrides.pop(get_current_user_read, None)
+    app.dependency_overrides.pop(get_token_claims, None)
 
 
 @pytest.fixture
@@ -285,5 +355,9 @@ def override_get_current_user_admin(test_admin_user: User):
         return test_admin_user
 
     app.dependency_overrides[get_current_user] = _override_admin_user
+    app.dependency_overrides[get_current_user_read] = _override_admin_user
+    override_claims(test_admin_user)
     yield
     app.dependency_overrides.pop(get_current_user, None)
+    app.dependency_overrides.pop(get_current_user_read, None)
+    app.dependency_overrides.pop(get_token_claims, None)
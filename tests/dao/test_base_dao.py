@@ -0,0 +1,110 @@
+# tests/dao/test_base_dao.py
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dao.user import UserDAO
+from app.db.user import User, UserRole
+
+
+@pytest.mark.asyncio
+async def test_dao_uses_callers_session_without_commit(test_db: AsyncSession):
+    user = await UserDAO.add(
+        session=test_db,
+        username="dao_user",
+        email="dao_user@example.com",
+        role=UserRole.student,
+        hashed_password="fakehashed",
+    )
+    assert user.id is not None
+    assert test_db.in_transaction()
+
+    found = await UserDAO.find_one_or_none_by_id(user.id, session=test_db)
+    assert found is user
+
+    updated = await UserDAO.update(
+        {"id": user.id}, session=test_db, first_name="Updated"
+    )
+    assert updated == 1
+
+    await test_db.rollback()
+    assert await UserDAO.find_one_or_none(session=test_db, id=user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_dao_find_all_with_session(
+    test_db: AsyncSession, test_user: User, test_teacher_user: User
+):
+    teachers = await UserDAO.find_all(session=test_db, role=UserRole.teacher)
+    assert [u.id for u in teachers] == [test_teacher_user.id]
+
+
+def _user_rows(count: int, prefix: str = "bulk") -> list[dict]:
+    return [
+        {
+            "username": f"{prefix}_{i}",
+            "email": f"{prefix}_{i}@example.com",
+            "hashed_password": "fakehashed",
+            "role": UserRole.student,
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_returns_ids_in_order(test_db: AsyncSession):
+    ids = await UserDAO.bulk_insert(
+        _user_rows(25), session=test_db, chunk_size=10
+    )
+    assert len(ids) == 25
+    assert ids == sorted(ids)
+
+    user = await UserDAO.find_one_or_none_by_id(ids[7], session=test_db)
+    assert user.username == "bulk_7"
+
+
+@pytest.mark.asyncio
+async def test_upsert_updates_on_conflict(test_db: AsyncSession):
+    await UserDAO.bulk_insert(_user_rows(3), session=test_db)
+
+    rows = _user_rows(5)
+    for row in rows:
+        row["first_name"] = "Upserted"
+    await UserDAO.upsert(
+        rows,
+        index_elements=["username"],
+        update_fields=["first_name"],
+        session=test_db,
+    )
+
+    users = await UserDAO.find_all(session=test_db)
+    assert len(users) == 5
+    assert {u.first_name for u in users} == {"Upserted"}
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_per_row_values(test_db: AsyncSession):
+    ids = await UserDAO.bulk_insert(_user_rows(4), session=test_db)
+
+    updated = await UserDAO.bulk_update(
+        [{"id": user_id, "first_name": f"name_{user_id}"} for user_id in ids],
+        session=test_db,
+    )
+    assert updated == 4
+
+    for user_id in ids:
+        user = await UserDAO.find_one_or_none_by_id(user_id, session=test_db)
+        assert user.first_name == f"name_{user_id}"
+
+
+@pytest.mark.asyncio
+async def test_find_page_and_stream_all_keyset(test_db: AsyncSession):
+    ids = await UserDAO.bulk_insert(_user_rows(7), session=test_db)
+
+    page = await UserDAO.find_page(after_id=ids[2], limit=3, session=test_db)
+    assert [u.id for u in page] == ids[3:6]
+
+    streamed = [
+        u.id
+        async for u in UserDAO.stream_all(session=test_db, batch_size=2)
+    ]
+    assert streamed == ids
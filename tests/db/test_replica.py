@@ -0,0 +1,128 @@
+# tests/db/test_replica.py
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.app import app
+from app.auth.auth import create_access_token
+from app.db.base import Base, get_async_db_session
+from app.db.user import User, UserRole
+from app.db.replica import ReadReplicaRouter, WriteTrackingSession
+
+
+@pytest_asyncio.fixture
+async def two_databases(tmp_path):
+    engines = []
+    makers = []
+    for name in ("primary", "replica"):
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / name}.db"
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        engines.append(engine)
+        makers.append(
+            async_sessionmaker(
+                engine,
+                expire_on_commit=False,
+                sync_session_class=WriteTrackingSession,
+            )
+        )
+
+    for maker, username in zip(makers, ("on_primary", "on_replica")):
+        async with maker() as session:
+            session.add(
+                User(
+                    username=username,
+                    email=f"{username}@example.com",
+                    role=UserRole.student,
+                    hashed_password="fakehashed",
+                )
+            )
+            await session.commit()
+
+    yield makers
+
+    for engine in engines:
+        await engine.dispose()
+
+
+async def _read_username(router: ReadReplicaRouter, key: str | None):
+    session_maker = await router.session_maker_for(key)
+    async with session_maker() as session:
+        return await session.scalar(select(User.username))
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica(two_databases):
+    primary, replica = two_databases
+    router = ReadReplicaRouter(primary, replica)
+
+    assert await _read_username(router, "1") == "on_replica"
+    assert router.replica_reads == 1
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_uses_primary(two_databases):
+    primary, replica = two_databases
+    router = ReadReplicaRouter(primary, replica, read_your_writes_seconds=60)
+
+    async with primary() as session:
+        session.info.update(replica_router=router, write_key="1")
+        user = await session.scalar(select(User))
+        user.first_name = "Changed"
+        await session.commit()
+
+    assert await _read_username(router, "1") == "on_primary"
+    assert await _read_username(router, "2") == "on_replica"
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_falls_back_to_primary(two_databases):
+    primary, replica = two_databases
+    router = ReadReplicaRouter(primary, replica, max_lag_seconds=1)
+
+    async def lagging():
+        return 30.0
+
+    router._measure_lag = lagging
+
+    assert await _read_username(router, None) == "on_primary"
+    assert router.primary_reads == 1
+
+
+@pytest.mark.asyncio
+async def test_no_replica_reads_from_primary(two_databases):
+    primary, _ = two_databases
+    router = ReadReplicaRouter(primary)
+
+    assert await _read_username(router, None) == "on_primary"
+
+
+@pytest.mark.asyncio
+async def test_read_route_resolves_user_on_read_session(
+    test_db, test_user, monkeypatch
+):
+    await test_db.commit()
+
+    def primary_session():
+        raise AssertionError("маршрут чтения открыл сессию основной БД")
+
+    monkeypatch.setitem(
+        app.dependency_overrides, get_async_db_session, primary_session
+    )
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        ac.cookies.update(
+            {
+                "users_access_token": create_access_token(
+                    {"sub": str(test_user.id)}
+                )
+            }
+        )
+        response = await ac.get("/api/v1/course/")
+
+    assert response.status_code == 200
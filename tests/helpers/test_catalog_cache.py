@@ -0,0 +1,35 @@
+# tests/helpers/test_catalog_cache.py
+import pytest
+
+from app.helpers.catalog_cache import etag_matches, make_etag
+
+ETAG = make_etag(b"[]")
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        ETAG,
+        f"W/{ETAG}",
+        f'"other", {ETAG}',
+        f'W/"other",W/{ETAG}',
+        "*",
+    ],
+)
+def test_etag_matches(header):
+    assert etag_matches(header, ETAG)
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "",
+        '"other"',
+        # тег, содержащий текущий как подстроку, - другой тег
+        f'"x{ETAG[1:-1]}x"',
+        ETAG[1:-1],
+        f'"{ETAG}"',
+    ],
+)
+def test_etag_does_not_match(header):
+    assert not etag_matches(header, ETAG)
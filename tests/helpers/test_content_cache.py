@@ -0,0 +1,97 @@
+# tests/helpers/test_content_cache.py
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.app import app
+from app.db.course import Course
+from app.db.module import Module
+from app.helpers.content_cache import ContentTreeCache, content_cache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fill():
+    cache = ContentTreeCache(max_entries=2)
+    fills = []
+
+    async def fill():
+        fills.append(1)
+        await asyncio.sleep(0.01)
+        return b"[]"
+
+    bodies = await asyncio.gather(
+        *[cache.get_or_fill(("course", 1), fill) for _ in range(5)]
+    )
+
+    assert bodies == [b"[]"] * 5
+    assert len(fills) == 1
+    assert cache.stats()["shared_fills"] == 4
+
+    await cache.get_or_fill(("course", 2), fill)
+    await cache.get_or_fill(("course", 3), fill)
+    assert cache.get(("course", 1)) is None
+    assert cache.stats()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_waiters_fill_themselves_after_failed_fill():
+    cache = ContentTreeCache()
+    calls = []
+
+    async def fill():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise RuntimeError("db is down")
+        return b"[1]"
+
+    results = await asyncio.gather(
+        cache.get_or_fill("key", fill),
+        cache.get_or_fill("key", fill),
+        cache.get_or_fill("key", fill),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1:] == [b"[1]", b"[1]"]
+    assert len(calls) == 2
+    assert cache.stats()["fill_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_content_version_invalidates_cached_tree(
+    test_db: AsyncSession,
+    test_course: Course,
+    test_module: Module,
+    override_get_current_user_teacher,
+):
+    course_id, module_id = test_course.id, test_module.id
+    await test_db.commit()
+    url = f"/api/v1/course/{course_id}"
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        first = await ac.get(f"{url}/content/")
+        cached = await ac.get(f"{url}/content/")
+        await ac.post(
+            f"{url}/lesson",
+            json={
+                "title": "Новый урок",
+                "summary": None,
+                "duration": 5,
+                "module_id": module_id,
+            },
+        )
+        # сессия теста общая с маршрутами: версия в course.stats
+        # обновляется только при новом чтении курса
+        await test_db.refresh(test_course)
+        changed = await ac.get(f"{url}/content/")
+
+    assert cached.content == first.content
+    assert first.json()[0]["content"] == []
+    assert changed.json()[0]["content"][0]["title"] == "Новый урок"
+    stats = content_cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
@@ -0,0 +1,153 @@
+# tests/helpers/test_content_tree.py
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.app import app
+from app.db.base import ObjectStatus
+from app.db.course import Course
+from app.db.lesson import Lesson
+from app.db.module import Module, ModuleContentType
+from app.helpers.content_tree import (
+    fetch_course_tree,
+    fetch_module_tree,
+    serialize_tree,
+)
+from app.schemas import SLessonResponse, SModuleTreeResponse
+
+
+async def nested_course(db: AsyncSession, course: Course) -> int:
+    def module(title, order, status, content_type, parent=None):
+        return Module(
+            title=title,
+            description="-",
+            course_id=course.id,
+            parent_module_id=parent.id if parent else None,
+            status=status,
+            content_type=content_type,
+            order=order,
+        )
+
+    published, draft = ObjectStatus.published, ObjectStatus.draft
+    second = module("Второй", 200, published, ModuleContentType.modules)
+    first = module("Первый", 100, published, ModuleContentType.lessons)
+    hidden = module("Черновик", 300, draft, ModuleContentType.modules)
+    db.add_all([second, first, hidden])
+    await db.flush()
+
+    late = module("Б", 200, published, ModuleContentType.lessons, second)
+    early = module("А", 100, published, ModuleContentType.empty, second)
+    orphan = module("Скрыт", 100, published, ModuleContentType.empty, hidden)
+    db.add_all([late, early, orphan])
+    await db.flush()
+
+    for title, order, status, parent in [
+        ("Урок 2", 200, published, first),
+        ("Урок 1", 100, published, first),
+        ("Урок-черновик", 50, draft, first),
+        ("Урок Б", 100, published, late),
+    ]:
+        db.add(
+            Lesson(
+                title=title,
+                course_id=course.id,
+                module_id=parent.id,
+                status=status,
+                order=order,
+            )
+        )
+    await db.commit()
+    return course.id
+
+
+def titles(nodes: list[dict]) -> list:
+    return [(node["title"], titles(node.get("content", []))) for node in nodes]
+
+
+@pytest.mark.asyncio
+async def test_tree_ordered_and_filtered_by_visibility(
+    test_db: AsyncSession, test_course: Course
+):
+    course_id = await nested_course(test_db, test_course)
+
+    student = await fetch_course_tree(test_db, course_id, "student")
+    owner = await fetch_course_tree(test_db, course_id, "owner")
+
+    assert titles(student) == [
+        ("Первый", [("Урок 1", []), ("Урок 2", [])]),
+        ("Второй", [("А", []), ("Б", [("Урок Б", [])])]),
+    ]
+    assert [node["title"] for node in owner] == [
+        "Первый",
+        "Второй",
+        "Черновик",
+    ]
+    assert owner[0]["content"][0]["title"] == "Урок-черновик"
+    assert owner[2]["content"][0]["title"] == "Скрыт"
+
+
+@pytest.mark.asyncio
+async def test_content_endpoint_matches_response_model(
+    test_db: AsyncSession,
+    test_course: Course,
+    override_get_current_user_teacher,
+):
+    course_id = await nested_course(test_db, test_course)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get(f"/api/v1/course/{course_id}/content/")
+
+    assert response.status_code == 200
+    adapter = TypeAdapter(list[SModuleTreeResponse | SLessonResponse])
+    roots = await fetch_course_tree(test_db, course_id, "owner")
+    assert json.loads(serialize_tree(roots)) == json.loads(
+        adapter.dump_json(adapter.validate_python(roots))
+    )
+    assert response.json() == json.loads(serialize_tree(roots))
+
+
+async def module_id(db: AsyncSession, title: str) -> int:
+    return await db.scalar(select(Module.id).where(Module.title == title))
+
+
+@pytest.mark.asyncio
+async def test_module_tree_reads_only_subtree(
+    test_db: AsyncSession, test_course: Course
+):
+    course_id = await nested_course(test_db, test_course)
+    second = await module_id(test_db, "Второй")
+    hidden = await module_id(test_db, "Черновик")
+
+    node = await fetch_module_tree(test_db, course_id, second, "student")
+
+    assert titles([node]) == [("Второй", [("А", []), ("Б", [("Урок Б", [])])])]
+    assert (
+        await fetch_module_tree(test_db, course_id, hidden, "student") is None
+    )
+    owner = await fetch_module_tree(test_db, course_id, hidden, "owner")
+    assert titles([owner]) == [("Черновик", [("Скрыт", [])])]
+
+
+@pytest.mark.asyncio
+async def test_module_endpoint_returns_subtree(
+    test_db: AsyncSession,
+    test_course: Course,
+    override_get_current_user_teacher,
+):
+    course_id = await nested_course(test_db, test_course)
+    late = await module_id(test_db, "Б")
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get(f"/api/v1/course/{course_id}/module/{late}")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert SModuleTreeResponse.model_validate(body).id == late
+    assert body["parent_module_id"] == await module_id(test_db, "Второй")
+    assert [lesson["title"] for lesson in body["content"]] == ["Урок Б"]
@@ -0,0 +1,102 @@
+# tests/helpers/test_course_stats.py
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.app import app
+from app.db import CourseStats
+from app.db.course import Course
+from app.db.course_purchase import CoursePurchase
+from app.db.lesson import Lesson
+from app.helpers import course_stats
+
+
+async def read_stats(db: AsyncSession, course_id: int) -> tuple:
+    stats = await db.scalar(
+        select(CourseStats)
+        .where(CourseStats.course_id == course_id)
+        .execution_options(populate_existing=True)
+    )
+    return (
+        stats.modules_count,
+        stats.lessons_count,
+        stats.total_duration,
+        stats.purchases_count,
+    )
+
+
+@pytest.mark.asyncio
+async def test_routes_update_course_stats(
+    test_db: AsyncSession,
+    test_course: Course,
+    override_get_current_user_teacher,
+):
+    course_id = test_course.id
+    url = f"/api/v1/course/{course_id}"
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        module = await ac.post(
+            f"{url}/module/", json={"title": "Модуль", "description": "-"}
+        )
+        module_id = module.json()["id"]
+        assert await read_stats(test_db, course_id) == (1, 0, 0, 0)
+
+        lesson_ids = []
+        for duration in (30, 10):
+            lesson = await ac.post(
+                f"{url}/lesson",
+                json={
+                    "title": "Урок",
+                    "summary": None,
+                    "duration": duration,
+                    "module_id": module_id,
+                },
+            )
+            lesson_ids.append(lesson.json()["id"])
+        assert await read_stats(test_db, course_id) == (1, 2, 40, 0)
+
+        await ac.patch(f"{url}/lesson/{lesson_ids[0]}", json={"duration": 45})
+        await ac.delete(f"{url}/lesson/{lesson_ids[1]}")
+        assert await read_stats(test_db, course_id) == (1, 1, 45, 0)
+
+        # сессия теста общая с маршрутами: связь stats загружена до изменений
+        await test_db.refresh(test_course)
+        listed = await ac.get("/api/v1/course/")
+        assert listed.json()[0]["stats"] == {
+            "modules_count": 1,
+            "lessons_count": 1,
+            "total_duration": 45,
+            "purchases_count": 0,
+        }
+
+        # архивирование модуля убирает из счетчиков и его уроки
+        archived = await ac.patch(
+            f"{url}/module/{module_id}", json={"status": "archived"}
+        )
+        assert archived.status_code == 200
+        assert await read_stats(test_db, course_id) == (0, 0, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_reconcile_rebuilds_drifted_stats(
+    test_db: AsyncSession,
+    test_course: Course,
+    test_draft_course: Course,
+    test_lesson: Lesson,
+    test_course_purchase: CoursePurchase,
+    async_engine,
+):
+    test_lesson.duration = 20
+    await course_stats.apply_delta(test_db, test_course.id, lessons=7)
+    await test_db.commit()
+
+    reconciled = await course_stats.reconcile(
+        async_sessionmaker(async_engine), batch_size=1
+    )
+
+    assert reconciled == 2
+    assert await read_stats(test_db, test_course.id) == (1, 1, 20, 1)
+    assert await read_stats(test_db, test_draft_course.id) == (0, 0, 0, 0)
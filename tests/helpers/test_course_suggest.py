@@ -0,0 +1,65 @@
+# tests/helpers/test_course_suggest.py
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.app import app
+from app.db.base import ObjectStatus
+from app.db.course import Course
+from app.helpers.course_suggest import SuggestIndex, suggest_index
+
+
+def test_suggest_prefix_order_and_updates():
+    index = SuggestIndex()
+    index.build([(3, "Python для всех"), (1, "Основы  Python"), (2, "python")])
+
+    assert [s["id"] for s in index.suggest("PYTH", 10)] == [2, 3]
+    assert index.suggest("основы p", 10) == [
+        {"id": 1, "title": "Основы  Python"}
+    ]
+    assert index.suggest("py", 1) == [{"id": 2, "title": "python"}]
+    assert index.suggest("  ", 10) == []
+
+    index.apply(2, "Ёлочная Python")
+    index.apply(3, None)
+    assert index.suggest("py", 10) == []
+    assert index.suggest("елоч", 10)[0]["id"] == 2
+    assert len(index) == 2
+
+
+@pytest.mark.asyncio
+async def test_suggest_follows_commits_and_reload(
+    test_db: AsyncSession,
+    test_course: Course,
+    test_draft_course: Course,
+    async_engine,
+    override_get_current_user_teacher,
+):
+    course_id = test_course.id
+    await test_db.commit()
+    assert suggest_index.suggest("test", 10) == [
+        {"id": course_id, "title": "Test Course"}
+    ]
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        renamed = await ac.patch(
+            f"/api/v1/course/{course_id}", json={"title": "Углубленный курс"}
+        )
+        found = await ac.get("/api/v1/course/suggest", params={"q": "углуб"})
+        await ac.patch(
+            f"/api/v1/course/{course_id}", json={"status": "archived"}
+        )
+        archived = await ac.get("/api/v1/course/suggest", params={"q": "углуб"})
+
+    assert renamed.status_code == 200
+    assert [s["id"] for s in found.json()] == [course_id]
+    assert archived.json() == []
+
+    test_draft_course.status = ObjectStatus.published
+    await test_db.commit()
+    await suggest_index.load(async_sessionmaker(async_engine))
+    assert [s["title"] for s in suggest_index.suggest("d", 10)] == [
+        "Draft Course"
+    ]
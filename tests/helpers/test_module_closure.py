@@ -0,0 +1,153 @@
+# tests/helpers/test_module_closure.py
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.app import app
+from app.db.base import ObjectStatus
+from app.db.course import Course
+from app.db.lesson import Lesson
+from app.db.module import Module
+from app.db.module_closure import ModuleClosure
+from app.helpers import module_closure
+from app.helpers.course_queries_utils import archive_module_tree
+from app.helpers.module_lesson import get_all_submodules
+
+
+async def chain(db: AsyncSession, course: Course, depth: int) -> list[Module]:
+    modules, parent = [], None
+    for level in range(depth):
+        module = Module(
+            title=f"Уровень {level}",
+            description="-",
+            course_id=course.id,
+            parent=parent,
+            status=ObjectStatus.published,
+            order=100,
+        )
+        modules.append(module)
+        parent = module
+    db.add_all(modules)
+    await db.flush()
+    return modules
+
+
+async def closure_rows(db: AsyncSession) -> set[tuple]:
+    result = await db.execute(
+        select(
+            ModuleClosure.ancestor_id,
+            ModuleClosure.descendant_id,
+            ModuleClosure.depth,
+        )
+    )
+    return set(result.all())
+
+
+@pytest.mark.asyncio
+async def test_closure_follows_create_move_and_delete(
+    test_db: AsyncSession, test_course: Course
+):
+    root, middle, leaf = await chain(test_db, test_course, 3)
+    ids = lambda query: test_db.scalars(query)
+
+    assert list(await ids(module_closure.ancestor_ids(leaf.id))) == [
+        root.id,
+        middle.id,
+    ]
+    assert set(await ids(module_closure.descendant_ids(root.id))) == {
+        root.id,
+        middle.id,
+        leaf.id,
+    }
+    assert [m.id for m in await get_all_submodules(test_db, middle.id)] == [
+        middle.id,
+        leaf.id,
+    ]
+
+    other = Module(
+        title="Другой", description="-", course_id=test_course.id, order=200
+    )
+    test_db.add(other)
+    await test_db.flush()
+    middle.parent_module_id = other.id
+    await test_db.flush()
+
+    assert list(await ids(module_closure.ancestor_ids(leaf.id))) == [
+        other.id,
+        middle.id,
+    ]
+    assert (
+        set(
+            await ids(
+                module_closure.descendant_ids(root.id, include_self=False)
+            )
+        )
+        == set()
+    )
+
+    await test_db.delete(middle)
+    await test_db.flush()
+
+    assert await closure_rows(test_db) == {
+        (root.id, root.id, 0),
+        (other.id, other.id, 0),
+    }
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_maintained_rows(
+    test_db: AsyncSession, test_course: Course
+):
+    await chain(test_db, test_course, 4)
+    await chain(test_db, test_course, 2)
+    maintained = await closure_rows(test_db)
+
+    await module_closure.rebuild(test_db)
+
+    assert await closure_rows(test_db) == maintained
+    assert len(maintained) == 10 + 3
+
+
+@pytest.mark.asyncio
+async def test_archive_module_tree_covers_subtree(
+    test_db: AsyncSession, test_course: Course
+):
+    root, middle, leaf = await chain(test_db, test_course, 3)
+    lesson = Lesson(
+        title="Урок",
+        course_id=test_course.id,
+        module_id=leaf.id,
+        status=ObjectStatus.published,
+        order=100,
+    )
+    test_db.add(lesson)
+    await test_db.flush()
+
+    await archive_module_tree(test_db, middle.id)
+    for obj in (root, middle, leaf, lesson):
+        await test_db.refresh(obj)
+
+    assert root.status == ObjectStatus.published
+    assert middle.status == leaf.status == ObjectStatus.archived
+    assert lesson.status == ObjectStatus.archived
+
+
+@pytest.mark.asyncio
+async def test_delete_module_route_removes_closure_rows(
+    test_db: AsyncSession,
+    test_course: Course,
+    override_get_current_user_teacher,
+):
+    root, _, _ = await chain(test_db, test_course, 3)
+    await test_db.commit()
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.delete(
+            f"/api/v1/course/{test_course.id}/module/{root.id}"
+        )
+
+    assert response.status_code == 204
+    assert await closure_rows(test_db) == set()
@@ -0,0 +1,78 @@
+# tests/helpers/test_obj_exist_check.py
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.course import Course
+from app.db.module import Module
+from app.db.lesson import Lesson
+from app.helpers import obj_exist_check
+
+
+@pytest.mark.asyncio
+async def test_resolve_loads_course_module_lesson_in_one_query(
+    test_db: AsyncSession,
+    test_course: Course,
+    test_module: Module,
+    test_lesson: Lesson,
+    statements,
+):
+    test_db.expunge_all()
+    statements.clear()
+
+    course, module, lesson = await obj_exist_check.resolve(
+        test_db,
+        course_id=test_course.id,
+        module_id=test_module.id,
+        lesson_id=test_lesson.id,
+    )
+
+    assert len(statements) == 1
+    assert course.id == test_course.id
+    assert module.id == test_module.id
+    assert lesson.module is module
+    assert lesson.blocks == []
+
+    loader = obj_exist_check.get_loader(test_db)
+    assert loader.queries == 1
+    assert loader.queries_saved == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_lookups_are_memoized(
+    test_db: AsyncSession, test_course: Course, statements
+):
+    statements.clear()
+
+    first = await obj_exist_check.course_exists(test_course.id, test_db)
+    second = await obj_exist_check.course_exists(test_course.id, test_db)
+
+    assert first is second
+    assert len(statements) == 1
+    assert obj_exist_check.get_loader(test_db).queries_saved == 1
+
+
+@pytest.mark.asyncio
+async def test_checked_course_relationships_stay_loadable(
+    test_db: AsyncSession, test_course: Course, test_lesson: Lesson
+):
+    test_db.expunge_all()
+
+    course = await obj_exist_check.course_exists(test_course.id, test_db)
+
+    # тот же объект из identity map: связи догружаются, а не падают
+    lessons = await course.awaitable_attrs.lessons
+    assert [lesson.id for lesson in lessons] == [test_lesson.id]
+    assert await course.awaitable_attrs.students == []
+
+
+@pytest.mark.asyncio
+async def test_resolve_missing_object_raises_404(
+    test_db: AsyncSession, test_course: Course
+):
+    with pytest.raises(HTTPException) as exc:
+        await obj_exist_check.resolve(
+            test_db, course_id=test_course.id, module_id=999_999
+        )
+    assert exc.value.status_code == 404
+    assert exc.value.detail == "Модуль не найден"